@@ -0,0 +1,14 @@
+from backend.api.asgi import ChatASGIApp
+from main import app as flask_app, bootstrap_manager, shutdown_manager
+
+
+# Async serving mode: `uvicorn asgi:app --port 5000` (the chat API runs on the event loop, the rest via Flask)
+app = ChatASGIApp(flask_app, startup=bootstrap_manager, shutdown=shutdown_manager)
+
+
+if __name__ == '__main__':
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("The async serving mode needs an ASGI server: pip install uvicorn")
+    uvicorn.run(app, port=5000)
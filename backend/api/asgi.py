@@ -0,0 +1,253 @@
+import asyncio
+import io
+import json
+import sys
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+from flask import Flask
+from backend.api.telegram_webhook import handle_telegram_update
+from backend.managers.tenant_registry import UnknownTenantError
+from backend.services import http_clients
+from backend.utils.admission import OverloadedError
+from config import STATUS_LONG_POLL_TIMEOUT
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+Headers = List[Tuple[bytes, bytes]]
+
+
+class ChatASGIApp:
+    """
+    Asyncio-native serving of the chat API: /api/process, /api/check_status and /webhook/telegram run on the
+    event loop, so a conversation waiting on the LLM or an operator costs a coroutine instead of a worker thread.
+    Every other path (frontend, FAQ, /metrics) is handed to the Flask app in a worker thread.
+    """
+
+    def __init__(self, flask_app: Flask, startup: Callable[[], None], shutdown: Callable[[], None]):
+        """
+        Args:
+            flask_app: The WSGI app; it also holds the tenant registry once `startup` has run.
+            startup, shutdown: Blocking bootstrap and teardown (main.bootstrap_manager / main.shutdown_manager).
+        """
+        self.flask_app = flask_app
+        self.startup = startup
+        self.shutdown = shutdown
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        method, path = scope["method"], scope["path"]
+        if method == "POST" and path == "/api/process":
+            await self._process(scope, receive, send)
+        elif method == "GET" and path.startswith("/api/check_status/"):
+            await self._check_status(scope, send, path[len("/api/check_status/"):])
+        elif method == "POST" and path == "/webhook/telegram":
+            await self._telegram_webhook(receive, send)
+        else:
+            await self._call_wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await asyncio.to_thread(self.startup)
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                # Async clients are closed on their own loop before the rest is torn down
+                await http_clients.close_all_async()
+                await asyncio.to_thread(self.shutdown)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @property
+    def tenants(self):
+        return getattr(self.flask_app, "tenants", None)
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                return b"".join(chunks)
+
+    @staticmethod
+    async def _read_json(receive: Receive) -> Optional[Dict[str, Any]]:
+        """Returns the JSON object in the request body, or None if there isn't one."""
+        try:
+            data = json.loads(await ChatASGIApp._read_body(receive) or b"null")
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+    @staticmethod
+    async def _send_json(send: Send, payload: Any, status: int = 200, headers: Optional[Headers] = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())
+            ] + (headers or [])
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    def _header(scope: Scope, name: bytes) -> str:
+        for key, value in scope["headers"]:
+            if key == name:
+                return value.decode("latin-1")
+        return ""
+
+    async def _process(self, scope: Scope, receive: Receive, send: Send) -> None:
+        data = await self._read_json(receive)
+        user_msg = data.get("message") if data else None
+
+        if not user_msg:
+            await self._send_json(send, {"error": "No message provided"}, 400)
+            return
+
+        if self.tenants is None:
+            await self._send_json(send, {"error": "System initializing, please try again in a moment."}, 503)
+            return
+
+        # Loading a tenant that is not in memory yet blocks, so it happens off the loop
+        try:
+            chat_manager = await asyncio.to_thread(self.tenants.get, data.get("tenant_id"))
+        except UnknownTenantError:
+            await self._send_json(send, {"error": "Unknown tenant"}, 404)
+            return
+
+        # Clients that ask for Server-Sent Events get the answer token by token
+        accept = self._header(scope, b"accept").split(",")[0].split(";")[0].strip()
+        try:
+            if accept != "text/event-stream":
+                await self._send_json(send, await chat_manager.process_message_async(user_msg))
+                return
+
+            # The first event is produced once the LLM call (if any) was admitted, so overload still gets a 429/503
+            events = chat_manager.process_message_stream_async(user_msg)
+            first_event = await events.__anext__()
+        except OverloadedError as e:
+            await self._send_json(
+                send,
+                {"error": "The assistant is busy, please try again in a moment."},
+                e.status,
+                [(b"retry-after", str(e.retry_after).encode())]
+            )
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream; charset=utf-8"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no")
+            ]
+        })
+        await self._send_event(send, *first_event)
+        async for event, payload in events:
+            await self._send_event(send, event, payload)
+        await send({"type": "http.response.body", "body": b""})
+
+    @staticmethod
+    async def _send_event(send: Send, event: str, payload: Dict[str, Any]) -> None:
+        chunk = f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+        await send({"type": "http.response.body", "body": chunk.encode("utf-8"), "more_body": True})
+
+    async def _check_status(self, scope: Scope, send: Send, req_id: str) -> None:
+        # ?wait=<seconds> holds the request open until the operator answers (long-polling)
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        try:
+            wait = min(float(query.get("wait", ["0"])[0]), STATUS_LONG_POLL_TIMEOUT)
+        except ValueError:
+            wait = 0
+
+        if self.tenants is None:
+            await self._send_json(send, {"error": "System initializing, please try again in a moment."}, 503)
+            return
+
+        try:
+            if wait > 0:
+                status_info = await self.tenants.wait_for_status_async(req_id, wait)
+            else:
+                status_info = await asyncio.to_thread(self.tenants.check_status, req_id)
+        except UnknownTenantError:
+            status_info = {"status": "not_found"}
+        await self._send_json(send, status_info)
+
+    async def _telegram_webhook(self, receive: Receive, send: Send) -> None:
+        data = await self._read_json(receive)
+        if self.tenants is None:
+            # Telegram redelivers the update once the app is up
+            await self._send_json(send, {"error": "System initializing, please try again in a moment."}, 503)
+            return
+
+        if data is not None:
+            try:
+                await asyncio.to_thread(handle_telegram_update, self.tenants, data)
+            except UnknownTenantError:
+                # Acknowledged, so Telegram doesn't keep redelivering a reply to a removed tenant
+                await self._send_json(send, {"status": "not_found"})
+                return
+        await self._send_json(send, {"status": "ok"})
+
+    def _wsgi_environ(self, scope: Scope, body: bytes) -> Dict[str, Any]:
+        server_name, server_port = scope.get("server") or ("localhost", 80)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", ""),
+            "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+            "SERVER_NAME": server_name,
+            "SERVER_PORT": str(server_port),
+            "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+            "REMOTE_ADDR": (scope.get("client") or ("", 0))[0],
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False
+        }
+        for key, value in scope["headers"]:
+            name = key.decode("latin-1").upper().replace("-", "_")
+            if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                name = f"HTTP_{name}"
+            value = value.decode("latin-1")
+            environ[name] = f"{environ[name]},{value}" if name in environ else value
+        return environ
+
+    def _run_wsgi(self, environ: Dict[str, Any]) -> Tuple[int, Headers, bytes]:
+        response: Dict[str, Any] = {}
+
+        def start_response(status: str, headers: List[Tuple[str, str]], exc_info=None):
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+
+        result = self.flask_app(environ, start_response)
+        try:
+            body = b"".join(result)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        return response["status"], response["headers"], body
+
+    async def _call_wsgi(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Serves the request with the Flask app in a worker thread (frontend, FAQ and metrics routes)."""
+        environ = self._wsgi_environ(scope, await self._read_body(receive))
+        status, headers, body = await asyncio.to_thread(self._run_wsgi, environ)
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -1,26 +1,67 @@
-from flask import Blueprint, request, jsonify, current_app
+import itertools
+import json
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from backend.managers.tenant_registry import UnknownTenantError
+from backend.utils.admission import OverloadedError
+from config import STATUS_LONG_POLL_TIMEOUT
 
 
 chat_api = Blueprint('chat_api', __name__)
 
 
+@chat_api.errorhandler(OverloadedError)
+def overloaded(error):
+    # Too many concurrent LLM calls (503) or too many started recently (429): the client retries later
+    response = jsonify({"error": "The assistant is busy, please try again in a moment."})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, error.status
+
+
 @chat_api.route('/process', methods=['POST'])
 def handle_chat():
-    chat_manager = getattr(current_app, 'chat_manager', None)
+    tenants = getattr(current_app, 'tenants', None)
     data = request.json
     user_msg = data.get('message')
 
     if not user_msg:
         return jsonify({"error": "No message provided"}), 400
 
-    if chat_manager is None:
+    if tenants is None:
         return jsonify({"error": "System initializing, please try again in a moment."}), 503
 
+    # Requests without a tenant_id are served by the default (single-hotel) tenant
+    try:
+        chat_manager = tenants.get(data.get('tenant_id'))
+    except UnknownTenantError:
+        return jsonify({"error": "Unknown tenant"}), 404
+
+    # Clients that ask for Server-Sent Events get the answer token by token
+    if request.accept_mimetypes.best == 'text/event-stream':
+        # The first event is produced once the LLM call (if any) was admitted, so overload still gets a 429/503
+        events = chat_manager.process_message_stream(user_msg)
+        first_event = next(events)
+
+        def event_stream():
+            for event, payload in itertools.chain([first_event], events):
+                yield f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+        return Response(
+            stream_with_context(event_stream()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
     result = chat_manager.process_message(user_msg)
     return jsonify(result)
 
 
 @chat_api.route('/check_status/<req_id>', methods=['GET'])
 def check_status(req_id):
-    status_info = current_app.chat_manager.check_status(req_id)
+    # ?wait=<seconds> holds the request open until the operator answers (long-polling)
+    wait = min(request.args.get('wait', 0, type=float), STATUS_LONG_POLL_TIMEOUT)
+    # Answered from the shared request store: a poll never loads the tenant's knowledge base
+    if wait > 0:
+        status_info = current_app.tenants.wait_for_status(req_id, wait)
+    else:
+        status_info = current_app.tenants.check_status(req_id)
     return jsonify(status_info)
@@ -0,0 +1,31 @@
+from typing import Any, Dict
+from backend.managers.tenant_registry import TenantRegistry
+
+
+def handle_telegram_update(tenants: TenantRegistry, data: Dict[str, Any]) -> None:
+    """
+    Applies an operator's action from a Telegram webhook update. Shared by the Flask and ASGI apps.
+    Blocking: fulfilling a request embeds and indexes the operator's answer.
+    """
+    # 1. Handle "Approve" Button Click
+    if "callback_query" in data:
+        callback = data["callback_query"]
+        req_id = callback["data"].replace("approve_", "")
+
+        # Get the original AI suggestion from our state and hand it to the request's tenant
+        chat_manager = tenants.manager_for_request(req_id)
+        request_info = chat_manager.get_request(req_id) if chat_manager else None
+        if request_info:
+            chat_manager.fulfill_request(req_id, request_info["suggestion"])
+
+    # 2. Handle manual Reply (message IDs are per chat, and each tenant may have its own operator chat)
+    if "message" in data and "reply_to_message" in data["message"]:
+        reply_text = data["message"]["text"]
+        chat_id = data["message"]["chat"]["id"]
+        original_msg_id = data["message"]["reply_to_message"]["message_id"]
+        success = tenants.fulfill_by_msg_id(chat_id, original_msg_id, reply_text)
+
+        if success:
+            print(f"✅ Reply mapped to user request via Msg ID {original_msg_id}")
+        else:
+            print(f"⚠️ Unknown message ID {original_msg_id}")
@@ -1,7 +1,10 @@
+import hashlib
 import json
 import os
+import threading
 import pandas as pd
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any
 from ragas import evaluate
 from ragas.metrics import (
     faithfulness,
@@ -12,13 +15,18 @@ from ragas.metrics import (
 from ragas.llms import llm_factory
 from ragas.embeddings import LangchainEmbeddingsWrapper
 from langchain_huggingface import HuggingFaceEmbeddings
-from openai import AsyncOpenAI
 from datasets import Dataset
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from backend.managers.chat_manager import ChatManager
 from backend.managers.factory import create_app_manager
-from config import HF_API_TOKEN, HF_BASE_URL, CHAT_MODEL, EMBEDDING_MODEL
+from backend.services.http_clients import create_async_chat_client
+from backend.utils.rate_limiter import RateLimiter
+from config import (
+    CHAT_MODEL, EMBEDDING_MODEL, EVAL_WORKERS, EVAL_RATE_LIMIT, EVAL_CACHE_PATH, EVAL_MAX_FAILURE_RATE, SEARCH_MODE,
+    CONTEXT_CANDIDATES, CONTEXT_MAX_CHUNKS, CONTEXT_TOKEN_BUDGET, CONTEXT_MMR_LAMBDA, CONTEXT_DUPLICATE_THRESHOLD,
+    CONTEXT_CHARS_PER_TOKEN
+)
 
 
 class RAGEvaluator:
@@ -26,16 +34,34 @@ class RAGEvaluator:
     A class to evaluate the RAG pipeline performance using the RAGAS framework.
     It runs the evaluation dataset through the ChatManager and computes
     metrics for faithfulness, relevance, and context quality.
+    Pipeline outputs are computed concurrently and cached on disk, so re-runs
+    skip unchanged questions and interrupted runs resume where they stopped.
     """
 
-    def __init__(self, chat_manager: ChatManager):
+    def __init__(
+        self,
+        chat_manager: ChatManager,
+        max_workers: int = EVAL_WORKERS,
+        rate_limit: float = EVAL_RATE_LIMIT,
+        cache_path: str = EVAL_CACHE_PATH,
+        max_failure_rate: float = EVAL_MAX_FAILURE_RATE
+    ):
         """
         Initializes the evaluator with a ChatManager instance.
 
         Args:
             chat_manager (ChatManager): The active instance of the hotel chat manager.
+            max_workers (int): Number of questions run through the pipeline concurrently.
+            rate_limit (float): Maximum pipeline runs started per second (0 disables the limit).
+            cache_path (str): JSONL file with cached pipeline outputs.
+            max_failure_rate (float): Share of questions that may fail before the run is aborted.
         """
         self.chat_manager = chat_manager
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.cache_path = cache_path
+        self.max_failure_rate = max_failure_rate
+        self._cache_lock = threading.Lock()
         # Define metrics to be used by RAGAS
         self.metrics = [
             faithfulness,
@@ -47,7 +73,7 @@ class RAGEvaluator:
         self.embeddings = self._build_ragas_embeddings()
 
     def _build_ragas_llm(self):
-        client = AsyncOpenAI(api_key=HF_API_TOKEN, base_url=HF_BASE_URL)
+        client = create_async_chat_client()
         return llm_factory(model=CHAT_MODEL, client=client)
 
     def _build_ragas_embeddings(self):
@@ -67,6 +93,51 @@ class RAGEvaluator:
         with open(file_path, 'r', encoding='utf-8') as f:
             return json.load(f)
 
+    def _cache_key(self, question: str) -> str:
+        """
+        Keys a pipeline output by question, knowledge base version, prompt version and every setting
+        that changes the retrieved context or the answer (models, search mode, context assembly).
+        """
+        parts = [
+            question,
+            self.chat_manager.knowledge_manager.get_kb_version(),
+            self.chat_manager.llm.get_prompt_version(),
+            self.chat_manager.llm.chat_model,
+            self.chat_manager.llm.embedding_model,
+            SEARCH_MODE,
+            CONTEXT_CANDIDATES,
+            CONTEXT_MAX_CHUNKS,
+            CONTEXT_TOKEN_BUDGET,
+            CONTEXT_MMR_LAMBDA,
+            CONTEXT_DUPLICATE_THRESHOLD,
+            CONTEXT_CHARS_PER_TOKEN,
+        ]
+        return hashlib.sha256("\0".join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Reads previously computed pipeline outputs. A truncated last line from an interrupted run is skipped."""
+        cache = {}
+        if os.path.exists(self.cache_path):
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    cache[record["key"]] = record["result"]
+        return cache
+
+    def _append_to_cache(self, key: str, result: Dict[str, Any]) -> None:
+        """Persists one pipeline output as soon as it is ready."""
+        with self._cache_lock:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({"key": key, "result": result}, ensure_ascii=False) + "\n")
+
+    def _run_pipeline(self, query: str, context: List[str]) -> Dict[str, Any]:
+        self.rate_limiter.wait()
+        return self.chat_manager.process_message_for_eval(query, context)
+
     def prepare_ragas_dataset(self, test_data: List[Dict[str, str]]) -> Dataset:
         """
         Executes questions through the RAG pipeline and prepares the RAGAS Dataset.
@@ -75,27 +146,57 @@ class RAGEvaluator:
             test_data (List[Dict[str, str]]): The loaded ground truth data.
 
         Returns:
-            Dataset: A HuggingFace Dataset object formatted for RAGAS evaluation.
+            Dataset: A HuggingFace Dataset object formatted for RAGAS evaluation, without the failed questions.
+
+        Raises:
+            RuntimeError: If more than max_failure_rate of the questions failed, so the scores would be misleading.
         """
+        cache = self._load_cache()
+        keys = [self._cache_key(entry["question"]) for entry in test_data]
+        todo = {key: entry["question"] for key, entry in zip(keys, test_data) if key not in cache}
+
+        print(f"🚀 Starting evaluation for {len(test_data)} queries ({len(test_data) - len(todo)} cached)...")
+
+        # Retrieval for all pending questions is one batched search; only generation runs per question
+        retrieved = dict(zip(todo, self.chat_manager.retrieve_contexts_for_eval(list(todo.values()))))
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._run_pipeline, query, retrieved[key]): key for key, query in todo.items()}
+            for future in as_completed(futures):
+                key = futures[future]
+                query = todo[key]
+                try:
+                    cache[key] = future.result()
+                except Exception as e:
+                    print(f"❌ Failed: {query[:30]}... ({e})")
+                    failed.append(query)
+                    continue
+                self._append_to_cache(key, cache[key])
+                print(f"✅ Processed: {query[:30]}...")
+
+        if failed:
+            print(f"⚠️ {len(failed)} of {len(test_data)} questions failed and are left out of the scores.")
+            if len(failed) > self.max_failure_rate * len(test_data):
+                raise RuntimeError(
+                    f"{len(failed)} of {len(test_data)} questions failed, "
+                    f"more than the allowed {self.max_failure_rate:.0%}: {failed}"
+                )
+
         questions = []
         answers = []
         contexts = []
         ground_truths = []
 
-        print(f"🚀 Starting evaluation for {len(test_data)} queries...")
-
-        for entry in test_data:
-            query = entry["question"]
-            gt = entry["ground_truth"]
+        for key, entry in zip(keys, test_data):
+            if key not in cache:
+                continue
+            eval_result = cache[key]
 
-            eval_result = self.chat_manager.process_message_for_eval(query)
-
-            questions.append(query)
+            questions.append(entry["question"])
             answers.append(eval_result["answer"])
-            contexts.append([eval_result["context"]]) # RAGAS expects contexts as a list of strings for each question
-            ground_truths.append(gt)
-
-            print(f"✅ Processed: {query[:30]}...")
+            contexts.append(eval_result["context"])  # RAGAS expects contexts as a list of strings for each question
+            ground_truths.append(entry["ground_truth"])
 
         data_dict = {
             "question": questions,
@@ -1,10 +1,26 @@
+import asyncio
+import threading
+import time
 import uuid
-from typing import Dict, Any
+import numpy as np
+from typing import Dict, Any, Iterator, AsyncIterator, List, Tuple, Optional
+from backend.constants import LLMRole
 from backend.managers.knowledge_manager import KnowledgeManager
+from backend.services.context_assembler import ContextAssembler
 from backend.services.llm.llm_service import LLMService
-from backend.services.vector_db_service import VectorDBService
+from backend.services.llm.stream_parser import AnswerStreamParser
+from backend.services.llm.structured_output import StructuredAnswer, parse_structured
 from backend.services.telegram_service import TelegramService
-from config import VECTOR_SIMILARITY_THRESHOLD
+from backend.services.request_store import RequestStore, create_request_store, message_key
+from backend.services.vector_db_service import EmbeddingError
+from backend.utils.admission import OverloadedError
+from backend.utils.answer_cache import SemanticAnswerCache
+from backend.utils.metrics import metrics
+from backend.utils.single_flight import SingleFlight
+from backend.utils.text import normalize_text
+from config import (
+    VECTOR_SIMILARITY_THRESHOLD, KEYWORD_MATCH_THRESHOLD, STATUS_RECHECK_INTERVAL, DEFAULT_TENANT, TG_ADMIN_ID
+)
 
 
 class ChatManager:
@@ -13,71 +29,412 @@ class ChatManager:
     and Human-in-the-loop (HITL) Telegram alerts.
     """
 
-    def __init__(self, knowledge_manager: KnowledgeManager):
+    def __init__(
+        self,
+        knowledge_manager: KnowledgeManager,
+        request_store: Optional[RequestStore] = None,
+        tg_service: Optional[TelegramService] = None,
+        tenant_id: str = DEFAULT_TENANT,
+        tg_chat_id: str = TG_ADMIN_ID
+    ):
+        """
+        Args:
+            knowledge_manager: The knowledge base of the tenant (hotel) this manager serves.
+            request_store: Pending request state; shared by all tenants so webhooks can be routed.
+            tg_service: Delivers operator alerts; shared by all tenants.
+            tenant_id: Recorded on escalated requests, so operator replies reach the right tenant.
+            tg_chat_id: The tenant's operator chat.
+        """
+        self.tenant_id = tenant_id
+        self.tg_chat_id = tg_chat_id
         self.llm = LLMService()
-        self.db = VectorDBService()
-        self.tg_service = TelegramService()
+        self.tg_service = tg_service or TelegramService()
         self.knowledge_manager = knowledge_manager
-        self.pending_requests = {}  # Stores request details
-        self.msg_id_map = {}  # Index for Replies
+        self.db = knowledge_manager.db
+        self.request_store = request_store or create_request_store()  # Request details and the reply index
+        # Wakes long-polling clients on fulfillment: req_id -> [event, number of threads waiting on it]
+        self._status_events: Dict[str, List[Any]] = {}
+        self._async_status_waiters: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+        self._status_events_lock = threading.Lock()
+        self.context_assembler = ContextAssembler()
+        self.answer_cache = SemanticAnswerCache()
+        self.knowledge_manager.add_change_listener(self.answer_cache.clear)
+        self.in_flight = SingleFlight()  # Identical questions asked at the same time share one turn
 
+    @metrics.timed("chat_turn")
     def process_message(self, user_query: str) -> Dict[str, Any]:
         """
         Analyzes the user query, searches context, and either returns an answer
         or initiates a human operator request.
         """
-        vector_search_result = self.knowledge_manager.get_relevant_context(user_query)
+        # Known FAQ/operator question: answer without retrieval or LLM
+        exact_answer = self.knowledge_manager.find_exact_answer(user_query)
+        if exact_answer is not None:
+            return self._cached_result(exact_answer, "exact")
+
+        # The same question already in progress (e.g. a tour group asking at once): wait for its result
+        result, joined = self.in_flight.do(normalize_text(user_query), lambda: self._answer(user_query))
+        return self._joined_result(result) if joined else result
+
+    def _answer(self, user_query: str) -> Dict[str, Any]:
+        """Retrieval, LLM call and the direct/escalate decision of a turn that isn't an exact match."""
+        try:
+            query_embedding = self._embed_query(user_query)
+
+            # Near-duplicate of an already answered question: skip retrieval and LLM
+            cached_answer = self.answer_cache.get(query_embedding, self.llm.get_prompt_version())
+            if cached_answer is not None:
+                return self._cached_result(cached_answer, "semantic")
 
-        context = vector_search_result['documents'][0]
-        nearest_distance = vector_search_result['distances'][0][0]
+            context, is_context_relevant = self._retrieve(user_query, query_embedding)
+        except EmbeddingError as e:
+            return self._escalate_failed_retrieval(user_query, e)
 
         ai_response = self.llm.get_answer(user_query, context)
-        is_ai_confident = ai_response['confidence']
-        ai_answer = ai_response['answer']
+        return self._answer_or_escalate(user_query, query_embedding, ai_response, is_context_relevant)
 
-        if nearest_distance <= VECTOR_SIMILARITY_THRESHOLD and is_ai_confident:
+    async def process_message_async(self, user_query: str) -> Dict[str, Any]:
+        """
+        Async variant of process_message for the ASGI app. Query embedding, vector search and escalation
+        are short and run in worker threads; the LLM call, which takes seconds, is awaited on the event loop.
+        """
+        with metrics.timer("chat_turn"):
+            exact_answer = self.knowledge_manager.find_exact_answer(user_query)
+            if exact_answer is not None:
+                return self._cached_result(exact_answer, "exact")
+
+            result, joined = await self.in_flight.do_async(
+                normalize_text(user_query), lambda: self._answer_async(user_query)
+            )
+            return self._joined_result(result) if joined else result
+
+    async def _answer_async(self, user_query: str) -> Dict[str, Any]:
+        """Async variant of _answer."""
+        try:
+            query_embedding = await asyncio.to_thread(self._embed_query, user_query)
+
+            cached_answer = self.answer_cache.get(query_embedding, self.llm.get_prompt_version())
+            if cached_answer is not None:
+                return self._cached_result(cached_answer, "semantic")
+
+            context, is_context_relevant = await asyncio.to_thread(self._retrieve, user_query, query_embedding)
+        except EmbeddingError as e:
+            return await asyncio.to_thread(self._escalate_failed_retrieval, user_query, e)
+
+        ai_response = await self.llm.get_answer_async(user_query, context)
+        return await asyncio.to_thread(
+            self._answer_or_escalate, user_query, query_embedding, ai_response, is_context_relevant
+        )
+
+    def _answer_or_escalate(
+        self,
+        user_query: str,
+        query_embedding: np.ndarray,
+        ai_response: StructuredAnswer,
+        is_context_relevant: bool
+    ) -> Dict[str, Any]:
+        """Answers directly if both the retrieval and the model are confident, otherwise escalates to the operator."""
+        ai_answer = ai_response.answer
+
+        if is_context_relevant and ai_response.confidence:
+            self.answer_cache.put(query_embedding, ai_answer, self.llm.get_prompt_version())
+            metrics.inc("chat_responses_total", status="direct")
             return {"status": "direct", "answer": ai_answer}
         else:
-            # Create a unique ID for this specific interaction
-            req_id = str(uuid.uuid4())
-
-            # Send the alert to Telegram and receive a message ID
-            tg_msg_id = self.tg_service.send_alert(
-                request_id=req_id,
-                user_query=user_query,
-                ai_suggestion=ai_answer
-            )
+            return self._escalate(user_query, ai_answer)
 
-            # Store user_query, so we can learn from it later
-            self.pending_requests[req_id] = {
-                "status": "pending",
-                "user_query": user_query,
-                "answer": None,
-                "suggestion": ai_answer
-            }
+    @staticmethod
+    def _cached_result(answer: str, cache: str) -> Dict[str, Any]:
+        """Builds the direct response for an answer served from the exact-match index or the semantic cache."""
+        metrics.inc("chat_cache_hits_total", cache=cache)
+        metrics.inc("chat_responses_total", status="direct")
+        return {"status": "direct", "answer": answer, "cache_hit": True}
+
+    @staticmethod
+    def _joined_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        """A copy of a result shared from an identical in-flight question; a pending one is the same request."""
+        metrics.inc("chat_coalesced_total", status=result["status"])
+        return dict(result)
+
+    def _joined_events(self, result: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Stream events for a result shared from an identical in-flight question."""
+        result = self._joined_result(result)
+        if result["status"] == "direct":
+            yield "token", {"text": result["answer"]}
+        yield "result", result
+
+    def _embed_query(self, user_query: str) -> np.ndarray:
+        with metrics.timer("query_embedding"):
+            return self.knowledge_manager.embed_query(user_query)
+
+    def process_message_stream(self, user_query: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Streaming variant of process_message.
+
+        Yields:
+            Tuple[str, Dict[str, Any]]: ("token", {"text": ...}) events while a confident answer is generated,
+            then a single ("result", ...) event with the same payload process_message returns.
+        """
+        with metrics.timer("chat_turn"):
+            exact_answer = self.knowledge_manager.find_exact_answer(user_query)
+            if exact_answer is not None:
+                yield "token", {"text": exact_answer}
+                yield "result", self._cached_result(exact_answer, "exact")
+                return
+
+            key = normalize_text(user_query)
+            flight, shared = self.in_flight.lead_or_wait(key)
+            if flight is None:
+                yield from self._joined_events(shared)
+                return
+
+            # Waiting identical questions get the result as soon as it is known, not when this stream ends
+            try:
+                for event, payload in self._answer_stream(user_query):
+                    if event == "result":
+                        self.in_flight.end(key, flight, result=payload)
+                    yield event, payload
+            except Exception as e:
+                self.in_flight.end(key, flight, error=e)
+                raise
+            finally:
+                self.in_flight.end(key, flight)  # The client went away before the result: a waiter takes over
+
+    def _answer_stream(self, user_query: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Streaming variant of _answer."""
+        try:
+            query_embedding = self._embed_query(user_query)
+            cached_answer = self.answer_cache.get(query_embedding, self.llm.get_prompt_version())
+            if cached_answer is None:
+                context, is_context_relevant = self._retrieve(user_query, query_embedding)
+        except EmbeddingError as e:
+            yield "result", self._escalate_failed_retrieval(user_query, e)
+            return
+
+        if cached_answer is not None:
+            yield "token", {"text": cached_answer}
+            yield "result", self._cached_result(cached_answer, "semantic")
+            return
+
+        # Weak retrieval goes to the operator anyway, so the suggestion is never shown to the guest
+        if not is_context_relevant:
+            ai_response = self.llm.get_answer(user_query, context)
+            yield "result", self._escalate(user_query, ai_response.answer)
+            return
+
+        # Tokens are only released once the model has declared itself confident
+        parser = AnswerStreamParser()
+        streamed = 0
+        try:
+            for delta in self.llm.stream_answer(user_query, context):
+                parser.feed(delta)
+                if parser.confidence and len(parser.answer) > streamed:
+                    yield "token", {"text": parser.answer[streamed:]}
+                    streamed = len(parser.answer)
+        except OverloadedError:
+            raise  # Not admitted: the client is told to retry, nothing is escalated
+        except Exception as e:
+            print(f"⚠️ Streaming Error: {str(e)}")
+            metrics.inc("chat_errors_total", stage="llm_stream")
+            yield "result", self._escalate(user_query, f"⚠️ Error processing request: {str(e)}")
+            return
+
+        yield from self._finish_stream(user_query, query_embedding, parser, streamed)
+
+    async def process_message_stream_async(self, user_query: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Async variant of process_message_stream, yielding the same events."""
+        with metrics.timer("chat_turn"):
+            exact_answer = self.knowledge_manager.find_exact_answer(user_query)
+            if exact_answer is not None:
+                yield "token", {"text": exact_answer}
+                yield "result", self._cached_result(exact_answer, "exact")
+                return
+
+            key = normalize_text(user_query)
+            flight, shared = await self.in_flight.lead_or_wait_async(key)
+            if flight is None:
+                for event in self._joined_events(shared):
+                    yield event
+                return
+
+            try:
+                async for event, payload in self._answer_stream_async(user_query):
+                    if event == "result":
+                        self.in_flight.end(key, flight, result=payload)
+                    yield event, payload
+            except Exception as e:
+                self.in_flight.end(key, flight, error=e)
+                raise
+            finally:
+                self.in_flight.end(key, flight)
 
-            # Map the message ID -> UUID connection
-            if tg_msg_id:
-                self.msg_id_map[tg_msg_id] = req_id
+    async def _answer_stream_async(self, user_query: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Async variant of _answer_stream."""
+        try:
+            query_embedding = await asyncio.to_thread(self._embed_query, user_query)
+            cached_answer = self.answer_cache.get(query_embedding, self.llm.get_prompt_version())
+            if cached_answer is None:
+                context, is_context_relevant = await asyncio.to_thread(self._retrieve, user_query, query_embedding)
+        except EmbeddingError as e:
+            yield "result", await asyncio.to_thread(self._escalate_failed_retrieval, user_query, e)
+            return
 
-            return {"status": "pending", "request_id": req_id}
+        if cached_answer is not None:
+            yield "token", {"text": cached_answer}
+            yield "result", self._cached_result(cached_answer, "semantic")
+            return
 
-    def process_message_for_eval(self, user_query: str) -> Dict[str, Any]:
+        if not is_context_relevant:
+            ai_response = await self.llm.get_answer_async(user_query, context)
+            yield "result", await asyncio.to_thread(self._escalate, user_query, ai_response.answer)
+            return
+
+        parser = AnswerStreamParser()
+        streamed = 0
+        try:
+            async for delta in self.llm.stream_answer_async(user_query, context):
+                parser.feed(delta)
+                if parser.confidence and len(parser.answer) > streamed:
+                    yield "token", {"text": parser.answer[streamed:]}
+                    streamed = len(parser.answer)
+        except OverloadedError:
+            raise  # Not admitted: the client is told to retry, nothing is escalated
+        except Exception as e:
+            print(f"⚠️ Streaming Error: {str(e)}")
+            metrics.inc("chat_errors_total", stage="llm_stream")
+            yield "result", await asyncio.to_thread(self._escalate, user_query, f"⚠️ Error processing request: {str(e)}")
+            return
+
+        for event in await asyncio.to_thread(list, self._finish_stream(user_query, query_embedding, parser, streamed)):
+            yield event
+
+    def _finish_stream(
+        self,
+        user_query: str,
+        query_embedding: np.ndarray,
+        parser: AnswerStreamParser,
+        streamed: int
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yields the rest of a confident streamed answer and the result event, or escalates."""
+        ai_response = parse_structured(parser.buffer, LLMRole.ASSISTANT)
+        if ai_response is not None:
+            is_ai_confident = ai_response.confidence
+            ai_answer = ai_response.answer
+        else:
+            is_ai_confident = bool(parser.confidence) and parser.answer_complete
+            ai_answer = parser.answer or parser.buffer
+
+        if is_ai_confident:
+            if len(ai_answer) > streamed:
+                yield "token", {"text": ai_answer[streamed:]}
+            self.answer_cache.put(query_embedding, ai_answer, self.llm.get_prompt_version())
+            metrics.inc("chat_responses_total", status="direct")
+            yield "result", {"status": "direct", "answer": ai_answer}
+        else:
+            yield "result", self._escalate(user_query, ai_answer)
+
+    def _retrieve(self, user_query: str, query_embedding: np.ndarray) -> Tuple[List[str], bool]:
+        """
+        Returns the assembled context chunks and whether the retrieval is relevant enough to answer from:
+        the nearest chunk is within the similarity threshold, or a chunk contains all query keywords.
+        """
+        with metrics.timer("retrieval"):
+            search_result = self.knowledge_manager.get_relevant_context(user_query, query_embedding)
+        return self._select_context(search_result, query_embedding)
+
+    def _select_context(self, search_result: Dict[str, Any], query_embedding: np.ndarray) -> Tuple[List[str], bool]:
+        """Assembles the prompt context from one query's search result and checks its relevance."""
+        # Deduplicated, budgeted and relevance-ordered chunks for the prompt
+        with metrics.timer("context_assembly"):
+            context = self.context_assembler.assemble(search_result, query_embedding)
+
+        nearest_distance = min(search_result['distances'][0], default=float("inf"))
+        best_keyword_score = max(search_result.get('keyword_scores', [[]])[0], default=0.0)
+
+        is_relevant = nearest_distance <= VECTOR_SIMILARITY_THRESHOLD or best_keyword_score >= KEYWORD_MATCH_THRESHOLD
+        return context, is_relevant
+
+    def _escalate_failed_retrieval(self, user_query: str, error: Exception) -> Dict[str, Any]:
+        """Hands a question the knowledge base couldn't be searched for (embedding failed) to the operator."""
+        print(f"⚠️ Retrieval Error: {str(error)}")
+        metrics.inc("chat_errors_total", stage="retrieval")
+        return self._escalate(user_query, f"⚠️ Error processing request: {str(error)}")
+
+    def _escalate(self, user_query: str, ai_answer: str) -> Dict[str, Any]:
+        """Registers a pending request and queues the operator alert. The request fails if the alert queue is full."""
+        # Create a unique ID for this specific interaction
+        req_id = str(uuid.uuid4())
+
+        # Store user_query, so we can learn from it later
+        self.request_store.create(req_id, user_query=user_query, suggestion=ai_answer, tenant_id=self.tenant_id)
+
+        def on_delivered(tg_msg_id: int) -> None:
+            # Map the (chat, message ID) -> UUID connection
+            self.request_store.link_message(message_key(self.tg_chat_id, tg_msg_id), req_id)
+
+        # Hand the alert to the background delivery queue, the guest doesn't wait for Telegram
+        queued = self.tg_service.enqueue_alert(
+            request_id=req_id,
+            user_query=user_query,
+            ai_suggestion=ai_answer,
+            on_delivered=on_delivered,
+            chat_id=self.tg_chat_id
+        )
+        if not queued:
+            # No operator will ever see this request, so don't leave the guest waiting for one
+            self.request_store.fail(req_id)
+            metrics.inc("chat_errors_total", stage="escalation")
+            metrics.inc("chat_responses_total", status="failed")
+            return {
+                "status": "failed",
+                "request_id": req_id,
+                "error": "Our front desk can't be reached right now, please try again in a moment."
+            }
+
+        metrics.inc("chat_responses_total", status="pending")
+        return {"status": "pending", "request_id": req_id}
+
+    def process_message_for_eval(self, user_query: str, context: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Evaluation-only contract: returns the exact context used and the answer — just data for RAGAS.
+        A context already retrieved by retrieve_contexts_for_eval can be passed in to skip retrieval.
+        Raises RuntimeError if the LLM call failed, so the error text is never cached or scored as an answer.
         """
-        context, distance = self.knowledge_manager.get_relevant_context(user_query)
-        ai_answer, is_ai_confident = self.llm.get_answer(user_query, context)
+        if context is None:
+            query_embedding = self.knowledge_manager.embed_query(user_query)
+            context, _ = self._retrieve(user_query, query_embedding)
+        ai_response = self.llm.get_answer(user_query, context)
+        if not ai_response.ok:
+            raise RuntimeError(ai_response.answer)
+
+        return {"answer": ai_response.answer, "context": context}
 
-        return {"answer": ai_answer, "context": context}
+    def retrieve_contexts_for_eval(self, user_queries: List[str]) -> List[List[str]]:
+        """Retrieves the prompt context of many queries with one embedding call and one vector search."""
+        if not user_queries:
+            return []
+        query_embeddings = self.knowledge_manager.embed_queries(user_queries)
+        with metrics.timer("retrieval"):
+            search_results = self.knowledge_manager.get_relevant_contexts(user_queries, query_embeddings)
+        return [
+            self._select_context(search_result, query_embedding)[0]
+            for search_result, query_embedding in zip(search_results, query_embeddings)
+        ]
+
+    def process_messages_for_eval(self, user_queries: List[str]) -> List[Dict[str, Any]]:
+        """Batch variant of process_message_for_eval: retrieval is batched, answers are generated in order."""
+        contexts = self.retrieve_contexts_for_eval(user_queries)
+        return [
+            self.process_message_for_eval(user_query, context)
+            for user_query, context in zip(user_queries, contexts)
+        ]
 
     def fulfill_request(self, req_id: str, final_answer: str) -> None:
         """
         Completes a pending request and updates the knowledge base with the verified answer.
         """
-        if req_id in self.pending_requests:
-            request_data = self.pending_requests[req_id]
-
+        request_data = self.request_store.get(req_id)
+        if request_data:
             # 1. Save the human-verified answer to the vector database
             self.knowledge_manager.save_operator_answer(
                 question=request_data["user_query"],
@@ -85,21 +442,87 @@ class ChatManager:
             )
 
             # 2. Update status
-            request_data["status"] = "completed"
-            request_data["answer"] = final_answer
+            self.request_store.complete(req_id, final_answer)
             print(f"✅ Request {req_id} fulfilled and indexed.")
 
+            # 3. Wake up clients waiting on this request in this process
+            with self._status_events_lock:
+                status_entry = self._status_events.pop(req_id, None)
+                async_waiters = self._async_status_waiters.pop(req_id, [])
+            if status_entry:
+                status_entry[0].set()
+            for loop, waiter in async_waiters:
+                loop.call_soon_threadsafe(waiter.set)  # Fulfillment runs on a webhook thread, not the waiter's loop
+
     def fulfill_by_msg_id(self, msg_id: int, final_answer: str) -> bool:
         """
-        Matches a Telegram reply to a specific user request using message ID.
+        Matches a Telegram reply in this tenant's operator chat to a specific user request using message ID.
         """
-        req_id = self.msg_id_map.get(msg_id)
+        req_id = self.request_store.pop_message(message_key(self.tg_chat_id, msg_id))
         if req_id:
             self.fulfill_request(req_id, final_answer)
-            del self.msg_id_map[msg_id]
             return True
         return False
 
+    def get_request(self, req_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the stored request details, or None if unknown or expired."""
+        return self.request_store.get(req_id)
+
     def check_status(self, req_id: str):
         """Checks the current status of a pending request for frontend polling."""
-        return self.pending_requests.get(req_id, {"status": "not_found"})
+        return self.request_store.get(req_id) or {"status": "not_found"}
+
+    def wait_for_status(self, req_id: str, timeout: float):
+        """
+        Long-poll variant of check_status: blocks until the request is fulfilled
+        or the timeout expires, then returns the current status.
+        Fulfillments in this process wake the waiter at once; ones handled by another
+        worker are picked up on the next store re-check.
+        """
+        deadline = time.monotonic() + timeout
+        with self._status_events_lock:
+            status_entry = self._status_events.setdefault(req_id, [threading.Event(), 0])
+            status_entry[1] += 1
+
+        try:
+            while True:
+                status_info = self.check_status(req_id)
+                remaining = deadline - time.monotonic()
+                if status_info["status"] != "pending" or remaining <= 0:
+                    return status_info
+                status_entry[0].wait(min(remaining, STATUS_RECHECK_INTERVAL))
+        finally:
+            # The last waiter drops the event, so abandoned and expired requests leave nothing behind
+            with self._status_events_lock:
+                status_entry[1] -= 1
+                if not status_entry[1] and self._status_events.get(req_id) is status_entry:
+                    del self._status_events[req_id]
+
+    async def wait_for_status_async(self, req_id: str, timeout: float):
+        """
+        Async variant of wait_for_status: a waiting client costs an event, not a thread,
+        so thousands of guests can wait for operators at once.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        waiter = asyncio.Event()
+        with self._status_events_lock:
+            self._async_status_waiters.setdefault(req_id, []).append((loop, waiter))
+
+        try:
+            while True:
+                status_info = self.check_status(req_id)
+                remaining = deadline - loop.time()
+                if status_info["status"] != "pending" or remaining <= 0:
+                    return status_info
+                try:
+                    await asyncio.wait_for(waiter.wait(), min(remaining, STATUS_RECHECK_INTERVAL))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._status_events_lock:
+                waiters = self._async_status_waiters.get(req_id, [])
+                if (loop, waiter) in waiters:
+                    waiters.remove((loop, waiter))
+                if not waiters:
+                    self._async_status_waiters.pop(req_id, None)
@@ -1,8 +1,23 @@
+from typing import Optional
 from backend.managers.knowledge_manager import KnowledgeManager
 from backend.managers.chat_manager import ChatManager
+from backend.managers.tenant_registry import TenantConfig, TenantRegistry, load_tenant_configs
+from backend.services.llm.llm_service import LLMService
+from backend.services.operator_knowledge_store import OperatorKnowledgeStore
+from backend.services.request_store import RequestStore, create_request_store
+from backend.services.telegram_service import TelegramService
+from backend.services.vector_db_service import Embedder, get_vector_db
+from config import EMBEDDING_MODEL, VECTOR_DB_LAZY_OPEN, TENANT_MAX_ACTIVE
 
 
-def create_app_manager(load_data: bool = True) -> ChatManager:
+def create_app_manager(
+    load_data: bool = True,
+    embedder: Optional[Embedder] = None,
+    embedding_model: str = EMBEDDING_MODEL,
+    tenant: Optional[TenantConfig] = None,
+    request_store: Optional[RequestStore] = None,
+    tg_service: Optional[TelegramService] = None
+) -> ChatManager:
     """
     Creates and bootstraps the KnowledgeManager and ChatManager.
     Returns a ready-to-use ChatManager instance.
@@ -10,11 +25,73 @@ def create_app_manager(load_data: bool = True) -> ChatManager:
     Args:
         load_data: if True, sync FAQ/operator knowledge into the vector DB.
                   For evaluation runs against an already-prepared DB, set to False.
+        embedder: computes document and query vectors; defaults to LLMService.embed_content.
+                  Benchmarks pass a local stand-in here.
+        embedding_model: identifies the embedder's vector space in the sync manifest.
+        tenant: the hotel to serve; defaults to the single-hotel setup from config.py.
+        request_store, tg_service: shared across tenants by the TenantRegistry; created if omitted.
     """
-    knowledge_manager = KnowledgeManager()
+    tenant = tenant or TenantConfig.default()
+
+    # Both managers share the process-wide vector DB client and the tenant's collection
+    db = get_vector_db(
+        collection=tenant.collection,
+        embedder=embedder or LLMService().embed_content,
+        embedding_model=embedding_model,
+        lazy=VECTOR_DB_LAZY_OPEN
+    )
+    operator_store = OperatorKnowledgeStore(
+        snapshot_path=tenant.operator_knowledge_path,
+        journal_path=tenant.operator_journal_path
+    )
+    operator_store.start_compactor()
+    knowledge_manager = KnowledgeManager(
+        db=db,
+        operator_store=operator_store,
+        faq_path=tenant.faq_path,
+        manifest_path=tenant.manifest_path
+    )
 
     if load_data:
         knowledge_manager.load_faq_data()
         knowledge_manager.load_operator_knowledge()
 
-    return ChatManager(knowledge_manager=knowledge_manager)
+    return ChatManager(
+        knowledge_manager=knowledge_manager,
+        request_store=request_store,
+        tg_service=tg_service,
+        tenant_id=tenant.tenant_id,
+        tg_chat_id=tenant.tg_chat_id
+    )
+
+
+def create_tenant_registry(
+    embedder: Optional[Embedder] = None,
+    embedding_model: str = EMBEDDING_MODEL,
+    max_active: int = TENANT_MAX_ACTIVE,
+    watch_files: bool = True
+) -> TenantRegistry:
+    """
+    Creates the registry of all configured tenants (see TENANTS_PATH), sharing one request store,
+    one Telegram delivery queue and one embedder between them. Tenants are loaded on first use.
+    """
+    request_store = create_request_store()
+    tg_service = TelegramService()
+    embedder = embedder or LLMService().embed_content
+
+    def build_manager(tenant: TenantConfig) -> ChatManager:
+        return create_app_manager(
+            embedder=embedder,
+            embedding_model=embedding_model,
+            tenant=tenant,
+            request_store=request_store,
+            tg_service=tg_service
+        )
+
+    return TenantRegistry(
+        configs=load_tenant_configs(),
+        build_manager=build_manager,
+        request_store=request_store,
+        max_active=max_active,
+        watch_files=watch_files
+    )
@@ -1,11 +1,20 @@
 import json
 import hashlib
 import os
-from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple, Set
-from backend.services.vector_db_service import VectorDBService
+import difflib
+import threading
+from typing import List, Dict, Any, Optional, Set, Callable
+import numpy as np
+from backend.services.vector_db_service import VectorDBService, get_vector_db
+from backend.services.operator_knowledge_store import OperatorKnowledgeStore
+from backend.services.llm.llm_service import LLMService
 from backend.constants import KnowledgeSource
-from config import FAQ_PATH, OPERATOR_KNOWLEDGE_PATH
+from backend.utils.metrics import metrics
+from backend.utils.text import normalize_text
+from config import (
+    FAQ_PATH, KNOWLEDGE_MANIFEST_PATH, EMBEDDING_MODEL, SEARCH_MODE, EXACT_MATCH_FUZZY_CUTOFF,
+    CONTEXT_CANDIDATES
+)
 
 
 class KnowledgeManager:
@@ -14,66 +23,170 @@ class KnowledgeManager:
     vector database updates, and memory caching for API responses.
     """
 
-    def __init__(self):
-        self.db = VectorDBService()
+    def __init__(
+        self,
+        db: Optional[VectorDBService] = None,
+        operator_store: Optional[OperatorKnowledgeStore] = None,
+        faq_path=FAQ_PATH,
+        manifest_path=KNOWLEDGE_MANIFEST_PATH
+    ):
+        """
+        Args:
+            db: The vector DB service of the knowledge base's collection.
+            operator_store: Persists operator answers; defaults to the operator knowledge files in config.py.
+            faq_path: The FAQ JSON file.
+            manifest_path: Where the sync manifest of this collection is kept.
+        """
+        self.faq_path = faq_path
+        self.manifest_path = manifest_path
+        self.db = db or get_vector_db(embedder=LLMService().embed_content, embedding_model=EMBEDDING_MODEL)
+        if operator_store is None:
+            operator_store = OperatorKnowledgeStore()  # Snapshot + journal of operator answers
+            operator_store.start_compactor()
+        self.operator_store = operator_store
         self._faq_cache = {}
         self._operator_cache = []
+        self._faq_answers: Dict[str, str] = {}  # Normalized question -> answer, for the exact-match fast path
+        self._operator_answers: Dict[str, str] = {}
+        self._change_listeners: List[Callable[[], None]] = []
+        self._sync_lock = threading.RLock()
+        self._manifest: Dict[str, Any] = self._load_manifest()  # Embedding model and {source: {doc_id: content_hash}}
 
     @staticmethod
     def _generate_id(text: str) -> str:
         """Creates a stable MD5 hash for a given text string."""
         return hashlib.md5(text.encode('utf-8')).hexdigest()
 
-    def _sync_to_db(self, new_data: Dict[str, Dict[str, Any]], source: KnowledgeSource):
+    def add_change_listener(self, callback: Callable[[], None]) -> None:
+        """Registers a callback that is invoked whenever indexed documents change."""
+        self._change_listeners.append(callback)
+
+    def _notify_change(self) -> None:
+        """Lets dependent caches know that the underlying documents changed."""
+        for callback in self._change_listeners:
+            callback()
+
+    @staticmethod
+    def _content_hash(item: Dict[str, Any]) -> str:
+        """Hashes a document together with its metadata, so any change to either triggers a re-embed."""
+        return hashlib.md5(json.dumps(item, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        """Loads the persisted document id -> content hash manifest, or an empty one."""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        manifest.setdefault("embedding_model", None)
+        manifest.setdefault("sources", {})
+        return manifest
+
+    def _ensure_embedding_model(self) -> None:
+        """Rebuilds the collection from scratch if it was indexed with a different (or unknown) embedding model."""
+        if self._manifest["embedding_model"] != self.db.embedding_model:
+            print(f"♻️ Embedding model changed to {self.db.embedding_model}, rebuilding the vector index.")
+            self.db.reset()
+            self._manifest = {"embedding_model": self.db.embedding_model, "sources": {}}
+
+    def _save_manifest(self) -> None:
+        """Atomically persists the manifest next to the vector DB."""
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    @metrics.timed("kb_sync")
+    def _sync_to_db(self, new_data: Dict[str, Dict[str, Any]], source: KnowledgeSource) -> Dict[str, int]:
         """
-        Compares existing DB IDs with new IDs, removes orphans, and upserts current data.
+        Compares the new data with the manifest and the DB, removes orphans,
+        and upserts only the added or changed items.
+
+        Returns:
+            Dict[str, int]: Counts of added, updated, removed and unchanged documents.
         """
-        new_ids: Set[str] = set(new_data.keys())
+        with self._sync_lock:
+            self._ensure_embedding_model()
+            known_hashes = self._manifest["sources"].get(source.value, {})
+            new_hashes = {doc_id: self._content_hash(item) for doc_id, item in new_data.items()}
 
-        # 1. Get existing IDs from DB for this source
-        existing_ids: Set[str] = set(self.db.get_ids_by_metadata({"source": source.value}))
+            # 1. Get existing IDs from DB for this source (the DB wins if it was wiped or edited elsewhere)
+            existing_ids: Set[str] = set(self.db.get_ids_by_metadata({"source": source.value}))
 
-        # 2. Identify and remove IDs no longer present in the source
-        ids_to_remove = list(existing_ids - new_ids)
-        self.db.delete_by_ids(ids_to_remove)
+            # 2. Identify and remove IDs no longer present in the source
+            ids_to_remove = list(existing_ids - set(new_hashes))
+            self.db.delete_by_ids(ids_to_remove)
 
-        # 3. Upsert current items
-        self.db.upsert_batch(
-            documents=[v["text"] for v in new_data.values()],
-            ids=list(new_data.keys()),
-            metadatas=[v["metadata"] for v in new_data.values()]
-        )
+            # 3. Upsert only new or changed items
+            ids_to_upsert = [
+                doc_id for doc_id, content_hash in new_hashes.items()
+                if doc_id not in existing_ids or known_hashes.get(doc_id) != content_hash
+            ]
+            self.db.upsert_batch(
+                documents=[new_data[doc_id]["text"] for doc_id in ids_to_upsert],
+                ids=ids_to_upsert,
+                metadatas=[new_data[doc_id]["metadata"] for doc_id in ids_to_upsert]
+            )
 
-    def load_faq_data(self) -> None:
+            self._manifest["sources"][source.value] = new_hashes
+            self._save_manifest()
+
+        if ids_to_remove or ids_to_upsert:
+            self._notify_change()
+
+        added = len([doc_id for doc_id in ids_to_upsert if doc_id not in existing_ids])
+        return {
+            "added": added,
+            "updated": len(ids_to_upsert) - added,
+            "removed": len(ids_to_remove),
+            "unchanged": len(new_data) - len(ids_to_upsert)
+        }
+
+    @staticmethod
+    def _format_report(report: Dict[str, int]) -> str:
+        """Formats sync counts for logging."""
+        return ", ".join(f"{count} {action}" for action, count in report.items())
+
+    def load_faq_data(self) -> Dict[str, int]:
         """
-        Loads data from a file, updates the memory cache, and syncs with Vector DB.
+        Loads data from a file, syncs it with Vector DB and then swaps the memory caches.
+        Everything is built aside first, so readers see either the old or the new FAQ, never a mix;
+        an unreadable file raises before anything is replaced. Returns the sync counts.
         """
         # Prepare FAQ data
-        with open(FAQ_PATH, 'r', encoding='utf-8') as f:
+        with open(self.faq_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
-            self._faq_cache = data
 
-            processed_items = {}
-            for cat_id, questions in data.get('faq', {}).items():
-                for item in questions:
-                    text = f"Question: {item['q']} Answer: {item['a']}"
-                    item_id = self._generate_id(text)
-                    processed_items[item_id] = {
-                        "text": text,
-                        "metadata": {"source": KnowledgeSource.FAQ.value}
-                    }
+        processed_items = {}
+        faq_answers = {}
+        for cat_id, questions in data.get('faq', {}).items():
+            for item in questions:
+                faq_answers[normalize_text(item['q'])] = item['a']
+                text = f"Question: {item['q']} Answer: {item['a']}"
+                item_id = self._generate_id(text)
+                processed_items[item_id] = {
+                    "text": text,
+                    "metadata": {"source": KnowledgeSource.FAQ.value}
+                }
+
+        report = self._sync_to_db(processed_items, KnowledgeSource.FAQ)
+        self._faq_cache, self._faq_answers = data, faq_answers
+        print(f"✅ Knowledge Sync: Vector DB updated from the FAQ source ({self._format_report(report)}).")
+        return report
 
-            self._sync_to_db(processed_items, KnowledgeSource.FAQ)
-            print("✅ Knowledge Sync: Vector DB updated from the FAQ source.")
+    def load_operator_knowledge(self) -> Optional[Dict[str, int]]:
+        """Loads operator knowledge (snapshot plus journal) and syncs with Vector DB. Returns the sync counts."""
+        if not self.operator_store.exists():
+            return None
 
-    def load_operator_knowledge(self) -> None:
-        """Loads operator knowledge and syncs with Vector DB."""
-        if os.path.exists(OPERATOR_KNOWLEDGE_PATH):
-            with open(OPERATOR_KNOWLEDGE_PATH, 'r', encoding='utf-8') as f:
-                self._operator_cache = json.load(f)
+        # Held across load and swap, so an answer saved meanwhile is not dropped from the caches
+        with self._sync_lock:
+            operator_cache = self.operator_store.load()
 
             processed_items = {}
-            for item in self._operator_cache:
+            operator_answers = {normalize_text(item['q']): item['a'] for item in operator_cache}
+            for item in operator_cache:
                 text = f"Question: {item['q']} Answer: {item['a']}"
                 item_id = self._generate_id(item['q'])  # ID based on question only to allow updates
                 processed_items[item_id] = {
@@ -84,8 +197,10 @@ class KnowledgeManager:
                     }
                 }
 
-            self._sync_to_db(processed_items, KnowledgeSource.OPERATOR)
-            print(f"🧠 Operator knowledge synced.")
+            report = self._sync_to_db(processed_items, KnowledgeSource.OPERATOR)
+            self._operator_cache, self._operator_answers = operator_cache, operator_answers
+            print(f"🧠 Operator knowledge synced ({self._format_report(report)}).")
+            return report
 
     def get_categories(self) -> List[Dict[str, Any]]:
         """Returns the cached list of FAQ categories."""
@@ -96,49 +211,82 @@ class KnowledgeManager:
         return self._faq_cache['faq'][category_id]
 
     def save_operator_answer(self, question: str, answer: str):
-        """Saves a new human answer to a knowledge file."""
-        new_entry = {
-            "q": question,
-            "a": answer,
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        """Saves a new human answer to the operator knowledge journal and the vector database."""
+        # One journal append; an existing answer to the same question is replaced in the index
+        new_entry = self.operator_store.save(question, answer)
+
+        doc_id = self._generate_id(question)
+        item = {
+            "text": f"Question: {question} Answer: {answer}",
+            "metadata": {
+                "source": KnowledgeSource.OPERATOR.value,
+                "created_at": new_entry["created_at"]
+            }
         }
 
-        # Load existing, append and save
-        if not os.path.exists(OPERATOR_KNOWLEDGE_PATH):
-            with open(OPERATOR_KNOWLEDGE_PATH, 'w', encoding='utf-8') as f:
-                json.dump([], f)
+        with self._sync_lock:
+            self._operator_answers[normalize_text(question)] = answer
+            self._ensure_embedding_model()
+            self.db.upsert_batch(documents=[item["text"]], ids=[doc_id], metadatas=[item["metadata"]])
+            # Persisted with the next sync; if that never happens, the next load re-embeds just this document
+            self._manifest["sources"].setdefault(KnowledgeSource.OPERATOR.value, {})[doc_id] = self._content_hash(item)
 
-        with open(OPERATOR_KNOWLEDGE_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        self._notify_change()
 
-        # Search if such a question already exists
-        existing_idx = next((i for i, item in enumerate(data) if item['q'] == question), None)
+        print(f"🧠 Operator knowledge saved for future use.")
 
-        if existing_idx:
-            # If found, replace the old answer with a new one
-            data[existing_idx] = new_entry
-        else:
-            # If not found, add it
-            data.append(new_entry)
+    def find_exact_answer(self, query: str) -> Optional[str]:
+        """
+        Returns the stored answer if the query is a known FAQ or operator question
+        (ignoring case, punctuation and whitespace), otherwise None.
+        Fuzzy matching is used only when EXACT_MATCH_FUZZY_CUTOFF is set.
+        """
+        key = normalize_text(query)
+        for answers in (self._faq_answers, self._operator_answers):
+            if key in answers:
+                return answers[key]
 
-        # Save the updated list back to the file
-        with open(OPERATOR_KNOWLEDGE_PATH, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        if EXACT_MATCH_FUZZY_CUTOFF > 0:
+            for answers in (self._faq_answers, self._operator_answers):
+                matches = difflib.get_close_matches(key, list(answers), n=1, cutoff=EXACT_MATCH_FUZZY_CUTOFF)
+                if matches:
+                    return answers[matches[0]]
+        return None
 
-        doc_id = self._generate_id(question)
-        text = f"Question: {question} Answer: {answer}"
+    def get_kb_version(self) -> str:
+        """Returns a hash identifying the currently indexed documents and embedding model."""
+        return hashlib.md5(json.dumps(self._manifest, sort_keys=True).encode('utf-8')).hexdigest()
 
-        self.db.upsert_batch(
-            documents=[text],
-            ids=[doc_id],
-            metadatas=[{
-                "source": KnowledgeSource.OPERATOR.value,
-                "created_at": new_entry["created_at"]
-            }]
-        )
+    def embed_query(self, query: str) -> np.ndarray:
+        """Embeds a user query the same way the vector database does for search."""
+        return self.db.embed_query(query)
 
-        print(f"🧠 Operator knowledge saved for future use.")
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embeds many user queries in one call."""
+        return self.db.embed_queries(queries)
 
-    def get_relevant_context(self, query: str) -> Tuple[Optional[str], float]:
-        """Queries the vector database for the most relevant context."""
-        return self.db.search(query)
+    def get_relevant_context(
+        self,
+        query: str,
+        query_embedding: Optional[np.ndarray] = None,
+        n_results: int = CONTEXT_CANDIDATES
+    ) -> Dict[str, Any]:
+        """
+        Queries the vector database (and keyword index in hybrid mode) for the most relevant context.
+        Document vectors are included so the context assembler can drop near-duplicates.
+        """
+        return self.db.search(
+            query, n_results=n_results, query_embedding=query_embedding, mode=SEARCH_MODE, include_embeddings=True
+        )
+
+    def get_relevant_contexts(
+        self,
+        queries: List[str],
+        query_embeddings: Optional[np.ndarray] = None,
+        n_results: int = CONTEXT_CANDIDATES
+    ) -> List[Dict[str, Any]]:
+        """Batch variant of get_relevant_context: one search for all queries, one result per query."""
+        results = self.db.search_batch(
+            queries, n_results=n_results, query_embeddings=query_embeddings, mode=SEARCH_MODE, include_embeddings=True
+        )
+        return self.db.split_results(results)
@@ -0,0 +1,271 @@
+import asyncio
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from backend.managers.chat_manager import ChatManager
+from backend.services.request_store import RequestStore, message_key
+from backend.services.vector_db_service import release_vector_db
+from backend.utils.metrics import metrics
+from backend.utils.watcher import KnowledgeWatcher, start_knowledge_watcher
+from config import (
+    PROJECT_ROOT, DEFAULT_TENANT, TENANTS_PATH, TENANTS_DIR, TENANT_MAX_ACTIVE, VECTOR_DB_PATH,
+    FAQ_PATH, OPERATOR_KNOWLEDGE_PATH, OPERATOR_JOURNAL_PATH, KNOWLEDGE_MANIFEST_PATH, TG_ADMIN_ID,
+    STATUS_RECHECK_INTERVAL
+)
+
+# Tenant ids become part of collection and file names; Chroma requires names to start and end alphanumeric
+TENANT_ID_PATTERN = re.compile(r"^[A-Za-z0-9](?:[A-Za-z0-9_-]{0,38}[A-Za-z0-9])?$")
+
+
+class UnknownTenantError(KeyError):
+    """Raised when a request names a tenant that is not configured."""
+
+
+class TenantConfig:
+    """Where one hotel's knowledge lives and which operator chat receives its escalations."""
+
+    def __init__(
+        self,
+        tenant_id: str,
+        collection: str,
+        faq_path,
+        operator_knowledge_path,
+        operator_journal_path,
+        manifest_path,
+        tg_chat_id: str
+    ):
+        self.tenant_id = tenant_id
+        self.collection = collection
+        self.faq_path = Path(faq_path)
+        self.operator_knowledge_path = Path(operator_knowledge_path)
+        self.operator_journal_path = Path(operator_journal_path)
+        self.manifest_path = Path(manifest_path)
+        self.tg_chat_id = tg_chat_id
+
+    @classmethod
+    def default(cls) -> "TenantConfig":
+        """The single-hotel setup from config.py."""
+        return cls(
+            tenant_id=DEFAULT_TENANT,
+            collection="hotel_knowledge",
+            faq_path=FAQ_PATH,
+            operator_knowledge_path=OPERATOR_KNOWLEDGE_PATH,
+            operator_journal_path=OPERATOR_JOURNAL_PATH,
+            manifest_path=KNOWLEDGE_MANIFEST_PATH,
+            tg_chat_id=TG_ADMIN_ID
+        )
+
+    @classmethod
+    def from_dict(cls, tenant_id: str, overrides: Dict[str, str]) -> "TenantConfig":
+        """Builds a tenant with its files under TENANTS_DIR/<tenant_id>/, unless overridden (relative to the project)."""
+        if not TENANT_ID_PATTERN.match(tenant_id):
+            raise ValueError(
+                f"Invalid tenant id {tenant_id!r}: use up to 40 letters, digits, '-' or '_', "
+                "starting and ending with a letter or digit"
+            )
+
+        tenant_dir = TENANTS_DIR / tenant_id
+
+        def path(key: str, default: Path) -> Path:
+            return PROJECT_ROOT / overrides[key] if key in overrides else default
+
+        return cls(
+            tenant_id=tenant_id,
+            collection=overrides.get("collection", f"hotel_knowledge_{tenant_id}"),
+            faq_path=path("faq_path", tenant_dir / "knowledge_base.json"),
+            operator_knowledge_path=path("operator_knowledge_path", tenant_dir / "operator_knowledge.json"),
+            operator_journal_path=path("operator_journal_path", tenant_dir / "operator_knowledge.journal.jsonl"),
+            manifest_path=VECTOR_DB_PATH / f"sync_manifest_{tenant_id}.json",
+            tg_chat_id=str(overrides.get("tg_chat_id", TG_ADMIN_ID))
+        )
+
+
+def load_tenant_configs(path=TENANTS_PATH) -> Dict[str, TenantConfig]:
+    """
+    Reads {tenant_id: {collection, faq_path, operator_knowledge_path, operator_journal_path, tg_chat_id}}
+    (every key optional) from the tenants file. The default tenant is always present.
+    """
+    configs = {DEFAULT_TENANT: TenantConfig.default()}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            tenants = json.load(f)
+    except FileNotFoundError:
+        return configs
+
+    for tenant_id, overrides in tenants.items():
+        if tenant_id != DEFAULT_TENANT:
+            configs[tenant_id] = TenantConfig.from_dict(tenant_id, overrides or {})
+    return configs
+
+
+class TenantRegistry:
+    """
+    Serves many hotels from one process. A tenant's managers (vector collection, caches, operator store,
+    file watcher) are built on its first request and kept in an LRU of at most `max_active` tenants;
+    the least recently used one is unloaded when another tenant needs the room. The default tenant stays loaded.
+    The request store and the Telegram service are shared, so webhooks are routed by the request's tenant.
+    """
+
+    def __init__(
+        self,
+        configs: Dict[str, TenantConfig],
+        build_manager: Callable[[TenantConfig], ChatManager],
+        request_store: RequestStore,
+        max_active: int = TENANT_MAX_ACTIVE,
+        watch_files: bool = True
+    ):
+        """
+        Args:
+            configs: Every known tenant by id (see load_tenant_configs).
+            build_manager: Creates and loads a tenant's ChatManager (see factory.create_tenant_registry).
+            request_store: The store shared by all tenants' managers.
+            max_active: Tenants kept in memory at once.
+            watch_files: Reload a loaded tenant's knowledge files when they change.
+        """
+        self.configs = configs
+        self.request_store = request_store
+        self.max_active = max(1, max_active)
+        self.watch_files = watch_files
+        self._build_manager = build_manager
+        self._active: "OrderedDict[str, Tuple[ChatManager, Optional[KnowledgeWatcher]]]" = OrderedDict()
+        self._build_locks: Dict[str, threading.Lock] = {}  # A tenant is built once even under concurrent first requests
+        self._lock = threading.Lock()
+
+    def get(self, tenant_id: Optional[str] = None) -> ChatManager:
+        """Returns the tenant's ChatManager, loading the tenant first if needed. Raises UnknownTenantError."""
+        tenant_id = tenant_id or DEFAULT_TENANT
+        with self._lock:
+            if tenant_id in self._active:
+                self._active.move_to_end(tenant_id)
+                return self._active[tenant_id][0]
+            if tenant_id not in self.configs:
+                raise UnknownTenantError(tenant_id)
+            build_lock = self._build_locks.setdefault(tenant_id, threading.Lock())
+
+        # Loading a knowledge base takes a while; other tenants are served meanwhile
+        with build_lock:
+            with self._lock:
+                if tenant_id in self._active:
+                    self._active.move_to_end(tenant_id)
+                    return self._active[tenant_id][0]
+
+            config = self.configs[tenant_id]
+            chat_manager = self._build_manager(config)
+            watcher = None
+            if self.watch_files:
+                watcher = start_knowledge_watcher({
+                    config.faq_path: chat_manager.knowledge_manager.load_faq_data,
+                    config.operator_knowledge_path: chat_manager.knowledge_manager.load_operator_knowledge
+                })
+
+            with self._lock:
+                self._active[tenant_id] = (chat_manager, watcher)
+                evicted = self._pop_idle()
+                metrics.set_gauge("tenants_active", len(self._active))
+
+        for evicted_id, evicted_manager, evicted_watcher in evicted:
+            metrics.inc("tenant_evictions_total")
+            self._unload(evicted_id, evicted_manager, evicted_watcher)
+        print(f"🏨 Tenant '{tenant_id}' loaded ({len(self._active)} active).")
+        return chat_manager
+
+    def _pop_idle(self) -> List[Tuple[str, ChatManager, Optional[KnowledgeWatcher]]]:
+        """Takes the least recently used tenants beyond max_active off the LRU. Called with the lock held."""
+        evicted = []
+        candidates = [tenant_id for tenant_id in self._active if tenant_id != DEFAULT_TENANT]
+        while len(self._active) > self.max_active and candidates:
+            tenant_id = candidates.pop(0)
+            evicted.append((tenant_id, *self._active.pop(tenant_id)))
+        return evicted
+
+    def _unload(self, tenant_id: str, chat_manager: ChatManager, watcher: Optional[KnowledgeWatcher]) -> None:
+        """Stops the tenant's background work and lets its in-memory state be collected."""
+        if watcher is not None:
+            watcher.stop()  # Its reload thread holds the tenant's knowledge manager
+        try:
+            chat_manager.knowledge_manager.operator_store.close()
+        except Exception as e:
+            print(f"⚠️ Operator knowledge of tenant '{tenant_id}' could not be compacted: {e}")
+        release_vector_db(self.configs[tenant_id].collection)
+        print(f"💤 Tenant '{tenant_id}' unloaded.")
+
+    def manager_for_request(self, req_id: str, load: bool = True) -> Optional[ChatManager]:
+        """
+        Returns the ChatManager of the tenant a pending request belongs to. None if the request is unknown,
+        its tenant is no longer configured, or (with load=False) the tenant isn't loaded.
+        """
+        request_data = self.request_store.get(req_id)
+        if not request_data:
+            return None
+        tenant_id = request_data.get("tenant_id") or DEFAULT_TENANT
+        if tenant_id not in self.configs:
+            return None
+        if load:
+            return self.get(tenant_id)
+        with self._lock:
+            entry = self._active.get(tenant_id)
+        return entry[0] if entry else None
+
+    def check_status(self, req_id: str) -> Dict[str, Any]:
+        """Status of a pending request for frontend polling, straight from the shared store (no tenant is loaded)."""
+        return self.request_store.get(req_id) or {"status": "not_found"}
+
+    def wait_for_status(self, req_id: str, timeout: float) -> Dict[str, Any]:
+        """
+        Long-poll variant of check_status. If the request's tenant is loaded, its manager wakes the waiter
+        as soon as the request is fulfilled; otherwise the store is re-checked every STATUS_RECHECK_INTERVAL,
+        so a poll never loads (or evicts) a tenant.
+        """
+        chat_manager = self.manager_for_request(req_id, load=False)
+        if chat_manager is not None:
+            return chat_manager.wait_for_status(req_id, timeout)
+
+        deadline = time.monotonic() + timeout
+        while True:
+            status_info = self.check_status(req_id)
+            remaining = deadline - time.monotonic()
+            if status_info["status"] != "pending" or remaining <= 0:
+                return status_info
+            time.sleep(min(remaining, STATUS_RECHECK_INTERVAL))
+
+    async def wait_for_status_async(self, req_id: str, timeout: float) -> Dict[str, Any]:
+        """Async variant of wait_for_status."""
+        loop = asyncio.get_running_loop()
+        chat_manager = await asyncio.to_thread(self.manager_for_request, req_id, False)
+        if chat_manager is not None:
+            return await chat_manager.wait_for_status_async(req_id, timeout)
+
+        deadline = loop.time() + timeout
+        while True:
+            status_info = self.check_status(req_id)
+            remaining = deadline - loop.time()
+            if status_info["status"] != "pending" or remaining <= 0:
+                return status_info
+            await asyncio.sleep(min(remaining, STATUS_RECHECK_INTERVAL))
+
+    def fulfill_by_msg_id(self, chat_id, msg_id: int, final_answer: str) -> bool:
+        """Matches an operator's Telegram reply to its request, whichever tenant it belongs to."""
+        req_id = self.request_store.pop_message(message_key(chat_id, msg_id))
+        chat_manager = self.manager_for_request(req_id) if req_id else None
+        if chat_manager is None:
+            return False
+        chat_manager.fulfill_request(req_id, final_answer)
+        return True
+
+    def active_tenants(self) -> List[str]:
+        """Ids of the loaded tenants, least recently used first."""
+        with self._lock:
+            return list(self._active)
+
+    def close(self) -> None:
+        """Unloads every tenant, folding their operator journals into the snapshots."""
+        with self._lock:
+            active = [(tenant_id, *entry) for tenant_id, entry in self._active.items()]
+            self._active.clear()
+            metrics.set_gauge("tenants_active", 0)
+        for tenant_id, chat_manager, watcher in active:
+            self._unload(tenant_id, chat_manager, watcher)
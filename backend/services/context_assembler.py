@@ -0,0 +1,103 @@
+import math
+from typing import Any, Dict, List, Optional
+import numpy as np
+from config import (
+    CONTEXT_MAX_CHUNKS, CONTEXT_TOKEN_BUDGET, CONTEXT_MMR_LAMBDA, CONTEXT_DUPLICATE_THRESHOLD, CONTEXT_CHARS_PER_TOKEN
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting; avoids loading the chat model's tokenizer."""
+    return math.ceil(len(text) / CONTEXT_CHARS_PER_TOKEN)
+
+
+class ContextAssembler:
+    """
+    Turns raw search results into the context passed to the LLM:
+    picks chunks by maximal marginal relevance (so near-duplicates are dropped),
+    keeps them within a token budget and orders them by relevance.
+    """
+
+    def __init__(
+        self,
+        max_chunks: int = CONTEXT_MAX_CHUNKS,
+        token_budget: int = CONTEXT_TOKEN_BUDGET,
+        mmr_lambda: float = CONTEXT_MMR_LAMBDA,
+        duplicate_threshold: float = CONTEXT_DUPLICATE_THRESHOLD
+    ):
+        """
+        Args:
+            max_chunks: Maximum number of chunks in the context.
+            token_budget: Maximum estimated tokens of all chunks together.
+            mmr_lambda: Trade-off between relevance (1.0) and diversity (0.0).
+            duplicate_threshold: Cosine similarity to an already selected chunk above which a chunk is dropped.
+        """
+        self.max_chunks = max_chunks
+        self.token_budget = token_budget
+        self.mmr_lambda = mmr_lambda
+        self.duplicate_threshold = duplicate_threshold
+
+    @staticmethod
+    def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def _mmr_order(self, relevance: np.ndarray, embeddings: Optional[np.ndarray]) -> List[int]:
+        """Returns candidate indices in MMR selection order, without near-duplicates."""
+        if embeddings is None:
+            return list(np.argsort(-relevance))
+
+        doc_vectors = self._normalize_rows(embeddings)
+        pairwise = doc_vectors @ doc_vectors.T
+        selected: List[int] = []
+        remaining = list(range(len(relevance)))
+        while remaining:
+            if selected:
+                redundancy = pairwise[np.ix_(remaining, selected)].max(axis=1)
+            else:
+                redundancy = np.zeros(len(remaining))
+            scores = self.mmr_lambda * relevance[remaining] - (1 - self.mmr_lambda) * redundancy
+            best = int(np.argmax(scores))
+            candidate = remaining.pop(best)
+            if redundancy[best] < self.duplicate_threshold:
+                selected.append(candidate)
+        return selected
+
+    def assemble(self, search_result: Dict[str, Any], query_embedding: Optional[np.ndarray] = None) -> List[str]:
+        """
+        Args:
+            search_result: VectorDBService.search output for one query; "embeddings" enables near-duplicate removal.
+            query_embedding: The query vector; without it relevance falls back to 1 - cosine distance.
+
+        Returns:
+            List[str]: The selected chunks, most relevant first.
+        """
+        documents = search_result['documents'][0]
+        if not documents:
+            return []
+
+        embeddings = search_result.get('embeddings')
+        embeddings = np.asarray(embeddings[0], dtype=np.float32) if embeddings is not None and len(embeddings[0]) else None
+        if embeddings is not None and query_embedding is not None:
+            query_vector = self._normalize_rows(np.asarray(query_embedding, dtype=np.float32).ravel())
+            relevance = self._normalize_rows(embeddings) @ query_vector
+        else:
+            relevance = 1 - np.asarray(search_result['distances'][0], dtype=np.float32)
+
+        chosen: List[int] = []
+        tokens_left = self.token_budget
+        for idx in self._mmr_order(relevance, embeddings):
+            if len(chosen) == self.max_chunks:
+                break
+            cost = estimate_tokens(documents[idx])
+            if cost <= tokens_left:
+                chosen.append(idx)
+                tokens_left -= cost
+
+        # Even an oversized best chunk is better than no context: keep its head
+        if not chosen:
+            best = int(np.argmax(relevance))
+            return [documents[best][:self.token_budget * CONTEXT_CHARS_PER_TOKEN]]
+
+        chosen.sort(key=lambda idx: -relevance[idx])
+        return [documents[idx] for idx in chosen]
@@ -0,0 +1,111 @@
+import threading
+import httpx
+import requests
+from typing import Dict, Any, Callable
+from openai import OpenAI, AsyncOpenAI
+from huggingface_hub import InferenceClient
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import (
+    HF_API_TOKEN, HF_BASE_URL, HTTP_CONNECT_TIMEOUT, HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE,
+    HTTP_CONNECT_RETRIES, LLM_READ_TIMEOUT, LLM_MAX_RETRIES, EMBEDDING_READ_TIMEOUT, LLM_ASYNC_MAX_CONNECTIONS
+)
+
+# Process-wide clients, created on first use and reused by every service instance
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def _get_or_create(name: str, factory: Callable[[], Any]) -> Any:
+    with _clients_lock:
+        if name not in _clients:
+            _clients[name] = factory()
+        return _clients[name]
+
+
+def _llm_timeout() -> httpx.Timeout:
+    return httpx.Timeout(LLM_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+
+
+def _llm_limits(max_connections: int = HTTP_MAX_CONNECTIONS) -> httpx.Limits:
+    return httpx.Limits(max_connections=max_connections, max_keepalive_connections=HTTP_MAX_KEEPALIVE)
+
+
+def get_chat_client() -> OpenAI:
+    """Shared OpenAI-compatible client for the chat model, with a keep-alive connection pool."""
+    return _get_or_create("chat", lambda: OpenAI(
+        api_key=HF_API_TOKEN,
+        base_url=HF_BASE_URL,
+        timeout=_llm_timeout(),
+        max_retries=LLM_MAX_RETRIES,
+        http_client=httpx.Client(limits=_llm_limits(), timeout=_llm_timeout())
+    ))
+
+
+def get_async_chat_client() -> AsyncOpenAI:
+    """
+    Shared async client for the chat model. Only use it from a single long-lived event loop (the ASGI app's),
+    whose concurrent conversations may each hold a connection, up to LLM_ASYNC_MAX_CONNECTIONS.
+    """
+    return _get_or_create("async_chat", lambda: create_async_chat_client(LLM_ASYNC_MAX_CONNECTIONS))
+
+
+def create_async_chat_client(max_connections: int = HTTP_MAX_CONNECTIONS) -> AsyncOpenAI:
+    """
+    New async client with the shared timeouts and limits. Pooled connections are bound
+    to an event loop, so callers that run their own short-lived loops need their own client.
+    """
+    return AsyncOpenAI(
+        api_key=HF_API_TOKEN,
+        base_url=HF_BASE_URL,
+        timeout=_llm_timeout(),
+        max_retries=LLM_MAX_RETRIES,
+        http_client=httpx.AsyncClient(limits=_llm_limits(max_connections), timeout=_llm_timeout())
+    )
+
+
+def get_inference_client() -> InferenceClient:
+    """Shared Hugging Face inference client used for embeddings."""
+    return _get_or_create("inference", lambda: InferenceClient(api_key=HF_API_TOKEN, timeout=EMBEDDING_READ_TIMEOUT))
+
+
+def get_http_session(name: str, connect_retries: int = HTTP_CONNECT_RETRIES) -> requests.Session:
+    """
+    Shared requests session for a plain HTTP API (e.g. "telegram").
+    Connection errors are retried `connect_retries` times by the adapter; status-level retries are left
+    to the caller. Callers with their own retry loop pass 0, so attempts don't multiply.
+    """
+    def create_session() -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=HTTP_MAX_CONNECTIONS,
+            max_retries=Retry(total=None, connect=connect_retries, read=0, status=0, backoff_factor=0.5)
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    return _get_or_create(f"session:{name}", create_session)
+
+
+def close_all() -> None:
+    """Closes every shared client and its pooled connections."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+
+    for client in clients:
+        close = getattr(client, "close", None)
+        # Async clients must be closed from their event loop
+        if callable(close) and not isinstance(client, AsyncOpenAI):
+            close()
+
+
+async def close_all_async() -> None:
+    """Closes the shared async clients from the event loop that used them, then every other client."""
+    with _clients_lock:
+        async_clients = [client for client in _clients.values() if isinstance(client, AsyncOpenAI)]
+    for client in async_clients:
+        await client.close()
+    close_all()
@@ -0,0 +1,122 @@
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple, Any
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from", "have", "how",
+    "i", "if", "in", "is", "it", "me", "my", "of", "on", "or", "our", "please", "the", "there", "this",
+    "to", "we", "what", "when", "where", "which", "with", "you", "your"
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases, splits on non-alphanumerics, drops stopwords and folds simple plurals."""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class BM25Index:
+    """
+    In-process inverted index with Okapi BM25 scoring.
+    Mirrors the documents of a vector collection so keyword queries never leave the process.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}  # term -> {doc_id: term frequency}
+        self._doc_terms: Dict[str, Counter] = {}
+        self._lengths: Dict[str, int] = {}
+        self._metadatas: Dict[str, Dict[str, Any]] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def upsert(self, ids: List[str], documents: List[str], metadatas: Optional[List[Dict[str, Any]]] = None) -> None:
+        """Adds or replaces documents."""
+        metadatas = metadatas or [{}] * len(ids)
+        with self._lock:
+            self.delete(ids)
+            for doc_id, document, metadata in zip(ids, documents, metadatas):
+                terms = Counter(tokenize(document or ""))
+                self._doc_terms[doc_id] = terms
+                self._metadatas[doc_id] = metadata or {}
+                self._lengths[doc_id] = sum(terms.values())
+                self._total_length += self._lengths[doc_id]
+                for term, tf in terms.items():
+                    self._postings.setdefault(term, {})[doc_id] = tf
+
+    def delete(self, ids: List[str]) -> None:
+        """Removes documents; unknown IDs are ignored."""
+        with self._lock:
+            for doc_id in ids:
+                terms = self._doc_terms.pop(doc_id, None)
+                if terms is None:
+                    continue
+                self._metadatas.pop(doc_id, None)
+                self._total_length -= self._lengths.pop(doc_id)
+                for term in terms:
+                    postings = self._postings[term]
+                    del postings[doc_id]
+                    if not postings:
+                        del self._postings[term]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._metadatas.clear()
+            self._lengths.clear()
+            self._total_length = 0
+
+    @staticmethod
+    def supports_filter(where: Optional[Dict[str, Any]]) -> bool:
+        """Only plain equality filters ({"field": value}) can be evaluated in-process."""
+        return not where or all(not key.startswith("$") and not isinstance(value, dict) for key, value in where.items())
+
+    def _matches(self, doc_id: str, where: Optional[Dict[str, Any]]) -> bool:
+        metadata = self._metadatas[doc_id]
+        return not where or all(metadata.get(key) == value for key, value in where.items())
+
+    def search(self, query: str, n_results: int, where: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float, float]]:
+        """
+        Returns up to n_results (doc_id, bm25_score, coverage) tuples, best first.
+        Coverage is the share of distinct query terms that occur in the document.
+        """
+        query_terms = set(tokenize(query))
+        if not query_terms:
+            return []
+
+        with self._lock:
+            doc_count = len(self._doc_terms)
+            if not doc_count:
+                return []
+            avg_length = self._total_length / doc_count
+
+            scores: Dict[str, float] = {}
+            matched: Dict[str, int] = {}
+            for term in query_terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    if not self._matches(doc_id, where):
+                        continue
+                    norm = tf + self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+                    matched[doc_id] = matched.get(doc_id, 0) + 1
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:n_results]
+        return [(doc_id, score, matched[doc_id] / len(query_terms)) for doc_id, score in ranked]
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
@@ -1,73 +1,226 @@
-import json
-import os
-import yaml
+import threading
 import numpy as np
-from typing import List, Union, Tuple
-from openai import OpenAI
-from huggingface_hub import InferenceClient
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Union, Iterator, AsyncIterator, Dict, Any, Optional
+from openai import BadRequestError
 from backend.constants import LLMRole
-from config import HF_API_TOKEN, HF_BASE_URL, CHAT_MODEL, EMBEDDING_MODEL
+from backend.services.http_clients import get_chat_client, get_async_chat_client, get_inference_client
+from backend.services.llm.prompt_registry import get_prompt_registry
+from backend.services.llm.structured_output import StructuredAnswer, parse_structured, repair_messages
+from backend.utils.admission import OverloadedError, llm_admission
+from backend.utils.embedding_cache import EmbeddingCache
+from backend.utils.metrics import metrics
+from config import (
+    CHAT_MODEL, EMBEDDING_MODEL, EMBEDDING_BACKEND, EMBEDDING_BATCH_SIZE, EMBEDDING_CONCURRENCY, LLM_JSON_MODE,
+    LLM_REPAIR_MAX_TOKENS
+)
 
 
 class LLMService:
     """Handles AI interactions with LLM."""
 
+    _local_models = {}  # Loaded sentence-transformers models, shared by all instances
+    _local_models_lock = threading.Lock()
+    _json_mode = LLM_JSON_MODE  # Switched off for the process if the endpoint rejects response_format
+
     def __init__(self, role: LLMRole = LLMRole.ASSISTANT):
         self.chat_model = CHAT_MODEL
         self.embedding_model = EMBEDDING_MODEL
-        self.chat_client = OpenAI(
-            api_key=HF_API_TOKEN,
-            base_url=HF_BASE_URL
-        )
-        self.inference_client = InferenceClient(api_key=HF_API_TOKEN)
+        self.chat_client = get_chat_client()
+        self.inference_client = get_inference_client()
+        self.embedding_cache = EmbeddingCache()
+        self.prompts = get_prompt_registry()
         self.role = role
 
     def _get_system_prompt(self, role: LLMRole) -> str:
         """Gets the system prompt for the specified role."""
-        ROLE_PROMPT_MAP = {
-            LLMRole.ASSISTANT: "hotel_chat_assistant.yaml",
-            LLMRole.JUDGE: "llm_as_a_judge.yaml"
+        return self.prompts.get(role).system_prompt
+
+    def get_prompt_version(self) -> str:
+        """Returns a hash of the current prompt template, used to tag cached results."""
+        return self.prompts.get_version(self.role)
+
+    @metrics.timed("prompt_build")
+    def _build_messages(self, query: str, context: list[str]) -> List[dict]:
+        """Builds the chat messages: system prompt with the retrieved context, then the user query."""
+        return [
+            {"role": "system", "content": self.prompts.get(self.role).render(context)},
+            {"role": "user", "content": query}
+        ]
+
+    def _completion_args(self, query: str, context: list[str], stream: bool = False) -> Dict[str, Any]:
+        """Request parameters shared by the sync and async, plain and streaming calls."""
+        args = {
+            "model": self.chat_model,
+            "messages": self._build_messages(query, context),
+            "max_tokens": 150,
+            "temperature": 0.1
         }
+        if stream:
+            args["stream"] = True
+        return self._with_json_mode(args)
+
+    def _repair_args(self, text: str) -> Dict[str, Any]:
+        """Parameters of the cheap follow-up call that restates an unparseable response as JSON."""
+        return self._with_json_mode({
+            "model": self.chat_model,
+            "messages": repair_messages(text, self.role),
+            "max_tokens": LLM_REPAIR_MAX_TOKENS,
+            "temperature": 0
+        })
+
+    @classmethod
+    def _with_json_mode(cls, args: Dict[str, Any]) -> Dict[str, Any]:
+        if cls._json_mode:
+            args["response_format"] = {"type": "json_object"}
+        return args
+
+    @classmethod
+    def _json_mode_rejected(cls, args: Dict[str, Any], error: BadRequestError) -> bool:
+        """
+        Turns JSON mode off for the process if the endpoint rejected a request because of it.
+        Other 400s (e.g. a prompt over the context length) leave JSON mode on and are raised as they are.
+        Returns True if the request should be sent again without response_format.
+        """
+        if "response_format" not in args:
+            return False
+        details = f"{error} {error.body}".lower()
+        if "response_format" not in details and "json_object" not in details:
+            return False
+        if cls._json_mode:
+            print(f"⚠️ The chat endpoint rejected JSON mode, falling back to plain text output: {error}")
+            cls._json_mode = False
+        del args["response_format"]
+        return True
+
+    def _create(self, args: Dict[str, Any]):
+        """Sends a chat completion request (plain or streaming); JSON mode is dropped if the endpoint rejects it."""
+        try:
+            return self.chat_client.chat.completions.create(**args)
+        except BadRequestError as e:
+            if not self._json_mode_rejected(args, e):
+                raise
+            return self.chat_client.chat.completions.create(**args)
+
+    async def _create_async(self, args: Dict[str, Any]):
+        """Async variant of _create."""
+        client = get_async_chat_client()
+        try:
+            return await client.chat.completions.create(**args)
+        except BadRequestError as e:
+            if not self._json_mode_rejected(args, e):
+                raise
+            return await client.chat.completions.create(**args)
 
-        file_path = os.path.join(os.path.dirname(__file__), "prompts", ROLE_PROMPT_MAP[role])
+    @staticmethod
+    def _content(completion) -> str:
+        return completion.choices[0].message.content
 
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
-            prompt = data["system_prompt"]
-            return prompt
+    def _parse(self, text: str) -> Optional[StructuredAnswer]:
+        with metrics.timer("json_parse"):
+            return parse_structured(text, self.role)
 
-    def get_answer(self, query: str, context: list[str]) -> Tuple[str, bool]:
+    def _parse_repaired(self, text: str) -> Optional[StructuredAnswer]:
+        """Parses the output of a repair call."""
+        result = self._parse(text)
+        metrics.inc("llm_repairs_total", outcome="failed" if result is None else "fixed")
+        if result is not None:
+            result.repaired = True
+        return result
+
+    def _unparseable(self) -> StructuredAnswer:
+        metrics.inc("chat_errors_total", stage="llm_parse")
+        return StructuredAnswer.failure(self.role, "⚠️ Error processing request: the model response was not valid JSON")
+
+    def get_answer(self, query: str, context: list[str]) -> StructuredAnswer:
         """
         Generates a natural language response based on the retrieved context.
+        JSON embedded in prose or code fences is extracted; output that still doesn't parse
+        gets one repair call with a small token budget (LLM_REPAIR_MAX_TOKENS).
 
         Args:
             query (str): The original user inquiry.
             context (list[str]): The most relevant text chunks retrieved from the vector database.
 
         Returns:
-            Tuple[str, bool]: The generated response and its confidence level.
+            StructuredAnswer: The role's fields, e.g. result['answer'] and result['confidence'] for the assistant.
+            If the call fails, a failure result whose text fields carry the error and whose flags are False.
+
+        Raises:
+            OverloadedError: If the call is not admitted (too many concurrent or recent LLM calls).
+        """
+        try:
+            with llm_admission.admit():
+                with metrics.timer("llm_call"):
+                    text = self._content(self._create(self._completion_args(query, context)))
+                result = self._parse(text)
+                if result is None and LLM_REPAIR_MAX_TOKENS:
+                    with metrics.timer("llm_repair"):
+                        repaired_text = self._content(self._create(self._repair_args(text)))
+                    result = self._parse_repaired(repaired_text)
+            return result or self._unparseable()
+        except OverloadedError:
+            raise
+        except Exception as e:
+            metrics.inc("chat_errors_total", stage="llm")
+            return StructuredAnswer.failure(self.role, f"⚠️ Error processing request: {str(e)}")
+
+    async def get_answer_async(self, query: str, context: list[str]) -> StructuredAnswer:
+        """
+        Async variant of get_answer for the ASGI app: waiting for the model doesn't hold a thread.
+        Uses the shared AsyncOpenAI client, which is bound to the serving event loop.
         """
-        system_prompt = self._get_system_prompt(self.role)
-        context = "\n".join(context)
-        prompt = f"{system_prompt}\n\nCONTEXT:\n'''\n{context}\n'''"
         try:
-            response = self.chat_client.chat.completions.create(
-                model=self.chat_model,
-                messages=[
-                    {"role": "system", "content": prompt},
-                    {"role": "user", "content": query}
-                ],
-                max_tokens=150,
-                temperature=0.1
-            ).choices[0].message.content
-
-            return json.loads(response)
+            async with llm_admission.admit_async():
+                with metrics.timer("llm_call"):
+                    text = self._content(await self._create_async(self._completion_args(query, context)))
+                result = self._parse(text)
+                if result is None and LLM_REPAIR_MAX_TOKENS:
+                    with metrics.timer("llm_repair"):
+                        repaired_text = self._content(await self._create_async(self._repair_args(text)))
+                    result = self._parse_repaired(repaired_text)
+            return result or self._unparseable()
+        except OverloadedError:
+            raise
         except Exception as e:
-            return f"⚠️ Error processing request: {str(e)}", False
+            metrics.inc("chat_errors_total", stage="llm")
+            return StructuredAnswer.failure(self.role, f"⚠️ Error processing request: {str(e)}")
+
+    def stream_answer(self, query: str, context: list[str]) -> Iterator[str]:
+        """
+        Streams the raw model output for the given query as it is generated.
+
+        Args:
+            query (str): The original user inquiry.
+            context (list[str]): The most relevant text chunks retrieved from the vector database.
+
+        Yields:
+            str: Raw content deltas of the JSON response.
+
+        Raises:
+            OverloadedError: On the first iteration, if the call is not admitted.
+        """
+        # The slot is held, and the call timed, until the whole answer has been received
+        with llm_admission.admit(), metrics.timer("llm_call"):
+            stream = self._create(self._completion_args(query, context, stream=True))
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    async def stream_answer_async(self, query: str, context: list[str]) -> AsyncIterator[str]:
+        """Async variant of stream_answer."""
+        async with llm_admission.admit_async():
+            with metrics.timer("llm_call"):
+                stream = await self._create_async(self._completion_args(query, context, stream=True))
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
 
     def embed_content(self, content: Union[str, List[str]], is_query: bool = False) -> np.ndarray:
         """
         Generates embeddings for the given content.
+        Cached passage vectors are read from disk; the rest are embedded in batches of EMBEDDING_BATCH_SIZE,
+        up to EMBEDDING_CONCURRENCY batches at a time.
 
         Args:
             content (str): The text to embed.
@@ -81,13 +234,63 @@ class LLMService:
 
         input_data = [content] if isinstance(content, str) else content
         input_with_prefix = [f"{prefix}{text}" for text in input_data]
+        if not input_with_prefix:
+            return np.array([])
+
+        # Only passages are kept on disk: their set is bounded by the knowledge base, while every guest
+        # question is new text. Queries have their own bounded in-memory cache (QueryEmbeddingCache).
+        use_disk_cache = not is_query
+        keys = {text: EmbeddingCache.make_key(self.embedding_model, text) for text in input_with_prefix}
+        vectors: Dict[str, np.ndarray] = (
+            self.embedding_cache.get_many(list(set(keys.values()))) if use_disk_cache else {}
+        )
 
         try:
-            embeddings = self.inference_client.feature_extraction(
-                input_with_prefix,
-                model=self.embedding_model
-            )
-            return np.array(embeddings).astype('float32')
+            missing = list(dict.fromkeys(text for text in input_with_prefix if keys[text] not in vectors))
+            if missing:
+                batches = [missing[i:i + EMBEDDING_BATCH_SIZE] for i in range(0, len(missing), EMBEDDING_BATCH_SIZE)]
+                if len(batches) == 1:
+                    results = [self._embed_batch(batches[0])]
+                else:
+                    with ThreadPoolExecutor(max_workers=EMBEDDING_CONCURRENCY) as pool:
+                        results = list(pool.map(self._embed_batch, batches))
+
+                new_vectors = {
+                    keys[text]: vector
+                    for batch, embeddings in zip(batches, results)
+                    for text, vector in zip(batch, embeddings)
+                }
+                if use_disk_cache:
+                    self.embedding_cache.put_many(new_vectors)
+                vectors.update(new_vectors)
+
+            return np.stack([vectors[keys[text]] for text in input_with_prefix]).astype('float32')
         except Exception as e:
             print(f"⚠️ Embedding Error: {str(e)}")
             return np.array([])
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embeds one batch with the configured backend, falling back to the local model if the remote call fails."""
+        if EMBEDDING_BACKEND == "local":
+            return self._embed_locally(texts)
+
+        try:
+            embeddings = self.inference_client.feature_extraction(texts, model=self.embedding_model)
+            return np.asarray(embeddings, dtype=np.float32)
+        except Exception as e:
+            print(f"⚠️ Remote embedding failed, trying the local model: {str(e)}")
+            return self._embed_locally(texts)
+
+    def _embed_locally(self, texts: List[str]) -> np.ndarray:
+        """Embeds texts with a local sentence-transformers model (optional dependency)."""
+        with self._local_models_lock:
+            model = self._local_models.get(self.embedding_model)
+            if model is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                except ImportError as e:
+                    raise RuntimeError("sentence-transformers is not installed, local embeddings are unavailable") from e
+                model = SentenceTransformer(self.embedding_model)
+                self._local_models[self.embedding_model] = model
+
+        return np.asarray(model.encode(texts, batch_size=EMBEDDING_BATCH_SIZE), dtype=np.float32)
@@ -0,0 +1,128 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+import yaml
+from backend.constants import LLMRole
+from config import PROMPT_RELOAD_INTERVAL
+
+PROMPTS_DIR = os.path.join(os.path.dirname(__file__), "prompts")
+ROLE_PROMPT_MAP = {
+    LLMRole.ASSISTANT: "hotel_chat_assistant.yaml",
+    LLMRole.JUDGE: "llm_as_a_judge.yaml"
+}
+
+# Layout of the system message; the retrieved context goes between the prefix and the suffix
+CONTEXT_TEMPLATE = "{system_prompt}\n\nCONTEXT:\n'''\n{context}\n'''"
+
+
+class PromptValidationError(ValueError):
+    """Raised when a prompt file is missing, malformed or has no system prompt."""
+
+
+class PromptTemplate:
+    """A role's system prompt, split around the context slot so rendering is a single concatenation."""
+
+    def __init__(self, role: LLMRole, path: str, mtime: float, system_prompt: str):
+        self.role = role
+        self.path = path
+        self.mtime = mtime
+        self.system_prompt = system_prompt
+        self.prefix, self.suffix = CONTEXT_TEMPLATE.format(system_prompt=system_prompt, context="\0").split("\0")
+        self.version = hashlib.md5(f"{self.prefix}\0{self.suffix}".encode('utf-8')).hexdigest()
+
+    def render(self, context: List[str]) -> str:
+        """Returns the system message with the context chunks filled in."""
+        return self.prefix + "\n".join(context) + self.suffix
+
+
+class PromptRegistry:
+    """
+    Loads and validates every role's prompt file once and serves the compiled templates from memory.
+    Files are re-checked at most every PROMPT_RELOAD_INTERVAL seconds and reloaded when their mtime changes;
+    an invalid edit is reported and the previous template stays in use.
+    """
+
+    def __init__(self, prompts_dir: str = PROMPTS_DIR, reload_interval: float = PROMPT_RELOAD_INTERVAL):
+        self.prompts_dir = prompts_dir
+        self.reload_interval = reload_interval
+        self._templates: Dict[LLMRole, PromptTemplate] = {}
+        self._checked_at: Dict[LLMRole, float] = {}
+        self._rejected_mtimes: Dict[LLMRole, float] = {}  # Invalid edits are reported once, not on every check
+        self._lock = threading.Lock()
+        for role in ROLE_PROMPT_MAP:
+            self._templates[role] = self._load(role)
+            self._checked_at[role] = time.monotonic()
+
+    def _path(self, role: LLMRole) -> str:
+        return os.path.join(self.prompts_dir, ROLE_PROMPT_MAP[role])
+
+    def _load(self, role: LLMRole) -> PromptTemplate:
+        """Reads and validates one prompt file."""
+        path = self._path(role)
+        try:
+            mtime = os.path.getmtime(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                data = yaml.safe_load(f)
+        except (OSError, yaml.YAMLError) as e:
+            raise PromptValidationError(f"Cannot load prompt for {role.value} from {path}: {e}") from e
+
+        if not isinstance(data, dict) or not isinstance(data.get("system_prompt"), str) or not data["system_prompt"].strip():
+            raise PromptValidationError(f"Prompt file {path} must define a non-empty 'system_prompt' string")
+        return PromptTemplate(role, path, mtime, data["system_prompt"])
+
+    def _reload_if_changed(self, role: LLMRole, template: PromptTemplate) -> PromptTemplate:
+        """Returns a freshly loaded template if the file changed, otherwise (or if the new file is invalid) the current one."""
+        try:
+            mtime = os.path.getmtime(template.path)
+        except OSError as e:
+            mtime = None
+            error = e
+        else:
+            if mtime in (template.mtime, self._rejected_mtimes.get(role)):
+                return template
+            try:
+                return self._accept(role, self._load(role))
+            except PromptValidationError as e:
+                error = e
+
+        if role not in self._rejected_mtimes or self._rejected_mtimes[role] != mtime:
+            print(f"⚠️ Prompt reload failed, keeping the previous version: {error}")
+        self._rejected_mtimes[role] = mtime
+        return template
+
+    def _accept(self, role: LLMRole, new_template: PromptTemplate) -> PromptTemplate:
+        self._rejected_mtimes.pop(role, None)
+        print(f"🔄 Prompt for {role.value} reloaded (version {new_template.version[:8]}).")
+        return new_template
+
+    def get(self, role: LLMRole) -> PromptTemplate:
+        """Returns the compiled template for a role, reloading it first if the file changed."""
+        template = self._templates[role]
+        now = time.monotonic()
+        if now - self._checked_at[role] < self.reload_interval:
+            return template
+
+        with self._lock:
+            if now - self._checked_at[role] >= self.reload_interval:
+                self._templates[role] = self._reload_if_changed(role, self._templates[role])
+                self._checked_at[role] = now
+            return self._templates[role]
+
+    def get_version(self, role: LLMRole) -> str:
+        """Hash of the role's compiled template, used to tag caches and evaluation results."""
+        return self.get(role).version
+
+
+_registry: Optional[PromptRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Returns the process-wide prompt registry, loading every prompt on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = PromptRegistry()
+        return _registry
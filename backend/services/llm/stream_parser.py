@@ -0,0 +1,105 @@
+import re
+import string
+from typing import Optional, Tuple
+
+
+class AnswerStreamParser:
+    """
+    Incrementally extracts the "answer" string and the "confidence" flag
+    from the assistant's JSON response while it is still being streamed.
+    """
+
+    ANSWER_KEY_PATTERN = re.compile(r'"answer"\s*:\s*"')
+    CONFIDENCE_PATTERN = re.compile(r'"confidence"\s*:\s*(true|false)')
+    ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+    def __init__(self):
+        self.buffer = ""
+        self.answer = ""
+        self.confidence: Optional[bool] = None
+        self.answer_complete = False
+        self._pos: Optional[int] = None  # Index in buffer of the next undecoded answer character
+
+    def feed(self, delta: str) -> str:
+        """
+        Consumes a chunk of raw model output.
+
+        Returns:
+            str: The answer text decoded from this chunk (may be empty).
+        """
+        self.buffer += delta
+
+        if self.confidence is None:
+            match = self.CONFIDENCE_PATTERN.search(self.buffer)
+            if match:
+                self.confidence = match.group(1) == "true"
+
+        if self._pos is None:
+            match = self.ANSWER_KEY_PATTERN.search(self.buffer)
+            if not match:
+                return ""
+            self._pos = match.end()
+
+        decoded = self._decode()
+        self.answer += decoded
+        return decoded
+
+    def _decode(self) -> str:
+        """Decodes the available part of the JSON string, stopping at incomplete escapes."""
+        chars = []
+        pos = self._pos
+        while pos < len(self.buffer) and not self.answer_complete:
+            char = self.buffer[pos]
+            if char == '"':
+                self.answer_complete = True
+                pos += 1
+            elif char == '\\':
+                if pos + 1 >= len(self.buffer):
+                    break
+                escape = self.buffer[pos + 1]
+                if escape == 'u':
+                    decoded = self._decode_unicode(pos)
+                    if decoded is None:
+                        break
+                    text, pos = decoded
+                    chars.append(text)
+                else:
+                    chars.append(self.ESCAPES.get(escape, escape))
+                    pos += 2
+            else:
+                chars.append(char)
+                pos += 1
+        self._pos = pos
+        return "".join(chars)
+
+    def _hex_at(self, pos: int) -> Optional[int]:
+        """The code unit of the four hex digits at pos, or None if they aren't hex digits."""
+        digits = self.buffer[pos:pos + 4]
+        return int(digits, 16) if all(digit in string.hexdigits for digit in digits) else None
+
+    def _decode_unicode(self, pos: int) -> Optional[Tuple[str, int]]:
+        """
+        Decodes the \\uXXXX escape at pos, combining a UTF-16 surrogate pair into one character.
+        Returns the text and the position after it, or None if more input is needed. A malformed escape
+        is kept as literal text and an unpaired surrogate becomes U+FFFD, so the answer stays encodable.
+        """
+        if pos + 6 > len(self.buffer):
+            return None
+        code = self._hex_at(pos + 2)
+        if code is None:
+            return self.buffer[pos:pos + 2], pos + 2
+        if 0xDC00 <= code <= 0xDFFF:
+            return "\ufffd", pos + 6
+        if not 0xD800 <= code <= 0xDBFF:
+            return chr(code), pos + 6
+
+        # A high surrogate: the low half must follow as another \\u escape
+        following = self.buffer[pos + 6:pos + 8]
+        if following != "\\u"[:len(following)]:
+            return "\ufffd", pos + 6
+        if pos + 12 > len(self.buffer):
+            return None
+        low = self._hex_at(pos + 8)
+        if low is None or not 0xDC00 <= low <= 0xDFFF:
+            return "\ufffd", pos + 6
+        return chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)), pos + 12
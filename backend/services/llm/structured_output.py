@@ -0,0 +1,141 @@
+import json
+import re
+from typing import Any, Dict, List, Optional
+from backend.constants import LLMRole
+
+# Fields every role's JSON response must contain, with their types
+ROLE_RESPONSE_FIELDS = {
+    LLMRole.ASSISTANT: {"answer": str, "confidence": bool},
+    LLMRole.JUDGE: {"passed": bool, "reason": str}
+}
+
+_CODE_FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+_decoder = json.JSONDecoder()
+
+
+class StructuredAnswer:
+    """
+    Typed result of a structured LLM call. The role's fields are properties (result.answer, result.passed)
+    and can also be read by key (result['answer']), like the parsed JSON they come from.
+    """
+
+    __slots__ = ("role", "fields", "ok", "repaired")
+
+    def __init__(self, role: LLMRole, fields: Dict[str, Any], ok: bool = True, repaired: bool = False):
+        """
+        Args:
+            role: The role whose response schema the fields follow.
+            fields: One value per field of ROLE_RESPONSE_FIELDS[role].
+            ok: False if the call failed and the fields are a fallback (see failure()).
+            repaired: True if the model's output only became valid JSON after a repair call.
+        """
+        self.role = role
+        self.fields = fields
+        self.ok = ok
+        self.repaired = repaired
+
+    @classmethod
+    def failure(cls, role: LLMRole, message: str) -> "StructuredAnswer":
+        """A fallback result: text fields carry the error message, flags are False (e.g. not confident, not passed)."""
+        fields = {name: (False if kind is bool else message) for name, kind in ROLE_RESPONSE_FIELDS[role].items()}
+        return cls(role, fields, ok=False)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.fields[key]
+
+    @property
+    def answer(self) -> str:
+        return self.fields["answer"]
+
+    @property
+    def confidence(self) -> bool:
+        return self.fields["confidence"]
+
+    @property
+    def passed(self) -> bool:
+        return self.fields["passed"]
+
+    @property
+    def reason(self) -> str:
+        return self.fields["reason"]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.fields.get(key, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.fields)
+
+    def __repr__(self) -> str:
+        return f"StructuredAnswer({self.role.value}, {self.fields!r}, ok={self.ok})"
+
+
+def extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Finds the JSON object in a model response: the whole text, the content of a ``` code fence,
+    or the first decodable object embedded in surrounding prose. Returns None if there is none.
+    """
+    if not text:
+        return None
+
+    candidates = [text.strip()] + [match.strip() for match in _CODE_FENCE_PATTERN.findall(text)]
+    for candidate in candidates:
+        try:
+            value = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(value, dict):
+            return value
+
+    start = text.find("{")
+    while start != -1:
+        try:
+            value, _ = _decoder.raw_decode(text, start)
+        except ValueError:
+            value = None
+        if isinstance(value, dict):
+            return value
+        start = text.find("{", start + 1)
+    return None
+
+
+def _coerce(value: Any, kind: type) -> Any:
+    """Converts a field to its declared type, accepting the usual near misses ("true", "False"). None if impossible."""
+    if kind is bool:
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+            return value.strip().lower() == "true"
+        return None
+    if isinstance(value, str):
+        return value
+    return None if value is None or isinstance(value, (dict, list)) else str(value)
+
+
+def parse_structured(text: str, role: LLMRole) -> Optional[StructuredAnswer]:
+    """Extracts and validates a role's response. Returns None if a field is missing or has the wrong type."""
+    data = extract_json_object(text)
+    if data is None:
+        return None
+
+    fields = {}
+    for name, kind in ROLE_RESPONSE_FIELDS[role].items():
+        value = _coerce(data.get(name), kind)
+        if value is None:
+            return None
+        fields[name] = value
+    return StructuredAnswer(role, fields)
+
+
+def repair_messages(text: str, role: LLMRole) -> List[dict]:
+    """Chat messages asking the model to restate an unparseable response as the role's JSON object."""
+    schema = ", ".join(
+        f'"{name}" ({"boolean" if kind is bool else "string"})' for name, kind in ROLE_RESPONSE_FIELDS[role].items()
+    )
+    return [
+        {
+            "role": "system",
+            "content": f"Rewrite the user's text as a single JSON object with exactly these fields: {schema}. "
+                       "Keep the original wording of the text fields. Respond with the JSON object only."
+        },
+        {"role": "user", "content": text}
+    ]
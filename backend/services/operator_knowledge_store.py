@@ -0,0 +1,183 @@
+import contextlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+try:
+    import fcntl
+except ImportError:  # Windows: no inter-process lock, run a single worker there
+    fcntl = None
+from config import (
+    OPERATOR_KNOWLEDGE_PATH, OPERATOR_JOURNAL_PATH, OPERATOR_COMPACT_THRESHOLD, OPERATOR_COMPACT_INTERVAL
+)
+
+
+class OperatorKnowledgeStore:
+    """
+    Persists operator answers as a JSON snapshot plus an append-only JSONL journal.
+    Saving an answer appends one line to the journal, whatever the size of the knowledge base;
+    compaction folds the journal into the snapshot with an atomic temp-file + rename.
+    Entries are indexed in memory by question, so replacing an answer needs no file scan.
+    Workers sharing the files serialize appends and compactions with an flock on a `.lock` file next to the journal.
+    """
+
+    def __init__(
+        self,
+        snapshot_path=OPERATOR_KNOWLEDGE_PATH,
+        journal_path=OPERATOR_JOURNAL_PATH,
+        compact_threshold: int = OPERATOR_COMPACT_THRESHOLD
+    ):
+        """
+        Args:
+            snapshot_path: The operator knowledge JSON file (a list of {"q", "a", "created_at"} entries).
+            journal_path: JSONL file with answers saved since the last compaction.
+            compact_threshold: Journal length that triggers a compaction on save (0 disables it).
+        """
+        self.snapshot_path = str(snapshot_path)
+        self.journal_path = str(journal_path)
+        self.lock_path = f"{self.journal_path}.lock"
+        self.compact_threshold = compact_threshold
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # question -> entry
+        self._journal_length = 0
+        self._loaded = False  # Compacting before loading would overwrite the snapshot with the journal alone
+        self._lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+
+    def exists(self) -> bool:
+        """True if there is a snapshot or a journal to load."""
+        return os.path.exists(self.snapshot_path) or os.path.exists(self.journal_path)
+
+    @contextlib.contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Holds the thread lock and the inter-process lock on the files."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _read_files(self) -> Tuple["OrderedDict[str, Dict[str, Any]]", int]:
+        """
+        Reads the snapshot and replays the journal on top of it. Returns the entries and the journal length.
+        Must be called while holding the file lock.
+        """
+        entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                for entry in json.load(f):
+                    entries[entry['q']] = entry
+
+        journal_length = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'rb+') as f:
+                data = f.read()
+                complete_length = data.rfind(b"\n") + 1
+                if complete_length < len(data):
+                    # Drop the torn last line of a crash mid-append, so the next append starts on a fresh line
+                    f.truncate(complete_length)
+
+            for line in data[:complete_length].decode('utf-8').splitlines():
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                entries.pop(entry['q'], None)
+                entries[entry['q']] = entry
+                journal_length += 1
+        return entries, journal_length
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Reads the snapshot, replays the journal on top of it and returns all entries."""
+        with self._file_lock():
+            # Held for the whole read, so an answer saved meanwhile is never dropped from memory
+            self._entries, self._journal_length = self._read_files()
+            self._loaded = True
+            return list(self._entries.values())
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Returns all entries from memory."""
+        with self._lock:
+            return list(self._entries.values())
+
+    def save(self, question: str, answer: str) -> Dict[str, Any]:
+        """Adds or replaces the answer to a question with a single journal append. Returns the stored entry."""
+        entry = {
+            "q": question,
+            "a": answer,
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+
+        if not self._loaded:
+            self.load()
+        with self._file_lock():
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._entries.pop(question, None)
+            self._entries[question] = entry
+            self._journal_length += 1
+            should_compact = 0 < self.compact_threshold <= self._journal_length
+
+        if should_compact:
+            self.compact()
+        return entry
+
+    def compact(self) -> bool:
+        """
+        Folds the journal into the snapshot. Under the file lock, the snapshot and the whole journal are re-read,
+        so answers other workers appended are kept. The snapshot is replaced atomically, and the journal is only
+        truncated afterwards, so a crash at any point loses nothing (replaying a folded journal is harmless).
+        Returns False if there was nothing to compact.
+        """
+        with self._file_lock():
+            if not self._loaded:
+                return False
+            self._entries, folded = self._read_files()
+            self._journal_length = folded
+            if not folded:
+                return False  # Empty, or another worker compacted first
+
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(list(self._entries.values()), f, indent=4, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+
+            with open(self.journal_path, 'w', encoding='utf-8'):
+                pass
+            self._journal_length = 0
+
+        print(f"🗜️ Operator knowledge compacted ({folded} journal entries folded into the snapshot).")
+        return True
+
+    def start_compactor(self, interval: float = OPERATOR_COMPACT_INTERVAL) -> None:
+        """Starts a daemon thread that compacts the journal on a schedule."""
+        if self._compactor is not None or interval <= 0:
+            return
+
+        def compact_forever():
+            while not self._closed.wait(interval):
+                try:
+                    self.compact()
+                except Exception as e:
+                    print(f"⚠️ Operator knowledge compaction failed: {e}")
+
+        self._compactor = threading.Thread(target=compact_forever, name="operator-knowledge-compactor", daemon=True)
+        self._compactor.start()
+
+    def close(self) -> None:
+        """Stops the compactor thread and folds the journal into the snapshot."""
+        self._closed.set()
+        self.compact()
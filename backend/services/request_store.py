@@ -0,0 +1,254 @@
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional, Union
+from config import (
+    REQUEST_STORE_BACKEND, REQUEST_STORE_PATH, REQUEST_PENDING_TTL,
+    REQUEST_COMPLETED_TTL, REQUEST_STORE_SWEEP_INTERVAL, DEFAULT_TENANT
+)
+
+MessageId = Union[int, str]
+
+
+def message_key(chat_id: MessageId, message_id: MessageId) -> str:
+    """Telegram message IDs are only unique within a chat, so tenants' alerts are indexed by chat and message."""
+    return f"{chat_id}:{message_id}"
+
+
+class RequestStore(ABC):
+    """
+    State of escalated (HITL) requests and the Telegram message -> request index, shared by all tenants.
+    Pending requests live for REQUEST_PENDING_TTL, completed ones for REQUEST_COMPLETED_TTL.
+    """
+
+    def __init__(self, pending_ttl: float = REQUEST_PENDING_TTL, completed_ttl: float = REQUEST_COMPLETED_TTL):
+        self.pending_ttl = pending_ttl
+        self.completed_ttl = completed_ttl
+        self._sweeper: Optional[threading.Thread] = None
+
+    @abstractmethod
+    def create(self, req_id: str, user_query: str, suggestion: str, tenant_id: str = DEFAULT_TENANT) -> None:
+        """Registers a new pending request of a tenant."""
+
+    @abstractmethod
+    def get(self, req_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the request (status, user_query, answer, suggestion, tenant_id) or None if unknown or expired."""
+
+    @abstractmethod
+    def complete(self, req_id: str, answer: str) -> bool:
+        """Marks the request as completed with the final answer. Returns False if the request is unknown."""
+
+    @abstractmethod
+    def fail(self, req_id: str) -> bool:
+        """Marks the request as failed, e.g. when its operator alert couldn't be queued. Returns False if unknown."""
+
+    @abstractmethod
+    def link_message(self, message_id: MessageId, req_id: str) -> None:
+        """Indexes the Telegram alert message for the request, so operator replies can be matched."""
+
+    @abstractmethod
+    def pop_message(self, message_id: MessageId) -> Optional[str]:
+        """Removes the message link and returns the linked request ID, if any."""
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        """Deletes expired requests and message links. Returns the number of removed requests."""
+
+    def start_sweeper(self, interval: float = REQUEST_STORE_SWEEP_INTERVAL) -> None:
+        """Starts a daemon thread that purges expired entries on a schedule."""
+        if self._sweeper is not None:
+            return
+
+        def sweep_forever():
+            while True:
+                time.sleep(interval)
+                try:
+                    removed = self.purge_expired()
+                    if removed:
+                        print(f"🧹 Request store: {removed} expired requests removed.")
+                except Exception as e:
+                    print(f"⚠️ Request store sweep failed: {e}")
+
+        self._sweeper = threading.Thread(target=sweep_forever, name="request-store-sweeper", daemon=True)
+        self._sweeper.start()
+
+
+class InMemoryRequestStore(RequestStore):
+    """Process-local store with TTL eviction."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._requests: Dict[str, Dict[str, Any]] = {}
+        self._expires_at: Dict[str, float] = {}
+        self._messages: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def create(self, req_id: str, user_query: str, suggestion: str, tenant_id: str = DEFAULT_TENANT) -> None:
+        with self._lock:
+            self._requests[req_id] = {
+                "status": "pending",
+                "user_query": user_query,
+                "answer": None,
+                "suggestion": suggestion,
+                "tenant_id": tenant_id
+            }
+            self._expires_at[req_id] = time.time() + self.pending_ttl
+
+    def get(self, req_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if self._expires_at.get(req_id, 0) < time.time():
+                return None
+            return dict(self._requests[req_id])
+
+    def complete(self, req_id: str, answer: str) -> bool:
+        with self._lock:
+            if req_id not in self._requests:
+                return False
+            self._requests[req_id].update(status="completed", answer=answer)
+            self._expires_at[req_id] = time.time() + self.completed_ttl
+            return True
+
+    def fail(self, req_id: str) -> bool:
+        with self._lock:
+            if req_id not in self._requests:
+                return False
+            self._requests[req_id]["status"] = "failed"
+            self._expires_at[req_id] = time.time() + self.completed_ttl
+            return True
+
+    def link_message(self, message_id: MessageId, req_id: str) -> None:
+        with self._lock:
+            self._messages[str(message_id)] = req_id
+
+    def pop_message(self, message_id: MessageId) -> Optional[str]:
+        with self._lock:
+            req_id = self._messages.pop(str(message_id), None)
+            return req_id if req_id in self._requests else None
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = {req_id for req_id, expires_at in self._expires_at.items() if expires_at < now}
+            for req_id in expired:
+                del self._requests[req_id]
+                del self._expires_at[req_id]
+            for message_id in [m for m, req_id in self._messages.items() if req_id in expired]:
+                del self._messages[message_id]
+            return len(expired)
+
+
+class SQLiteRequestStore(RequestStore):
+    """
+    SQLite (WAL) store shared by every worker process on the host,
+    so a Telegram webhook can be matched no matter which worker receives it.
+    """
+
+    def __init__(self, path=REQUEST_STORE_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.path = str(path)
+        self._local = threading.local()  # One connection per thread
+        with self._connection() as conn:
+            conn.executescript(f"""
+                CREATE TABLE IF NOT EXISTS requests (
+                    request_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    user_query TEXT NOT NULL,
+                    suggestion TEXT,
+                    answer TEXT,
+                    tenant_id TEXT NOT NULL DEFAULT '{DEFAULT_TENANT}',
+                    expires_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_requests_expires_at ON requests (expires_at);
+                CREATE TABLE IF NOT EXISTS messages (
+                    message_id TEXT PRIMARY KEY,
+                    request_id TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_messages_request_id ON messages (request_id);
+            """)
+            # Stores created before tenants existed hold only default-tenant requests
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(requests)")}
+            if "tenant_id" not in columns:
+                conn.execute(f"ALTER TABLE requests ADD COLUMN tenant_id TEXT NOT NULL DEFAULT '{DEFAULT_TENANT}'")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def create(self, req_id: str, user_query: str, suggestion: str, tenant_id: str = DEFAULT_TENANT) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO requests "
+                "(request_id, status, user_query, suggestion, answer, tenant_id, expires_at) "
+                "VALUES (?, 'pending', ?, ?, NULL, ?, ?)",
+                (req_id, user_query, suggestion, tenant_id, time.time() + self.pending_ttl)
+            )
+
+    def get(self, req_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            "SELECT status, user_query, answer, suggestion, tenant_id FROM requests WHERE request_id = ? AND expires_at >= ?",
+            (req_id, time.time())
+        ).fetchone()
+        return dict(row) if row else None
+
+    def complete(self, req_id: str, answer: str) -> bool:
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "UPDATE requests SET status = 'completed', answer = ?, expires_at = ? WHERE request_id = ?",
+                (answer, time.time() + self.completed_ttl, req_id)
+            )
+            return cursor.rowcount > 0
+
+    def fail(self, req_id: str) -> bool:
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "UPDATE requests SET status = 'failed', expires_at = ? WHERE request_id = ?",
+                (time.time() + self.completed_ttl, req_id)
+            )
+            return cursor.rowcount > 0
+
+    def link_message(self, message_id: MessageId, req_id: str) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO messages (message_id, request_id) VALUES (?, ?)",
+                (str(message_id), req_id)
+            )
+
+    def pop_message(self, message_id: MessageId) -> Optional[str]:
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT m.request_id FROM messages m JOIN requests r ON r.request_id = m.request_id "
+                "WHERE m.message_id = ?",
+                (str(message_id),)
+            ).fetchone()
+            conn.execute("DELETE FROM messages WHERE message_id = ?", (str(message_id),))
+            return row["request_id"] if row else None
+
+    def purge_expired(self) -> int:
+        with self._connection() as conn:
+            now = time.time()
+            conn.execute(
+                "DELETE FROM messages WHERE request_id IN (SELECT request_id FROM requests WHERE expires_at < ?)",
+                (now,)
+            )
+            return conn.execute("DELETE FROM requests WHERE expires_at < ?", (now,)).rowcount
+
+
+def create_request_store(backend: str = REQUEST_STORE_BACKEND) -> RequestStore:
+    """Builds the configured request store and starts its expiry sweeper."""
+    stores = {
+        "memory": InMemoryRequestStore,
+        "sqlite": SQLiteRequestStore
+    }
+    if backend not in stores:
+        raise ValueError(f"Unknown request store backend: {backend}")
+
+    store = stores[backend]()
+    store.start_sweeper()
+    return store
@@ -1,25 +1,33 @@
+import heapq
 import json
-import requests
-from typing import Optional
-from config import TG_ADMIN_ID, TG_BOT_TOKEN
+import queue
+import threading
+import time
+from typing import Optional, Callable, Dict, Any, List, Tuple
+from backend.services.http_clients import get_http_session
+from backend.utils.metrics import metrics
+from config import (
+    TG_ADMIN_ID, TG_BOT_TOKEN, TG_API_BASE_URL, TG_CONNECT_TIMEOUT, TG_READ_TIMEOUT,
+    TG_QUEUE_SIZE, TG_MAX_RETRIES, TG_RETRY_BACKOFF, TG_MIN_SEND_INTERVAL
+)
 
 
 class TelegramService:
-    """Telegram service for operator interaction."""
+    """Telegram service for operator interaction. One instance delivers the alerts of every tenant's operator chat."""
 
-    @staticmethod
-    def send_alert(request_id: str, user_query: str, ai_suggestion: str) -> Optional[int]:
-        """
-        Sends an alert to the operator when the AI is uncertain.
-
-        Args:
-            request_id (str): Unique request identifier.
-            user_query (str): The original text of the user's request.
-            ai_suggestion (str): The text of the AI-generated response.
+    def __init__(self):
+        self.session = get_http_session("telegram", connect_retries=0)  # send_alert owns the retries
+        self._queue = queue.Queue(maxsize=TG_QUEUE_SIZE)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._rate_lock = threading.Lock()
+        self._last_sent_at: Dict[str, float] = {}  # chat_id -> monotonic time of the last send
+        self._scheduled: List[Tuple[float, int, Tuple]] = []  # (due time, seq, alert) heap, owned by the worker
+        self._scheduled_seq = 0
 
-        Returns:
-            Optional[int]: ID of the sent message if successful, otherwise None.
-        """
+    @staticmethod
+    def _build_payload(request_id: str, user_query: str, ai_suggestion: str, chat_id: str) -> Dict[str, Any]:
+        """Builds the sendMessage payload with the alert text and the Approve button."""
         message = (
             f"🚨 **Pending Request**\n\n"
             f"👤 **Guest asked:** {user_query}\n"
@@ -37,24 +45,173 @@ class TelegramService:
             ]]
         }
 
-        payload = {
-            "chat_id": TG_ADMIN_ID,
+        return {
+            "chat_id": chat_id,
             "text": message,
             "parse_mode": "Markdown",
             "reply_markup": json.dumps(keyboard)
         }
 
+    def _reserve_send_slot(self, chat_id: str) -> float:
+        """
+        Keeps consecutive sends to a chat at least TG_MIN_SEND_INTERVAL apart (Telegram's per-chat limit).
+        Returns 0 if a send may go out now (the slot is taken), otherwise the seconds to wait before asking again.
+        """
+        with self._rate_lock:
+            delay = self._last_sent_at.get(chat_id, 0.0) + TG_MIN_SEND_INTERVAL - time.monotonic()
+            if delay > 0:
+                return delay
+            self._last_sent_at[chat_id] = time.monotonic()
+            return 0.0
+
+    @metrics.timed("telegram_send")
+    def _send_once(self, payload: Dict[str, Any], attempt: int) -> Tuple[Optional[int], Optional[float]]:
+        """
+        Makes one sendMessage attempt.
+
+        Returns:
+            Tuple[Optional[int], Optional[float]]: The message ID if sent, otherwise the seconds to wait
+            before retrying (Telegram's retry_after or exponential backoff), or None if a retry won't help.
+        """
+        delay = TG_RETRY_BACKOFF * 2 ** attempt
         try:
-            response = requests.post(
-                url=f"https://api.telegram.org/bot{TG_BOT_TOKEN}/sendMessage",
-                json=payload
+            response = self.session.post(
+                url=f"{TG_API_BASE_URL}/bot{TG_BOT_TOKEN}/sendMessage",
+                json=payload,
+                timeout=(TG_CONNECT_TIMEOUT, TG_READ_TIMEOUT)
             )
             resp_data = response.json()
-            if resp_data.get("ok"):
-                return resp_data["result"]["message_id"]
-            else:
-                print(f"❌ Telegram Error: {resp_data}")
-                return None
         except Exception as e:
             print(f"❌ Telegram Exception: {e}")
-            return None
+            return None, delay
+
+        if resp_data.get("ok"):
+            return resp_data["result"]["message_id"], None
+
+        print(f"❌ Telegram Error: {resp_data}")
+        if response.status_code == 429:
+            return None, resp_data.get("parameters", {}).get("retry_after", delay)
+        if response.status_code < 500:
+            metrics.inc("chat_errors_total", stage="telegram_send")
+            return None, None  # Client errors won't succeed on retry
+        return None, delay
+
+    def send_alert(
+        self,
+        request_id: str,
+        user_query: str,
+        ai_suggestion: str,
+        chat_id: str = TG_ADMIN_ID
+    ) -> Optional[int]:
+        """
+        Sends an alert to the operator when the AI is uncertain.
+        Blocks until delivered: retries with exponential backoff and honours Telegram's retry_after.
+        The background delivery queue doesn't use it, so its retries never hold up other alerts.
+
+        Args:
+            request_id (str): Unique request identifier.
+            user_query (str): The original text of the user's request.
+            ai_suggestion (str): The text of the AI-generated response.
+            chat_id (str): The operator chat of the tenant the request belongs to.
+
+        Returns:
+            Optional[int]: ID of the sent message if successful, otherwise None.
+        """
+        payload = self._build_payload(request_id, user_query, ai_suggestion, chat_id)
+
+        for attempt in range(TG_MAX_RETRIES + 1):
+            wait = self._reserve_send_slot(str(chat_id))
+            while wait > 0:
+                time.sleep(wait)
+                wait = self._reserve_send_slot(str(chat_id))
+
+            msg_id, retry_in = self._send_once(payload, attempt)
+            if msg_id or retry_in is None:
+                return msg_id
+            if attempt < TG_MAX_RETRIES:
+                time.sleep(retry_in)
+
+        metrics.inc("chat_errors_total", stage="telegram_send")
+        return None
+
+    def enqueue_alert(
+        self,
+        request_id: str,
+        user_query: str,
+        ai_suggestion: str,
+        on_delivered: Optional[Callable[[int], None]] = None,
+        chat_id: str = TG_ADMIN_ID
+    ) -> bool:
+        """
+        Queues an alert for background delivery and returns immediately.
+
+        Args:
+            request_id (str): Unique request identifier.
+            user_query (str): The original text of the user's request.
+            ai_suggestion (str): The text of the AI-generated response.
+            on_delivered (Callable[[int], None]): Called with the Telegram message ID once the alert is sent.
+            chat_id (str): The operator chat of the tenant the request belongs to.
+
+        Returns:
+            bool: False if the delivery queue is full and the alert was dropped.
+        """
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((request_id, user_query, ai_suggestion, on_delivered, chat_id, 0))
+            return True
+        except queue.Full:
+            print(f"⚠️ Telegram queue is full, alert for {request_id} dropped.")
+            return False
+
+    def _ensure_worker(self) -> None:
+        """Starts the delivery worker thread on first use."""
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._deliver_forever, name="telegram-delivery", daemon=True)
+                self._worker.start()
+
+    def _deliver_forever(self) -> None:
+        """
+        Delivers alerts one at a time, which also keeps us within rate limits. An alert that has to wait
+        (for a retry or its chat's send interval) is scheduled instead of slept on, so a failing
+        operator chat doesn't hold up the alerts of other tenants.
+        """
+        while True:
+            now = time.monotonic()
+            if self._scheduled and self._scheduled[0][0] <= now:
+                delivery = heapq.heappop(self._scheduled)[2]
+            else:
+                timeout = self._scheduled[0][0] - now if self._scheduled else None
+                try:
+                    delivery = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    continue
+                self._queue.task_done()
+            self._deliver(delivery)
+
+    def _schedule(self, delay: float, delivery: Tuple) -> None:
+        """Puts an alert back for the delivery worker to pick up in `delay` seconds."""
+        self._scheduled_seq += 1
+        heapq.heappush(self._scheduled, (time.monotonic() + delay, self._scheduled_seq, delivery))
+
+    def _deliver(self, delivery: Tuple) -> None:
+        """Makes one delivery attempt of a queued alert and schedules its retry if it failed."""
+        request_id, user_query, ai_suggestion, on_delivered, chat_id, attempt = delivery
+        wait = self._reserve_send_slot(str(chat_id))
+        if wait > 0:
+            self._schedule(wait, delivery)
+            return
+
+        try:
+            payload = self._build_payload(request_id, user_query, ai_suggestion, chat_id)
+            msg_id, retry_in = self._send_once(payload, attempt)
+            if msg_id:
+                if on_delivered:
+                    on_delivered(msg_id)
+            elif retry_in is not None and attempt < TG_MAX_RETRIES:
+                self._schedule(retry_in, (request_id, user_query, ai_suggestion, on_delivered, chat_id, attempt + 1))
+            elif retry_in is not None:
+                metrics.inc("chat_errors_total", stage="telegram_send")
+        except Exception as e:
+            metrics.inc("chat_errors_total", stage="telegram_delivery")
+            print(f"❌ Telegram delivery failed for {request_id}: {e}")
@@ -1,29 +1,333 @@
+import threading
 import chromadb
-from config import PROJECT_ROOT
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+from backend.services.keyword_index import BM25Index
+from backend.utils.metrics import metrics
+from backend.utils.query_embedding_cache import QueryEmbeddingCache
+from backend.utils.text import normalize_text
+from config import VECTOR_DB_PATH, HYBRID_CANDIDATES, RRF_K
+
+RESULT_FIELDS = ("ids", "documents", "metadatas", "distances", "embeddings", "keyword_scores")  # Per-query search fields
+Embedder = Callable[[List[str], bool], np.ndarray]  # (texts, is_query) -> float32 matrix
+
+# Process-wide registry: one PersistentClient per directory, one service per collection,
+# one query embedding cache per embedding model (shared by the tenants' collections)
+_clients: Dict[str, chromadb.ClientAPI] = {}
+_services: Dict[Tuple[str, str], "VectorDBService"] = {}
+_query_caches: Dict[str, QueryEmbeddingCache] = {}
+_registry_lock = threading.Lock()
+
+
+class EmbeddingError(RuntimeError):
+    """Raised when the embedder returned no vectors for some of the texts, e.g. the embedding endpoint is down."""
+
+
+def get_persistent_client(path=VECTOR_DB_PATH) -> chromadb.ClientAPI:
+    """Returns the shared ChromaDB client for the directory, creating it on first use."""
+    key = str(path)
+    with _registry_lock:
+        if key not in _clients:
+            _clients[key] = chromadb.PersistentClient(path=key)
+        return _clients[key]
+
+
+def get_vector_db(
+    collection: str = "hotel_knowledge",
+    embedder: Optional[Embedder] = None,
+    embedding_model: str = None,
+    path=VECTOR_DB_PATH,
+    lazy: bool = False
+) -> "VectorDBService":
+    """
+    Returns the shared service for a collection. The first call decides the embedder;
+    later calls for the same collection get the same instance.
+    """
+    key = (str(path), collection)
+    with _registry_lock:
+        service = _services.get(key)
+    if service is None:
+        service = VectorDBService(collection, embedder=embedder, embedding_model=embedding_model, path=path, lazy=lazy)
+        with _registry_lock:
+            service = _services.setdefault(key, service)
+    return service
+
+
+def get_query_cache(embedding_model: str) -> QueryEmbeddingCache:
+    """Returns the shared query embedding cache of an embedding model, loading it from disk on first use."""
+    with _registry_lock:
+        if embedding_model not in _query_caches:
+            _query_caches[embedding_model] = QueryEmbeddingCache(embedding_model)
+        return _query_caches[embedding_model]
+
+
+def release_vector_db(collection: str, path=VECTOR_DB_PATH) -> None:
+    """Forgets the shared service of a collection (and its in-memory keyword index); the client stays open."""
+    with _registry_lock:
+        _services.pop((str(path), collection), None)
+
+
+def close_all() -> None:
+    """Forgets every shared service, persists the query embedding caches and releases the ChromaDB clients."""
+    with _registry_lock:
+        clients = list(_clients.values())
+        query_caches = list(_query_caches.values())
+        _clients.clear()
+        _services.clear()
+        _query_caches.clear()
+
+    for query_cache in query_caches:
+        try:
+            query_cache.save()
+        except OSError as e:
+            print(f"⚠️ Could not save the query embedding cache: {e}")
+
+    # Chroma has no public per-client close: dropping its cached systems and our references lets them be
+    # collected, which releases their files, and a later client for the same path starts a fresh system
+    if clients:
+        clients[0].clear_system_cache()
+    clients.clear()
 
 
 class VectorDBService:
 
-    def __init__(self, collection="hotel_knowledge"):
-        self.client = chromadb.PersistentClient(path=PROJECT_ROOT / "chroma_db")
-        self.collection = self.client.get_or_create_collection(name=collection, metadata={"hnsw:space": "cosine"})
+    def __init__(
+        self,
+        collection="hotel_knowledge",
+        embedder: Optional[Embedder] = None,
+        embedding_model: str = None,
+        path=VECTOR_DB_PATH,
+        lazy: bool = False
+    ):
+        """
+        Args:
+            collection: Name of the ChromaDB collection.
+            embedder: Computes document and query vectors for the collection (e.g. LLMService.embed_content).
+                      If omitted, ChromaDB's default embedding function is used.
+            embedding_model: Identifies the embedder's vector space, so stale indexes can be detected.
+            path: Directory of the persistent ChromaDB store.
+            lazy: If True, the client and collection are opened on first use instead of now.
+        """
+        self.path = path
+        self.collection_name = collection
+        self.embedder = embedder
+        self.embedding_model = embedding_model or ("chroma-default" if embedder is None else "custom")
+        self.embedding_function = DefaultEmbeddingFunction()
+        self.keyword_index = BM25Index()  # Mirrors the collection's documents for hybrid search
+        self.query_cache = get_query_cache(self.embedding_model)
+        self._client = None
+        self._collection = None
+        self._open_lock = threading.Lock()
+        if not lazy:
+            self._open()
+
+    def _open(self):
+        with self._open_lock:
+            if self._collection is None:
+                self._client = get_persistent_client(self.path)
+                self._collection = self._open_collection()
+                self._load_keyword_index()
+        return self._collection
+
+    @property
+    def client(self) -> chromadb.ClientAPI:
+        self._open()
+        return self._client
+
+    @property
+    def collection(self):
+        return self._collection if self._collection is not None else self._open()
+
+    def _open_collection(self):
+        return self._client.get_or_create_collection(
+            name=self.collection_name,
+            metadata={"hnsw:space": "cosine"},
+            embedding_function=self.embedding_function
+        )
+
+    def _load_keyword_index(self):
+        """Builds the keyword index from the documents already stored in the collection."""
+        stored = self._collection.get(include=["documents", "metadatas"])
+        self.keyword_index.clear()
+        self.keyword_index.upsert(stored["ids"], stored["documents"], stored["metadatas"])
+
+    def reset(self):
+        """Drops and recreates the collection, e.g. when the embedding model changed."""
+        self.client.delete_collection(self.collection_name)
+        self._collection = self._open_collection()
+        self.keyword_index.clear()
+
+    def _embed(self, texts: List[str], is_query: bool) -> np.ndarray:
+        embeddings = self.embedder(texts, is_query)
+        if len(embeddings) != len(texts):
+            raise EmbeddingError(f"Embedding failed for {len(texts)} texts")
+        return embeddings
 
     def upsert_batch(self, documents, ids, metadatas):
         if documents:
-            self.collection.upsert(documents=documents, ids=ids, metadatas=metadatas)
+            if self.embedder is None:
+                self.collection.upsert(documents=documents, ids=ids, metadatas=metadatas)
+            else:
+                embeddings = self._embed(documents, False)
+                self.collection.upsert(documents=documents, embeddings=embeddings, ids=ids, metadatas=metadatas)
+            self.keyword_index.upsert(ids, documents, metadatas)
 
     def delete_by_ids(self, ids):
         if ids:
             self.collection.delete(ids=ids)
+            self.keyword_index.delete(ids)
 
     def get_ids_by_metadata(self, filter_dict):
-        results = self.collection.get(where=filter_dict)
+        results = self.collection.get(where=filter_dict, include=[])
         return results['ids']
 
-    def search(self, query_text, n_results=3, where_filter=None):
-        results = self.collection.query(
-            query_texts=[query_text],
+    def embed_query(self, query_text) -> np.ndarray:
+        """Embeds a query the same way the collection's documents were embedded."""
+        return self.embed_queries([query_text])[0]
+
+    def embed_queries(self, query_texts: List[str]) -> np.ndarray:
+        """
+        Embeds many queries, returning one float32 row per query. Queries seen before (compared as normalized text)
+        are served from the query embedding cache; the rest are embedded in one call.
+        """
+        if not query_texts:
+            return self._embed_uncached(query_texts)
+        keys = [normalize_text(text) for text in query_texts]
+        vectors = self.query_cache.get_many(keys)
+
+        missing = {key: text for key, text in zip(keys, query_texts) if key not in vectors}
+        metrics.inc("query_embedding_cache_total", len(query_texts) - len(missing), result="hit")
+        if missing:
+            metrics.inc("query_embedding_cache_total", len(missing), result="miss")
+            embeddings = self._embed_uncached(list(missing.values()))
+            new_vectors = dict(zip(missing, embeddings))
+            self.query_cache.put_many({key: vector for key, vector in new_vectors.items() if key})
+            vectors.update(new_vectors)
+
+        return np.stack([vectors[key] for key in keys]).astype(np.float32, copy=False)
+
+    def _embed_uncached(self, query_texts: List[str]) -> np.ndarray:
+        if self.embedder is None:
+            return np.asarray(self.embedding_function(query_texts), dtype=np.float32)
+        return self._embed(query_texts, True)
+
+    def search(
+        self, query_text, n_results=3, where_filter=None, query_embedding=None, mode="vector", include_embeddings=False
+    ):
+        """
+        Searches the collection.
+
+        Args:
+            mode: "vector" for cosine similarity only, or "hybrid" to fuse vector and BM25 keyword
+                  rankings with reciprocal-rank fusion. Hybrid results carry an extra "keyword_scores" list
+                  (share of query terms found in each document).
+            include_embeddings: If True, results also carry the stored document vectors ("embeddings").
+        """
+        query_embeddings = None if query_embedding is None else [query_embedding]
+        return self.search_batch([query_text], n_results, where_filter, query_embeddings, mode, include_embeddings)
+
+    @metrics.timed("vector_search")
+    def search_batch(
+        self,
+        query_texts: List[str],
+        n_results=3,
+        where_filter=None,
+        query_embeddings=None,
+        mode="vector",
+        include_embeddings=False
+    ) -> Dict[str, list]:
+        """
+        Searches the collection for many queries with a single embedding call and a single ChromaDB query.
+        Takes the same options as search(); every field of the result has one entry per query,
+        e.g. results['documents'][i] are the documents found for query_texts[i].
+        """
+        if not query_texts:
+            return {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        if query_embeddings is None:
+            query_embeddings = self.embed_queries(query_texts)
+
+        include = ["documents", "metadatas", "distances"] + (["embeddings"] if include_embeddings else [])
+        if mode == "hybrid" and self.keyword_index.supports_filter(where_filter):
+            return self._hybrid_search(query_texts, query_embeddings, n_results, where_filter, include)
+
+        return self.collection.query(
+            query_embeddings=list(query_embeddings),
             n_results=n_results,
-            where=where_filter
+            where=where_filter,
+            include=include
         )
+
+    @staticmethod
+    def split_results(results: Dict[str, list]) -> List[Dict[str, list]]:
+        """Splits batched search results into per-query results shaped like search() output."""
+        fields = [field for field in RESULT_FIELDS if results.get(field) is not None]
+        return [{field: [results[field][i]] for field in fields} for i in range(len(results["ids"]))]
+
+    def _hybrid_search(self, query_texts, query_embeddings, n_results, where_filter, include):
+        candidates = max(n_results, HYBRID_CANDIDATES)
+        vector_results = self.collection.query(
+            query_embeddings=list(query_embeddings),
+            n_results=candidates,
+            where=where_filter,
+            include=include
+        )
+        include_embeddings = "embeddings" in include
+
+        fused_ids = []
+        keyword_coverage = []
+        docs: Dict[str, tuple] = {}
+        for i, query_text in enumerate(query_texts):
+            keyword_results = self.keyword_index.search(query_text, candidates, where_filter)
+
+            # Reciprocal-rank fusion
+            fused: Dict[str, float] = {}
+            for rank, doc_id in enumerate(vector_results['ids'][i]):
+                fused[doc_id] = fused.get(doc_id, 0.0) + 1 / (RRF_K + rank + 1)
+            for rank, (doc_id, _, _) in enumerate(keyword_results):
+                fused[doc_id] = fused.get(doc_id, 0.0) + 1 / (RRF_K + rank + 1)
+            fused_ids.append(sorted(fused, key=fused.get, reverse=True)[:n_results])
+            keyword_coverage.append({doc_id: doc_coverage for doc_id, _, doc_coverage in keyword_results})
+
+            vector_embeddings = vector_results['embeddings'][i] if include_embeddings else [None] * len(vector_results['ids'][i])
+            for doc_id, document, metadata, embedding in zip(
+                vector_results['ids'][i], vector_results['documents'][i], vector_results['metadatas'][i], vector_embeddings
+            ):
+                docs[doc_id] = (document, metadata, embedding)
+
+        distances = [
+            dict(zip(vector_results['ids'][i], vector_results['distances'][i])) for i in range(len(query_texts))
+        ]
+
+        # Keyword-only hits need their stored vector for a cosine distance; fetched once for all queries
+        missing = {
+            doc_id for i, top_ids in enumerate(fused_ids) for doc_id in top_ids
+            if doc_id not in distances[i] and (doc_id not in docs or docs[doc_id][2] is None)
+        }
+        if missing:
+            stored = self.collection.get(ids=list(missing), include=["documents", "metadatas", "embeddings"])
+            for doc_id, document, metadata, embedding in zip(
+                stored['ids'], stored['documents'], stored['metadatas'], stored['embeddings']
+            ):
+                docs[doc_id] = (document, metadata, embedding)
+
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": [], "keyword_scores": []}
+        if include_embeddings:
+            results["embeddings"] = []
+        for i, top_ids in enumerate(fused_ids):
+            top_ids = [doc_id for doc_id in top_ids if doc_id in docs]
+            query_vector = np.asarray(query_embeddings[i], dtype=np.float32)
+            for doc_id in top_ids:
+                if doc_id not in distances[i]:
+                    embedding = np.asarray(docs[doc_id][2], dtype=np.float32)
+                    similarity = float(embedding @ query_vector) / (np.linalg.norm(embedding) * np.linalg.norm(query_vector))
+                    distances[i][doc_id] = 1 - similarity
+
+            results["ids"].append(top_ids)
+            results["documents"].append([docs[doc_id][0] for doc_id in top_ids])
+            results["metadatas"].append([docs[doc_id][1] for doc_id in top_ids])
+            results["distances"].append([distances[i][doc_id] for doc_id in top_ids])
+            results["keyword_scores"].append([keyword_coverage[i].get(doc_id, 0.0) for doc_id in top_ids])
+            if include_embeddings:
+                results["embeddings"].append([docs[doc_id][2] for doc_id in top_ids])
         return results
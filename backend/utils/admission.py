@@ -0,0 +1,201 @@
+import asyncio
+import contextlib
+import math
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Iterator, Optional
+from backend.utils.metrics import metrics
+from backend.utils.rate_limiter import RateLimiter
+from config import LLM_MAX_IN_FLIGHT, LLM_MAX_QUEUE, LLM_QUEUE_TIMEOUT, LLM_RATE_LIMIT, LLM_RATE_BURST
+
+
+class OverloadedError(Exception):
+    """
+    Raised when a call is not admitted: 429 if the start rate is exceeded,
+    503 if the wait queue is full or the wait timed out.
+    """
+
+    def __init__(self, reason: str, retry_after: int, status: int):
+        super().__init__(f"Service overloaded ({reason}), retry in {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+        self.status = status
+
+
+class _Waiter:
+    """A queued call; `notify` wakes it once a released slot has been handed over to it."""
+
+    __slots__ = ("notify", "granted")
+
+    def __init__(self, notify: Callable[[], None]):
+        self.notify = notify
+        self.granted = False
+
+
+class AdmissionController:
+    """
+    Caps the concurrent calls to a backend: at most `max_in_flight` run at once, up to `max_queue` more
+    wait in FIFO order for `queue_timeout` seconds, and new calls start at no more than `rate` per second
+    (bursts of `burst`). Anything beyond that is rejected at once with OverloadedError, so a traffic spike
+    gets a quick "retry later" instead of piling up requests the backend would rate-limit anyway.
+    Threads (admit) and coroutines (admit_async) share the same slots.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int,
+        max_queue: int,
+        queue_timeout: float,
+        rate: float = 0,
+        burst: int = 1
+    ):
+        """
+        Args:
+            name: Label of the controller's metrics (e.g. "llm").
+            max_in_flight: Calls allowed to run at the same time.
+            max_queue: Calls allowed to wait for a slot; 0 rejects as soon as every slot is taken.
+            queue_timeout: Seconds a call may wait for a slot.
+            rate, burst: Token bucket for call starts; a rate of 0 disables it.
+        """
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.rate_limiter = RateLimiter(rate, burst)
+        self._in_flight = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._avg_hold = 1.0  # Moving average of the seconds a slot is held, for Retry-After estimates
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _publish(self) -> None:
+        """Updates the gauges. Must be called while holding the lock."""
+        metrics.set_gauge("admission_in_flight", self._in_flight, pool=self.name)
+        metrics.set_gauge("admission_queue_depth", len(self._waiters), pool=self.name)
+
+    def _reject(self, reason: str, retry_after: float, status: int) -> OverloadedError:
+        metrics.inc("admission_rejections_total", pool=self.name, reason=reason)
+        return OverloadedError(reason, max(1, math.ceil(retry_after)), status)
+
+    def _estimated_wait(self) -> float:
+        """Seconds until the queue ahead of a new call has drained, at the recent service rate."""
+        return self._avg_hold * (len(self._waiters) + 1) / self.max_in_flight
+
+    def _try_enter(self, waiter: _Waiter) -> bool:
+        """
+        Takes a free slot (True) or queues the waiter (False).
+        Raises OverloadedError if the call is rate-limited or the queue is full.
+        """
+        with self._lock:
+            if self._in_flight < self.max_in_flight and not self._waiters:
+                free = True
+            elif len(self._waiters) >= self.max_queue:
+                raise self._reject("queue_full", self._estimated_wait(), 503)
+            else:
+                free = False
+
+            delay = self.rate_limiter.try_acquire()
+            if delay:
+                raise self._reject("rate_limited", delay, 429)
+
+            if free:
+                self._in_flight += 1
+            else:
+                self._waiters.append(waiter)
+            self._publish()
+            return free
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """
+        Gives up waiting. Returns True if a slot was handed over in the meantime,
+        in which case the caller owns it after all.
+        """
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            self._publish()
+            return False
+
+    def _release(self, held_for: Optional[float]) -> None:
+        """Hands the slot over to the oldest waiter, or frees it."""
+        with self._lock:
+            if held_for is not None:
+                self._avg_hold += 0.1 * (held_for - self._avg_hold)
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+            else:
+                waiter = None
+                self._in_flight -= 1
+            self._publish()
+        if waiter is not None:
+            waiter.notify()
+
+    def _timed_out(self) -> OverloadedError:
+        with self._lock:
+            return self._reject("queue_timeout", self._estimated_wait(), 503)
+
+    @contextlib.contextmanager
+    def admit(self) -> Iterator[None]:
+        """Holds a slot for the duration of the block: `with llm_admission.admit(): ...`"""
+        event = threading.Event()
+        waiter = _Waiter(event.set)
+        queued_at = time.perf_counter()
+        if not self._try_enter(waiter):
+            if not event.wait(self.queue_timeout) and not self._abandon(waiter):
+                raise self._timed_out()
+        metrics.observe("admission_wait_seconds", time.perf_counter() - queued_at, pool=self.name)
+
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(time.perf_counter() - started_at)
+
+    @contextlib.asynccontextmanager
+    async def admit_async(self) -> AsyncIterator[None]:
+        """Async variant of admit(): a queued call waits on the event loop instead of blocking it."""
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        # Slots are released from worker threads as well, so the wake-up is always scheduled on this loop
+        waiter = _Waiter(lambda: loop.call_soon_threadsafe(event.set))
+        queued_at = time.perf_counter()
+        if not self._try_enter(waiter):
+            try:
+                await asyncio.wait_for(event.wait(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                if not self._abandon(waiter):
+                    raise self._timed_out()
+            except asyncio.CancelledError:
+                # The client went away; a slot handed over meanwhile goes to the next waiter
+                if self._abandon(waiter):
+                    self._release(None)
+                raise
+        metrics.observe("admission_wait_seconds", time.perf_counter() - queued_at, pool=self.name)
+
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(time.perf_counter() - started_at)
+
+
+# Process-wide controller for chat completions, shared by every LLMService instance and tenant
+llm_admission = AdmissionController(
+    "llm",
+    max_in_flight=LLM_MAX_IN_FLIGHT,
+    max_queue=LLM_MAX_QUEUE,
+    queue_timeout=LLM_QUEUE_TIMEOUT,
+    rate=LLM_RATE_LIMIT,
+    burst=LLM_RATE_BURST
+)
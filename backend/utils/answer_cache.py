@@ -0,0 +1,154 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple, List
+import numpy as np
+from config import ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL, ANSWER_CACHE_SIMILARITY
+
+
+class SemanticAnswerCache:
+    """
+    In-memory LRU/TTL cache of direct answers keyed on query embeddings.
+    A lookup hits when a stored query is cosine-similar enough to the incoming one.
+    Query vectors live in rows of a single float32 matrix that grows up to `max_size` rows; a removed entry's
+    row is reused, so an insert never rebuilds the matrix. Expired entries are dropped lazily: when a lookup
+    hits one, or when they reach the least recently used end of the cache.
+    Answers can be tagged with the version of the prompt that produced them: a lookup with a new version
+    drops every cached answer, so a prompt reload takes effect at once instead of after the TTL.
+    """
+
+    def __init__(
+        self,
+        max_size: int = ANSWER_CACHE_SIZE,
+        ttl_seconds: float = ANSWER_CACHE_TTL,
+        similarity_threshold: float = ANSWER_CACHE_SIMILARITY
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[int, Tuple[str, float]]" = OrderedDict()  # row -> (answer, expires_at), LRU first
+        self._matrix: Optional[np.ndarray] = None
+        self._active: Optional[np.ndarray] = None  # Whether each matrix row holds an entry
+        self._free: List[int] = []  # Rows of removed entries, reused before the matrix grows
+        self._used = 0  # Rows handed out so far; only this prefix of the matrix is searched
+        self._version: Optional[str] = None  # Prompt version of the cached answers
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        """Flattens the embedding to float32 and scales it to unit length."""
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, embedding, version: Optional[str] = None) -> Optional[str]:
+        """
+        Returns the cached answer for the most similar stored query, or None on a miss.
+        With a version other than the cached answers', the cache is emptied first.
+        """
+        if self.max_size <= 0:
+            return None
+
+        query = self._normalize(embedding)
+
+        with self._lock:
+            if version is not None and version != self._version:
+                self._clear()
+                self._version = version
+                return None
+
+            if not self._entries:
+                return None
+
+            # Vectors from a different embedding model can't be compared
+            if self._matrix.shape[1] != query.shape[0]:
+                return None
+
+            similarities = self._matrix[:self._used] @ query
+            similarities[~self._active[:self._used]] = -np.inf
+            best_row = int(np.argmax(similarities))
+            if similarities[best_row] < self.similarity_threshold:
+                return None
+
+            answer, expires_at = self._entries[best_row]
+            if expires_at < time.monotonic():
+                self._remove(best_row)
+                return None
+
+            self._entries.move_to_end(best_row)
+            return answer
+
+    def put(self, embedding, answer: str, version: Optional[str] = None) -> None:
+        """
+        Stores an answer, evicting expired and least recently used entries when full.
+        An answer from another prompt version than the cached ones (the prompt changed mid-turn) is not stored.
+        """
+        if self.max_size <= 0:
+            return
+
+        vector = self._normalize(embedding)
+        now = time.monotonic()
+
+        with self._lock:
+            if version is not None and version != self._version:
+                if self._version is not None:
+                    return
+                self._version = version
+
+            if self._matrix is not None and self._matrix.shape[1] != vector.shape[0]:
+                self._clear()  # The embedder's dimension changed
+
+            # Only the least recently used end is checked for expiry, the rest expire when a lookup hits them
+            while self._entries:
+                row, (_, expires_at) = next(iter(self._entries.items()))
+                if expires_at >= now:
+                    break
+                self._remove(row)
+
+            if len(self._entries) >= self.max_size:
+                self._remove(next(iter(self._entries)))
+
+            row = self._allocate_row(vector.shape[0])
+            self._matrix[row] = vector
+            self._active[row] = True
+            self._entries[row] = (answer, now + self.ttl_seconds)
+
+    def _allocate_row(self, dimension: int) -> int:
+        """Returns a free matrix row, growing the matrix if none is left. Must be called while holding the lock."""
+        if self._free:
+            return self._free.pop()
+        if self._matrix is None:
+            capacity = min(self.max_size, 64)
+            self._matrix = np.empty((capacity, dimension), dtype=np.float32)
+            self._active = np.zeros(capacity, dtype=bool)
+        elif self._used == self._matrix.shape[0]:
+            capacity = min(self.max_size, self._used * 2)
+            grown = np.empty((capacity, dimension), dtype=np.float32)
+            grown[:self._used] = self._matrix
+            self._matrix = grown
+            self._active = np.concatenate([self._active, np.zeros(capacity - self._used, dtype=bool)])
+        row = self._used
+        self._used += 1
+        return row
+
+    def clear(self) -> None:
+        """Drops every cached answer, e.g. after the knowledge base changed."""
+        with self._lock:
+            self._clear()
+
+    def _clear(self) -> None:
+        """Drops every entry. Must be called while holding the lock."""
+        self._entries.clear()
+        self._matrix = None
+        self._active = None
+        self._free = []
+        self._used = 0
+
+    def _remove(self, row: int) -> None:
+        """Removes a single entry and frees its row. Must be called while holding the lock."""
+        del self._entries[row]
+        self._active[row] = False
+        self._free.append(row)
+
+    def __len__(self) -> int:
+        return len(self._entries)
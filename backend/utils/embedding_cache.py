@@ -0,0 +1,56 @@
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, List
+import numpy as np
+from config import EMBEDDING_CACHE_PATH
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache keyed by a hash of the model name and the exact input text.
+    Vectors are stored as raw float32 blobs in SQLite (WAL), safe to share between threads and processes.
+    """
+
+    def __init__(self, path=EMBEDDING_CACHE_PATH):
+        self.path = str(path)
+        self._local = threading.local()  # One connection per thread
+        with self._connection() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        """Builds the cache key for a text embedded by the given model."""
+        return hashlib.sha256(f"{model}\0{text}".encode('utf-8')).hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Returns the cached vectors for the keys that are present."""
+        found = {}
+        conn = self._connection()
+        # Stay below SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk)
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, vectors: Dict[str, np.ndarray]) -> None:
+        """Stores vectors under their keys."""
+        if not vectors:
+            return
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in vectors.items()]
+            )
@@ -0,0 +1,198 @@
+import bisect
+import functools
+import threading
+import time
+from typing import Dict, List, Tuple, Callable, Any
+from config import METRICS_BUCKETS
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+QUANTILES = (0.5, 0.95, 0.99)  # Estimated from the buckets for local reports (e.g. the load test)
+
+# Metric name -> (Prometheus type, help text)
+METRIC_DESCRIPTIONS = {
+    "chat_stage_duration_seconds": ("histogram", "Duration of chat pipeline stages in seconds."),
+    "chat_responses_total": ("counter", "Chat responses by outcome (direct or pending)."),
+    "chat_cache_hits_total": ("counter", "Answers served from a cache, by cache kind."),
+    "query_embedding_cache_total": ("counter", "Query embedding lookups, by result (hit or miss)."),
+    "chat_errors_total": ("counter", "Errors by pipeline stage."),
+    "llm_repairs_total": ("counter", "Repair calls for unparseable model output, by outcome (fixed or failed)."),
+    "chat_coalesced_total": ("counter", "Requests that shared the result of an identical in-flight request, by outcome."),
+    "tenants_active": ("gauge", "Tenants whose knowledge base is loaded in memory."),
+    "tenant_evictions_total": ("counter", "Idle tenants unloaded to make room for others."),
+    "admission_in_flight": ("gauge", "Admitted calls currently running, by pool."),
+    "admission_queue_depth": ("gauge", "Calls waiting for a slot, by pool."),
+    "admission_wait_seconds": ("histogram", "Time admitted calls waited for a slot in seconds."),
+    "admission_rejections_total": ("counter", "Calls rejected by admission control, by pool and reason."),
+}
+
+
+class _Histogram:
+    """Count, sum and per-bucket sample counts; buckets are cumulated only when rendered."""
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * (len(bounds) + 1)  # The last one is +Inf
+        self.lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.bounds, value)
+        with self.lock:
+            self.count += 1
+            self.total += value
+            self.buckets[index] += 1
+
+    def snapshot(self) -> Tuple[int, float, List[int]]:
+        """Returns count, sum and the cumulative bucket counts."""
+        with self.lock:
+            count, total, buckets = self.count, self.total, list(self.buckets)
+        for i in range(1, len(buckets)):
+            buckets[i] += buckets[i - 1]
+        return count, total, buckets
+
+
+class _Timer:
+    """Context manager recording the elapsed time of a stage."""
+
+    __slots__ = ("registry", "stage", "started_at")
+
+    def __init__(self, registry: "MetricsRegistry", stage: str):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe("chat_stage_duration_seconds", time.perf_counter() - self.started_at, stage=self.stage)
+        return False
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics store rendered in the Prometheus text format.
+    Recording is a dict lookup plus a bucket increment under a per-metric lock. Latencies are histograms,
+    so the buckets of several workers can be summed and p50/p95/p99 derived with histogram_quantile().
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = METRICS_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[Tuple[str, LabelSet], _Histogram] = {}
+        self._counters: Dict[Tuple[str, LabelSet], float] = {}
+        self._gauges: Dict[Tuple[str, LabelSet], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Records a sample in a histogram metric."""
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, _Histogram(self.buckets))
+        histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        """Increments a counter."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        """Sets a gauge to the current value."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+
+    def timer(self, stage: str) -> _Timer:
+        """Times a block: `with metrics.timer("retrieval"): ...`"""
+        return _Timer(self, stage)
+
+    def timed(self, stage: str) -> Callable:
+        """Decorator form of timer()."""
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs) -> Any:
+                with self.timer(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _quantile(self, buckets: List[int], quantile: float) -> float:
+        """
+        Estimates a quantile from cumulative bucket counts by linear interpolation within the bucket,
+        like Prometheus' histogram_quantile(). Samples above the last bound are reported as that bound.
+        """
+        if not buckets[-1]:
+            return float("nan")
+        rank = quantile * buckets[-1]
+        index = bisect.bisect_left(buckets, rank)
+        if index >= len(self.buckets):
+            return self.buckets[-1]
+        lower = self.buckets[index - 1] if index else 0.0
+        below = buckets[index - 1] if index else 0
+        in_bucket = buckets[index] - below
+        return lower + (self.buckets[index] - lower) * ((rank - below) / in_bucket if in_bucket else 1)
+
+    def histogram_stats(self, name: str) -> Dict[LabelSet, Dict[str, float]]:
+        """Returns count, sum and estimated quantiles of every label set of a histogram metric."""
+        with self._lock:
+            histograms = {labels: histogram for (metric, labels), histogram in self._histograms.items() if metric == name}
+
+        stats = {}
+        for labels, histogram in histograms.items():
+            count, total, buckets = histogram.snapshot()
+            stats[labels] = {"count": count, "sum": total, **{f"p{int(q * 100)}": self._quantile(buckets, q) for q in QUANTILES}}
+        return stats
+
+    @staticmethod
+    def _escape(value: Any) -> str:
+        """Escapes a label value as the text format requires: backslash, double quote and line feed."""
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    @classmethod
+    def _format_labels(cls, labels: LabelSet) -> str:
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{k}="{cls._escape(v)}"' for k, v in labels) + "}"
+
+    def render(self) -> str:
+        """Renders every metric in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = dict(self._histograms)
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+
+        lines = []
+        described = set()
+
+        def describe(name: str, default_type: str) -> None:
+            if name not in described:
+                metric_type, help_text = METRIC_DESCRIPTIONS.get(name, (default_type, name))
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                described.add(name)
+
+        for (name, labels), histogram in sorted(histograms.items()):
+            describe(name, "histogram")
+            count, total, buckets = histogram.snapshot()
+            for bound, cumulative in zip(self.buckets + ("+Inf",), buckets):
+                lines.append(f"{name}_bucket{self._format_labels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{name}_sum{self._format_labels(labels)} {total}")
+            lines.append(f"{name}_count{self._format_labels(labels)} {count}")
+
+        for (name, labels), value in sorted(counters.items()):
+            describe(name, "counter")
+            lines.append(f"{name}{self._format_labels(labels)} {value}")
+
+        for (name, labels), value in sorted(gauges.items()):
+            describe(name, "gauge")
+            lines.append(f"{name}{self._format_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry used by every service
+metrics = MetricsRegistry()
@@ -0,0 +1,129 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+from config import QUERY_EMBEDDING_CACHE_SIZE, QUERY_EMBEDDING_CACHE_DIR
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded in-memory LRU cache of query vectors for one embedding model, keyed on normalized query text.
+    Vectors live in rows of a single contiguous float32 matrix that grows up to `max_size` rows; an evicted
+    entry's row is reused, so an entry costs its vector bytes plus one dict slot.
+    With a `directory`, the cache is loaded at start and written back by save() (e.g. on shutdown).
+    """
+
+    def __init__(
+        self,
+        embedding_model: str,
+        max_size: int = QUERY_EMBEDDING_CACHE_SIZE,
+        directory=QUERY_EMBEDDING_CACHE_DIR
+    ):
+        """
+        Args:
+            embedding_model: The vector space of the cached vectors; persisted files of other models are never read.
+            max_size: Maximum number of cached queries; 0 disables the cache.
+            directory: Where the cache is persisted across restarts, or None to keep it in memory only.
+        """
+        self.embedding_model = embedding_model
+        self.max_size = max_size
+        self.path = None
+        if directory:
+            model_hash = hashlib.sha256(embedding_model.encode('utf-8')).hexdigest()[:16]
+            self.path = Path(directory) / f"query_embeddings_{model_hash}.npz"
+        self._rows: "OrderedDict[str, int]" = OrderedDict()  # key -> matrix row, least recently used first
+        self._matrix: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Returns copies of the cached vectors for the keys that are present."""
+        found = {}
+        if self.max_size <= 0:
+            return found
+        with self._lock:
+            for key in keys:
+                row = self._rows.get(key)
+                if row is not None:
+                    self._rows.move_to_end(key)
+                    found[key] = self._matrix[row].copy()
+        return found
+
+    def put_many(self, vectors: Dict[str, np.ndarray]) -> None:
+        """Stores vectors under their keys, evicting the least recently used entries when full."""
+        if self.max_size <= 0 or not vectors:
+            return
+        with self._lock:
+            for key, vector in vectors.items():
+                vector = np.asarray(vector, dtype=np.float32).ravel()
+                if self._matrix is not None and self._matrix.shape[1] != vector.shape[0]:
+                    self._reset()  # The embedder's dimension changed under the same model name
+                row = self._rows.get(key)
+                if row is None:
+                    row = self._allocate_row(vector.shape[0])
+                    self._rows[key] = row
+                self._rows.move_to_end(key)
+                self._matrix[row] = vector
+
+    def _allocate_row(self, dimension: int) -> int:
+        """Returns a free row, growing the matrix or evicting the LRU entry. Must be called while holding the lock."""
+        if self._matrix is None:
+            self._matrix = np.empty((min(self.max_size, 64), dimension), dtype=np.float32)
+        used = len(self._rows)
+        if used < self._matrix.shape[0]:
+            return used
+        if used < self.max_size:
+            grown = np.empty((min(self.max_size, used * 2), dimension), dtype=np.float32)
+            grown[:used] = self._matrix
+            self._matrix = grown
+            return used
+        _, row = self._rows.popitem(last=False)
+        return row
+
+    def _reset(self) -> None:
+        self._rows.clear()
+        self._matrix = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+
+    def _load(self) -> None:
+        if self.path is None or self.max_size <= 0 or not self.path.exists():
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if str(data["model"]) != self.embedding_model:
+                    return
+                keys, vectors = [str(key) for key in data["keys"]], data["vectors"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Query embedding cache {self.path} is unreadable, starting empty: {e}")
+            return
+
+        # The file is in LRU order, so a smaller max_size keeps the most recently used entries
+        keys, vectors = keys[-self.max_size:], vectors[-self.max_size:]
+        if keys:
+            self.put_many(dict(zip(keys, vectors)))
+            print(f"📥 Loaded {len(keys)} cached query embeddings for {self.embedding_model}.")
+
+    def save(self) -> None:
+        """Writes the cache to disk atomically (temp file + rename), least recently used entries first."""
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._rows:
+                return
+            keys = list(self._rows)
+            vectors = self._matrix[list(self._rows.values())]
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, model=np.array(self.embedding_model), keys=np.array(keys), vectors=vectors)
+        os.replace(tmp_path, self.path)
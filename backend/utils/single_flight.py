@@ -0,0 +1,115 @@
+import asyncio
+import threading
+from concurrent.futures import CancelledError, Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller (the leader) computes the result,
+    callers that arrive while it is running wait for it and share it. Threads and coroutines can join
+    the same flight. If the leader fails, its exception is raised to every waiter; if it is abandoned
+    (e.g. the client disconnected), the waiters start over and one of them becomes the new leader.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def _begin(self, key: str) -> Tuple[Future, bool]:
+        """Joins the flight for the key, or starts one. Returns the flight and whether the caller leads it."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = Future()
+            return flight, True
+
+    def lead_or_wait(self, key: str) -> Tuple[Optional[Future], Any]:
+        """
+        Starts a flight for the key, or waits for the one in progress.
+
+        Returns:
+            Tuple[Optional[Future], Any]: (flight, None) if the caller leads and must call end() with its outcome,
+            or (None, result) with the result of another caller's flight.
+        """
+        while True:
+            flight, is_leader = self._begin(key)
+            if is_leader:
+                return flight, None
+            try:
+                return None, flight.result()
+            except CancelledError:
+                continue  # The leader was abandoned
+
+    async def lead_or_wait_async(self, key: str) -> Tuple[Optional[Future], Any]:
+        """Async variant of lead_or_wait(): waiting for another caller's flight doesn't block the event loop."""
+        while True:
+            flight, is_leader = self._begin(key)
+            if is_leader:
+                return flight, None
+            try:
+                # Shielded, so a waiter that is cancelled itself doesn't cancel the shared flight
+                return None, await asyncio.shield(asyncio.wrap_future(flight))
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise
+
+    def end(self, key: str, flight: Future, result: Any = None, error: Optional[Exception] = None) -> None:
+        """
+        Publishes the leader's result or error. With neither, the flight is abandoned and its waiters retry.
+        Only the first call for a flight has an effect.
+        """
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            if flight.done():
+                return
+            if error is not None:
+                flight.set_exception(error)
+            elif result is not None:
+                flight.set_result(result)
+            else:
+                flight.cancel()
+
+    def do(self, key: str, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Returns compute()'s result, computed once for all concurrent callers with the same key.
+
+        Returns:
+            Tuple[Any, bool]: The result and True if it was shared from another caller's flight.
+        """
+        flight, shared = self.lead_or_wait(key)
+        if flight is None:
+            return shared, True
+
+        try:
+            result = compute()
+        except Exception as e:
+            self.end(key, flight, error=e)
+            raise
+        except BaseException:
+            self.end(key, flight)  # Abandoned, e.g. KeyboardInterrupt
+            raise
+        self.end(key, flight, result=result)
+        return result, False
+
+    async def do_async(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Async variant of do()."""
+        flight, shared = await self.lead_or_wait_async(key)
+        if flight is None:
+            return shared, True
+
+        try:
+            result = await compute()
+        except Exception as e:
+            self.end(key, flight, error=e)
+            raise
+        except BaseException:
+            self.end(key, flight)  # Abandoned, e.g. cancellation
+            raise
+        self.end(key, flight, result=result)
+        return result, False
@@ -0,0 +1,10 @@
+import re
+
+_PUNCTUATION_PATTERN = re.compile(r"[^\w\s]")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Folds case, strips punctuation and collapses whitespace, so trivially different phrasings compare equal."""
+    text = _PUNCTUATION_PATTERN.sub(" ", text.casefold())
+    return _WHITESPACE_PATTERN.sub(" ", text).strip()
@@ -1,44 +1,150 @@
 import os
+import threading
 import time
+from typing import Callable, Dict, Optional
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+from config import KB_RELOAD_DEBOUNCE, KB_RELOAD_MAX_DELAY
 
 
-class FAQUpdateHandler(FileSystemEventHandler):
+class ReloadScheduler:
+    """
+    Runs file reload callbacks on a background thread.
+    Bursts of change notifications are coalesced into one trailing reload per file, which starts once
+    the file has been quiet for `debounce` seconds (or `max_delay` after the first change of a burst).
+    Changes that arrive while a reload is running schedule another one, so no edit is missed.
+    """
 
-    def __init__(self, file_path, sync_callback):
-        self.file_path = os.path.abspath(file_path)
-        self.sync_callback = sync_callback
-        self.last_triggered = 0  # Time of last synchronization start
-        self.debounce_interval = 2 # Interval in seconds
+    def __init__(self, debounce: float = KB_RELOAD_DEBOUNCE, max_delay: float = KB_RELOAD_MAX_DELAY):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._callbacks: Dict[str, Callable[[], None]] = {}
+        self._pending: Dict[str, tuple] = {}  # path -> (first change, last change)
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._stopped = False
 
-    def on_modified(self, event):
-        if event.is_directory:
+    def register(self, file_path, callback: Callable[[], None]) -> None:
+        """Associates a reload callback with a file."""
+        self._callbacks[os.path.abspath(file_path)] = callback
+
+    def is_watched(self, file_path) -> bool:
+        return os.path.abspath(file_path) in self._callbacks
+
+    def notify(self, file_path) -> None:
+        """Records a change. Never blocks: safe to call from the observer thread."""
+        path = os.path.abspath(file_path)
+        if path not in self._callbacks:
             return
+        now = time.monotonic()
+        with self._condition:
+            first_change, _ = self._pending.get(path, (now, now))
+            self._pending[path] = (first_change, now)
+            self._condition.notify()
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run_forever, name="kb-reload", daemon=True)
+            self._worker.start()
 
-        current_event_path = os.path.abspath(event.src_path)
+    def _due_at(self, first_change: float, last_change: float) -> float:
+        return min(last_change + self.debounce, first_change + self.max_delay)
 
-        if current_event_path == self.file_path:
-            current_time = time.time()
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stops the worker and drops the callbacks, so nothing keeps the reloaded objects alive.
+        Waits up to `timeout` seconds for a running reload to finish.
+        """
+        with self._condition:
+            self._stopped = True
+            self._pending.clear()
+            self._condition.notify_all()
+        if self._worker is not None and self._worker is not threading.current_thread():
+            self._worker.join(timeout)
+        self._callbacks = {}
 
-            # If less than 2 seconds have passed since the last triggering, ignore it
-            if current_time - self.last_triggered < self.debounce_interval:
+    def _next_due(self) -> Optional[str]:
+        """Waits until a pending reload is due and takes it off the queue. Returns None once stopped."""
+        with self._condition:
+            while True:
+                if self._stopped:
+                    return None
+                now = time.monotonic()
+                due = {path: self._due_at(*changes) for path, changes in self._pending.items()}
+                ready = [path for path, due_at in due.items() if due_at <= now]
+                if ready:
+                    path = min(ready, key=due.get)
+                    del self._pending[path]
+                    return path
+                self._condition.wait(min(due.values()) - now if due else None)
+
+    def _run_forever(self) -> None:
+        while True:
+            path = self._next_due()
+            if path is None:
                 return
+            print(f"📝 Detected changes in {path}. Triggering sync...")
+            callback = self._callbacks.get(path)
+            if callback is None:
+                continue
+            try:
+                callback()
+            except Exception as e:
+                # A half-written file fails to parse; its final write schedules another reload
+                print(f"⚠️ Reload of {path} failed, keeping the previous data: {e}")
 
-            print(f"📝 Detect changes in {self.file_path}. Triggering sync...")
 
-            # Update the timestamp BEFORE sleeping and calling the function
-            self.last_triggered = current_time
+class KnowledgeFileHandler(FileSystemEventHandler):
+    """Forwards changes to watched files (including editors' and compaction's temp-file renames) to the scheduler."""
 
-            # Short pause so that the file has time to be completely written to the disk
-            time.sleep(1)
-            self.sync_callback()
+    def __init__(self, scheduler: ReloadScheduler):
+        self.scheduler = scheduler
 
+    def on_any_event(self, event):
+        if event.is_directory or event.event_type not in ("modified", "created", "moved"):
+            return
+        for path in (event.src_path, getattr(event, "dest_path", None)):
+            if path and self.scheduler.is_watched(path):
+                self.scheduler.notify(path)
 
-def start_faq_watcher(file_path, sync_callback):
-    event_handler = FAQUpdateHandler(file_path, sync_callback)
+
+class KnowledgeWatcher:
+    """Handle of a running watcher: the file observer and the reload scheduler it feeds."""
+
+    def __init__(self, observer: Observer, scheduler: ReloadScheduler):
+        self.observer = observer
+        self.scheduler = scheduler
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stops watching and joins both threads, releasing the reload callbacks."""
+        self.observer.stop()
+        self.observer.join(timeout)
+        self.scheduler.stop(timeout)
+
+
+def start_knowledge_watcher(sync_callbacks: Dict[str, Callable[[], None]]) -> KnowledgeWatcher:
+    """
+    Watches every knowledge file and reloads it in the background when it changes.
+
+    Args:
+        sync_callbacks: File path -> callback that reloads it (e.g. KnowledgeManager.load_faq_data).
+
+    Returns:
+        KnowledgeWatcher: Call stop() on it when the reloaded objects are no longer needed.
+    """
+    scheduler = ReloadScheduler()
+    for file_path, callback in sync_callbacks.items():
+        scheduler.register(file_path, callback)
+    scheduler.start()
+
+    event_handler = KnowledgeFileHandler(scheduler)
     observer = Observer()
-    watch_dir = os.path.dirname(os.path.abspath(file_path))
-    observer.schedule(event_handler, path=watch_dir, recursive=False)
+    for watch_dir in {os.path.dirname(os.path.abspath(file_path)) for file_path in sync_callbacks}:
+        observer.schedule(event_handler, path=watch_dir, recursive=False)
     observer.start()
-    return observer
+    return KnowledgeWatcher(observer, scheduler)
+
+
+def start_faq_watcher(file_path, sync_callback):
+    """Watches a single knowledge file; kept for callers that only reload the FAQ."""
+    return start_knowledge_watcher({file_path: sync_callback})
@@ -0,0 +1,167 @@
+import hashlib
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Union
+import numpy as np
+
+
+class _BacklogHTTPServer(ThreadingHTTPServer):
+    """The default listen backlog of 5 drops connections when hundreds of async requests arrive at once."""
+    request_queue_size = 1024
+
+
+class FakeUpstreamServer:
+    """
+    Local stand-in for the OpenAI-compatible chat endpoint and the Telegram Bot API.
+    Every response is delayed by a configurable latency so the app sees realistic upstream waits.
+
+    Routes:
+        POST /v1/chat/completions     JSON answer (or an SSE stream when "stream" is set)
+        POST /bot<token>/sendMessage  Telegram-style {"ok": true, "result": {"message_id": ...}}
+    """
+
+    def __init__(
+        self,
+        chat_latency: float = 0.5,
+        telegram_latency: float = 0.1,
+        pending_ratio: float = 0.2,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        """
+        Args:
+            chat_latency: Seconds each chat completion takes.
+            telegram_latency: Seconds each Telegram sendMessage takes.
+            pending_ratio: Share of chat answers returned with confidence=false (escalated to the operator).
+            host: Interface to bind.
+            port: Port to bind; 0 picks a free one.
+        """
+        self.chat_latency = chat_latency
+        self.telegram_latency = telegram_latency
+        self.pending_ratio = pending_ratio
+        self.chat_requests = 0
+        self.telegram_messages = 0
+        self._message_ids = itertools.count(1)
+        self._counter_lock = threading.Lock()
+        self._random = random.Random(42)
+        self._server = _BacklogHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeUpstreamServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-upstream", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _chat_content(self) -> str:
+        with self._counter_lock:
+            self.chat_requests += 1
+            confident = self._random.random() >= self.pending_ratio
+        answer = "We are happy to help! Our team has all the details for your stay." if confident else "I'm not sure about that."
+        return json.dumps({"answer": answer, "confidence": confident})
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status: int, payload: dict) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+
+                if self.path.endswith("/chat/completions"):
+                    time.sleep(server.chat_latency)
+                    content = server._chat_content()
+                    if request.get("stream"):
+                        self._stream_chat(content)
+                    else:
+                        self._send_json(200, {
+                            "id": "chatcmpl-bench",
+                            "object": "chat.completion",
+                            "created": int(time.time()),
+                            "model": request.get("model", "fake"),
+                            "choices": [{
+                                "index": 0,
+                                "message": {"role": "assistant", "content": content},
+                                "finish_reason": "stop"
+                            }]
+                        })
+                elif re.fullmatch(r"/bot[^/]*/sendMessage", self.path):
+                    time.sleep(server.telegram_latency)
+                    with server._counter_lock:
+                        server.telegram_messages += 1
+                        message_id = next(server._message_ids)
+                    self._send_json(200, {"ok": True, "result": {"message_id": message_id}})
+                else:
+                    self._send_json(404, {"error": f"Unknown route {self.path}"})
+
+            def _stream_chat(self, content: str) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for start in range(0, len(content), 8):
+                    chunk = {
+                        "id": "chatcmpl-bench",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": "fake",
+                        "choices": [{"index": 0, "delta": {"content": content[start:start + 8]}, "finish_reason": None}]
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+        return Handler
+
+
+class FakeEmbedder:
+    """
+    Deterministic hashing embedder with a configurable per-call latency.
+    Shared words give overlapping vectors, so retrieval still behaves like a semantic search.
+    """
+
+    def __init__(self, dimension: int = 384, latency: float = 0.02):
+        self.dimension = dimension
+        self.latency = latency
+
+    def __call__(self, content: Union[str, List[str]], is_query: bool = False) -> np.ndarray:
+        texts = [content] if isinstance(content, str) else content
+        if self.latency:
+            time.sleep(self.latency)
+
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in re.findall(r"[a-z0-9]+", text.lower()):
+                bucket = int.from_bytes(hashlib.md5(token.encode("utf-8")).digest()[:4], "little")
+                vectors[row, bucket % self.dimension] += 1.0
+            norm = np.linalg.norm(vectors[row])
+            if norm:
+                vectors[row] /= norm
+        return vectors
@@ -0,0 +1,348 @@
+"""
+Offline load test for the Flask app (or, with --asgi, the async serving mode from asgi.py).
+
+Boots `main.app` against local stand-ins (OpenAI-compatible chat server, Telegram API, hashing embedder),
+replays a query corpus at a fixed concurrency and reports throughput and latency percentiles.
+A second pass measures how vector search time grows with the size of the Chroma index.
+
+Usage:
+    python -m benchmarks.load_test --concurrency 16 --requests 500 --chat-latency 0.5
+    python -m benchmarks.load_test --index-sizes 1000,10000,50000 --requests 0
+    python -m benchmarks.load_test --asgi --concurrency 200 --requests 1000
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Iterable
+import requests
+
+from benchmarks.fake_services import FakeUpstreamServer, FakeEmbedder
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CORPORA = [
+    PROJECT_ROOT / "backend" / "evaluation" / "eval_dataset.json",
+    PROJECT_ROOT / "backend" / "evaluation" / "eval_negative.json",
+    *sorted((PROJECT_ROOT / "tests" / "llm" / "data").glob("*.json"))
+]
+QUERY_KEYS = ("question", "query", "message", "title", "q")
+
+
+def _collect_queries(node: Any) -> Iterable[str]:
+    """Walks a JSON document and yields every string stored under a query-like key."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key in QUERY_KEYS and isinstance(value, str):
+                yield value
+            else:
+                yield from _collect_queries(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _collect_queries(item)
+
+
+def load_corpus(paths: List[Path]) -> List[str]:
+    """Loads queries from JSON or JSONL files (e.g. the evaluation datasets or requests.jsonl)."""
+    queries = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            if str(path).endswith(".jsonl"):
+                documents = [json.loads(line) for line in f if line.strip()]
+            else:
+                documents = json.load(f)
+        queries.extend(_collect_queries(documents))
+    return list(dict.fromkeys(queries))
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Nearest-rank p50/p95/p99 and max of the samples."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"p50": float("nan"), "p95": float("nan"), "p99": float("nan"), "max": float("nan")}
+
+    def rank(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {"p50": rank(0.5), "p95": rank(0.95), "p99": rank(0.99), "max": ordered[-1]}
+
+
+def configure_environment(upstream: FakeUpstreamServer, work_dir: Path, args: argparse.Namespace) -> None:
+    """Points config.py at the local stand-ins and a throwaway data directory. Must run before importing the app."""
+    # Operator answers saved (and compacted on shutdown) during the run go to a copy, never to the real file
+    operator_knowledge = PROJECT_ROOT / "operator_knowledge.json"
+    if operator_knowledge.exists():
+        shutil.copyfile(operator_knowledge, work_dir / "operator_knowledge.json")
+    os.environ.update({
+        "HF_API_TOKEN": "benchmark",
+        "HF_BASE_URL": f"{upstream.base_url}/v1",
+        "CHAT_MODEL": "benchmark-chat",
+        "EMBEDDING_MODEL": "benchmark-hash",
+        "TG_BOT_TOKEN": "benchmark",
+        "TG_ADMIN_ID": "1",
+        "TG_API_BASE_URL": upstream.base_url,
+        "TG_MIN_SEND_INTERVAL": "0",
+        "VECTOR_DB_PATH": str(work_dir / "chroma_db"),
+        "EMBEDDING_CACHE_PATH": str(work_dir / "embedding_cache.db"),
+        "OPERATOR_KNOWLEDGE_PATH": str(work_dir / "operator_knowledge.json"),
+        "OPERATOR_JOURNAL_PATH": str(work_dir / "operator_knowledge.journal.jsonl"),
+        "REQUEST_STORE_BACKEND": "memory",
+        "TENANTS_PATH": str(work_dir / "tenants.json"),  # Only the default tenant
+        "LLM_MAX_RETRIES": "0",
+        "HTTP_MAX_CONNECTIONS": str(max(args.concurrency, 20)),
+        "HTTP_MAX_KEEPALIVE": str(max(args.concurrency, 10)),
+    })
+    if args.no_answer_cache:
+        os.environ["ANSWER_CACHE_SIZE"] = "0"
+
+
+class _ASGIServer:
+    """uvicorn running in a background thread, with the same shutdown() as werkzeug's server."""
+
+    def __init__(self, server, thread: threading.Thread):
+        self.server = server
+        self.thread = thread
+
+    def shutdown(self) -> None:
+        self.server.should_exit = True
+        self.thread.join()
+
+
+def start_asgi_server(flask_app) -> tuple:
+    """Serves the app through ChatASGIApp on a free port. The tenants are set up by the caller, not by lifespan."""
+    import socket
+    import uvicorn
+    from backend.api.asgi import ChatASGIApp
+
+    asgi_app = ChatASGIApp(flask_app, startup=lambda: None, shutdown=lambda: None)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(asgi_app, log_level="warning", backlog=4096))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, name="bench-asgi", daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return _ASGIServer(server, thread), f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def run_load(base_url: str, queries: List[str], total: int, concurrency: int, stream: bool) -> Dict[str, Any]:
+    """Sends `total` chat requests from `concurrency` closed-loop clients and collects latencies."""
+    local = threading.local()
+    headers = {"Accept": "text/event-stream"} if stream else {}
+
+    def send(index: int):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+
+        started_at = time.perf_counter()
+        try:
+            response = session.post(
+                f"{base_url}/api/process",
+                json={"message": queries[index % len(queries)]},
+                headers=headers,
+                timeout=120
+            )
+            body = response.text
+            elapsed = time.perf_counter() - started_at
+            if response.status_code != 200:
+                return elapsed, f"http_{response.status_code}", False
+            if stream:
+                result = json.loads(body.rsplit("event: result\ndata: ", 1)[1])
+            else:
+                result = json.loads(body)
+            return elapsed, result.get("status", "unknown"), bool(result.get("cache_hit"))
+        except Exception:
+            return time.perf_counter() - started_at, "error", False
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(send, range(total)))
+    wall_time = time.perf_counter() - started_at
+
+    latencies = [elapsed for elapsed, _, _ in results]
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "wall_time": wall_time,
+        "rps": total / wall_time if wall_time else float("nan"),
+        "latency": percentiles(latencies),
+        "mean": statistics.fmean(latencies) if latencies else float("nan"),
+        "outcomes": Counter(status for _, status, _ in results),
+        "cache_hits": sum(1 for _, _, cache_hit in results if cache_hit)
+    }
+
+
+def run_index_scaling(work_dir: Path, sizes: List[int], queries: List[str], searches: int) -> List[Dict[str, Any]]:
+    """Times vector and hybrid search on synthetic collections of increasing size."""
+    from backend.services.vector_db_service import VectorDBService
+
+    vocabulary = sorted({word for query in queries for word in query.lower().split() if word.isalpha()})
+    embedder = FakeEmbedder(latency=0)
+    rng = random.Random(7)
+    query_vectors = embedder(queries, True)
+    rows = []
+
+    for size in sizes:
+        db = VectorDBService(
+            collection=f"bench_index_{size}",
+            embedder=embedder,
+            embedding_model="benchmark-hash",
+            path=work_dir / "index_scaling"
+        )
+        db.reset()
+        for start in range(0, size, 1000):
+            batch = range(start, min(start + 1000, size))
+            documents = [" ".join(rng.choices(vocabulary, k=24)) for _ in batch]
+            db.upsert_batch(documents=documents, ids=[f"doc_{i}" for i in batch], metadatas=[{"source": "bench"}] * len(batch))
+
+        row = {"size": size}
+        for mode in ("vector", "hybrid"):
+            timings = []
+            for i in range(searches):
+                started_at = time.perf_counter()
+                db.search(queries[i % len(queries)], query_embedding=query_vectors[i % len(queries)], mode=mode)
+                timings.append(time.perf_counter() - started_at)
+            row[mode] = percentiles(timings)
+        rows.append(row)
+    return rows
+
+
+def print_load_report(report: Dict[str, Any], upstream: FakeUpstreamServer) -> None:
+    latency = report["latency"]
+    print("\n📈 Load test")
+    print(f"   requests: {report['requests']}  concurrency: {report['concurrency']}  wall time: {report['wall_time']:.2f}s")
+    print(f"   throughput: {report['rps']:.1f} req/s")
+    print(
+        f"   latency ms: mean {report['mean'] * 1000:.1f}  p50 {latency['p50'] * 1000:.1f}  "
+        f"p95 {latency['p95'] * 1000:.1f}  p99 {latency['p99'] * 1000:.1f}  max {latency['max'] * 1000:.1f}"
+    )
+    print(f"   outcomes: {dict(report['outcomes'])}  cache hits: {report['cache_hits']}")
+    print(f"   upstream: {upstream.chat_requests} chat completions, {upstream.telegram_messages} Telegram messages")
+
+
+def print_stage_report() -> None:
+    from backend.utils.metrics import metrics
+
+    stats = metrics.histogram_stats("chat_stage_duration_seconds")
+    if not stats:
+        return
+    print("\n⏱️ Stage breakdown (server side, ms)")
+    print(f"   {'stage':<18}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for labels, stage in sorted(stats.items()):
+        name = dict(labels).get("stage", "?")
+        print(
+            f"   {name:<18}{stage['count']:>8}{stage['p50'] * 1000:>10.2f}"
+            f"{stage['p95'] * 1000:>10.2f}{stage['p99'] * 1000:>10.2f}"
+        )
+
+
+def print_index_report(rows: List[Dict[str, Any]]) -> None:
+    print("\n🗂️ Index size vs search time (ms)")
+    print(f"   {'documents':>10}{'vector p50':>12}{'vector p95':>12}{'hybrid p50':>12}{'hybrid p95':>12}")
+    for row in rows:
+        print(
+            f"   {row['size']:>10}{row['vector']['p50'] * 1000:>12.2f}{row['vector']['p95'] * 1000:>12.2f}"
+            f"{row['hybrid']['p50'] * 1000:>12.2f}{row['hybrid']['p95'] * 1000:>12.2f}"
+        )
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline load test with local stand-ins for every upstream service.")
+    parser.add_argument("--corpus", nargs="*", type=Path, default=DEFAULT_CORPORA, help="JSON/JSONL files with queries")
+    parser.add_argument("--requests", type=int, default=200, help="Total chat requests (0 skips the load test)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--warmup", type=int, default=10, help="Requests sent before measuring")
+    parser.add_argument("--stream", action="store_true", help="Request Server-Sent Events responses")
+    parser.add_argument("--asgi", action="store_true", help="Serve the async ASGI app with uvicorn instead of Flask")
+    parser.add_argument("--chat-latency", type=float, default=0.5, help="Seconds per fake chat completion")
+    parser.add_argument("--embed-latency", type=float, default=0.02, help="Seconds per fake embedding call")
+    parser.add_argument("--telegram-latency", type=float, default=0.1, help="Seconds per fake Telegram send")
+    parser.add_argument("--pending-ratio", type=float, default=0.2, help="Share of answers the fake LLM is unsure about")
+    parser.add_argument("--no-answer-cache", action="store_true", help="Disable the semantic answer cache")
+    parser.add_argument("--index-sizes", default="", help="Comma-separated collection sizes to time searches on")
+    parser.add_argument("--searches", type=int, default=50, help="Searches per index size")
+    parser.add_argument("--max-p95-ms", type=float, default=None, help="Exit with status 1 if p95 latency is higher")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    queries = load_corpus(args.corpus)
+    if not queries:
+        print("❌ The corpus contains no queries.")
+        return 1
+
+    upstream = FakeUpstreamServer(
+        chat_latency=args.chat_latency,
+        telegram_latency=args.telegram_latency,
+        pending_ratio=args.pending_ratio
+    ).start()
+
+    with tempfile.TemporaryDirectory(prefix="chatbot-bench-") as tmp:
+        work_dir = Path(tmp)
+        configure_environment(upstream, work_dir, args)
+
+        # The app reads its configuration at import time, so it is imported only now
+        from werkzeug.serving import make_server
+        import main as app_module
+        from backend.managers.factory import create_tenant_registry
+
+        exit_code = 0
+        try:
+            if args.requests > 0:
+                tenants = create_tenant_registry(
+                    embedder=FakeEmbedder(latency=args.embed_latency),
+                    embedding_model="benchmark-hash",
+                    watch_files=False
+                )
+                tenants.get()
+                app_module.app.tenants = tenants
+
+                if args.asgi:
+                    server, base_url = start_asgi_server(app_module.app)
+                else:
+                    logging.getLogger("werkzeug").setLevel(logging.WARNING)  # No per-request access log
+                    server = make_server("127.0.0.1", 0, app_module.app, threaded=True)
+                    threading.Thread(target=server.serve_forever, name="bench-app", daemon=True).start()
+                    base_url = f"http://127.0.0.1:{server.server_port}"
+                print(f"🚀 App on {base_url}, upstream stand-ins on {upstream.base_url}, {len(queries)} distinct queries")
+
+                if args.warmup:
+                    run_load(base_url, queries, args.warmup, min(args.concurrency, args.warmup), args.stream)
+                report = run_load(base_url, queries, args.requests, args.concurrency, args.stream)
+                server.shutdown()
+
+                print_load_report(report, upstream)
+                print_stage_report()
+
+                failed = sum(count for status, count in report["outcomes"].items() if status not in ("direct", "pending"))
+                if failed:
+                    print(f"❌ {failed} requests failed.")
+                    exit_code = 1
+                if args.max_p95_ms is not None and report["latency"]["p95"] * 1000 > args.max_p95_ms:
+                    print(f"❌ p95 latency is above the {args.max_p95_ms:.0f} ms budget.")
+                    exit_code = 1
+
+            sizes = [int(size) for size in args.index_sizes.split(",") if size.strip()]
+            if sizes:
+                print_index_report(run_index_scaling(work_dir, sizes, queries, args.searches))
+        finally:
+            upstream.stop()
+            app_module.shutdown_manager()
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -11,10 +11,19 @@ load_dotenv(PROJECT_ROOT / ".env")
 
 # Vector DB configuration
 VECTOR_SIMILARITY_THRESHOLD = float(os.getenv("VECTOR_SIMILARITY_THRESHOLD", 1.2))
+VECTOR_DB_PATH = Path(os.getenv("VECTOR_DB_PATH", PROJECT_ROOT / "chroma_db"))
+VECTOR_DB_LAZY_OPEN = os.getenv("VECTOR_DB_LAZY_OPEN", "false").lower() == "true"
+
+# Hybrid (BM25 + vector) retrieval configuration
+SEARCH_MODE = os.getenv("SEARCH_MODE", "hybrid")  # "vector" or "hybrid"
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", 10))  # Candidates taken from each retriever before fusion
+RRF_K = int(os.getenv("RRF_K", 60))
+KEYWORD_MATCH_THRESHOLD = float(os.getenv("KEYWORD_MATCH_THRESHOLD", 1.0))  # Share of query terms a document must contain
 
 # Telegram configuration
 TG_BOT_TOKEN = os.getenv("TG_BOT_TOKEN")
 TG_ADMIN_ID = os.getenv("TG_ADMIN_ID")
+TG_API_BASE_URL = os.getenv("TG_API_BASE_URL", "https://api.telegram.org")
 
 # HuggingFace configuration
 HF_API_TOKEN = os.getenv("HF_API_TOKEN")
@@ -24,4 +33,97 @@ EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL")
 
 # Knowledge base configuration
 FAQ_PATH = PROJECT_ROOT / "knowledge_base.json"
-OPERATOR_KNOWLEDGE_PATH = PROJECT_ROOT / "operator_knowledge.json"
+OPERATOR_KNOWLEDGE_PATH = Path(os.getenv("OPERATOR_KNOWLEDGE_PATH", PROJECT_ROOT / "operator_knowledge.json"))
+OPERATOR_JOURNAL_PATH = Path(os.getenv("OPERATOR_JOURNAL_PATH", PROJECT_ROOT / "operator_knowledge.journal.jsonl"))
+OPERATOR_COMPACT_THRESHOLD = int(os.getenv("OPERATOR_COMPACT_THRESHOLD", 100))  # Journal entries that trigger a compaction
+OPERATOR_COMPACT_INTERVAL = float(os.getenv("OPERATOR_COMPACT_INTERVAL", 300))  # Seconds between scheduled compactions
+
+# Multi-tenant configuration (the settings above form the "default" tenant)
+DEFAULT_TENANT = "default"
+TENANTS_PATH = Path(os.getenv("TENANTS_PATH", PROJECT_ROOT / "tenants.json"))  # Optional {tenant_id: overrides} file
+TENANTS_DIR = Path(os.getenv("TENANTS_DIR", PROJECT_ROOT / "tenants"))  # Default home of each tenant's knowledge files
+TENANT_MAX_ACTIVE = int(os.getenv("TENANT_MAX_ACTIVE", 32))  # Tenants kept in memory before the least recently used is evicted
+
+# Prompt configuration
+PROMPT_RELOAD_INTERVAL = float(os.getenv("PROMPT_RELOAD_INTERVAL", 1.0))  # Seconds between prompt file mtime checks
+
+# Structured output configuration
+LLM_JSON_MODE = os.getenv("LLM_JSON_MODE", "true").lower() == "true"  # Request JSON output via response_format
+LLM_REPAIR_MAX_TOKENS = int(os.getenv("LLM_REPAIR_MAX_TOKENS", 200))  # Budget of the call fixing unparseable output, 0 = off
+
+# Context assembly configuration
+CONTEXT_CANDIDATES = int(os.getenv("CONTEXT_CANDIDATES", 6))  # Chunks retrieved before deduplication and budgeting
+CONTEXT_MAX_CHUNKS = int(os.getenv("CONTEXT_MAX_CHUNKS", 3))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 600))
+CONTEXT_MMR_LAMBDA = float(os.getenv("CONTEXT_MMR_LAMBDA", 0.7))  # 1.0 = relevance only, 0.0 = diversity only
+CONTEXT_DUPLICATE_THRESHOLD = float(os.getenv("CONTEXT_DUPLICATE_THRESHOLD", 0.95))  # Cosine similarity treated as a duplicate
+CONTEXT_CHARS_PER_TOKEN = int(os.getenv("CONTEXT_CHARS_PER_TOKEN", 4))
+
+# Answer cache configuration
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", 1000))
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", 3600))
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", 0.95))
+
+# Telegram delivery configuration
+TG_CONNECT_TIMEOUT = float(os.getenv("TG_CONNECT_TIMEOUT", 3.05))
+TG_READ_TIMEOUT = float(os.getenv("TG_READ_TIMEOUT", 10))
+TG_QUEUE_SIZE = int(os.getenv("TG_QUEUE_SIZE", 1000))
+TG_MAX_RETRIES = int(os.getenv("TG_MAX_RETRIES", 3))
+TG_RETRY_BACKOFF = float(os.getenv("TG_RETRY_BACKOFF", 1.0))
+TG_MIN_SEND_INTERVAL = float(os.getenv("TG_MIN_SEND_INTERVAL", 1.0))
+
+# Knowledge sync configuration
+KNOWLEDGE_MANIFEST_PATH = VECTOR_DB_PATH / "sync_manifest.json"
+KB_RELOAD_DEBOUNCE = float(os.getenv("KB_RELOAD_DEBOUNCE", 1.0))  # Quiet period after the last change before reloading
+KB_RELOAD_MAX_DELAY = float(os.getenv("KB_RELOAD_MAX_DELAY", 10.0))  # Upper bound on the wait during a continuous burst
+
+# Status long-polling configuration
+STATUS_LONG_POLL_TIMEOUT = float(os.getenv("STATUS_LONG_POLL_TIMEOUT", 25))
+
+# Request state store configuration
+REQUEST_STORE_BACKEND = os.getenv("REQUEST_STORE_BACKEND", "memory")  # "memory" or "sqlite"
+REQUEST_STORE_PATH = Path(os.getenv("REQUEST_STORE_PATH", PROJECT_ROOT / "request_store.db"))
+REQUEST_PENDING_TTL = int(os.getenv("REQUEST_PENDING_TTL", 7 * 24 * 3600))
+REQUEST_COMPLETED_TTL = int(os.getenv("REQUEST_COMPLETED_TTL", 3600))
+REQUEST_STORE_SWEEP_INTERVAL = int(os.getenv("REQUEST_STORE_SWEEP_INTERVAL", 60))
+STATUS_RECHECK_INTERVAL = float(os.getenv("STATUS_RECHECK_INTERVAL", 1.0))
+
+# Embedding pipeline configuration
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "remote")  # "remote" (HF Inference) or "local" (sentence-transformers)
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 32))
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", 4))
+EMBEDDING_CACHE_PATH = Path(os.getenv("EMBEDDING_CACHE_PATH", PROJECT_ROOT / "embedding_cache.db"))
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", 10000))  # Query vectors kept in memory per model, 0 = off
+QUERY_EMBEDDING_CACHE_DIR = os.getenv("QUERY_EMBEDDING_CACHE_DIR")  # Persists the query vectors across restarts if set
+
+# Evaluation configuration
+EVAL_WORKERS = int(os.getenv("EVAL_WORKERS", 4))
+EVAL_RATE_LIMIT = float(os.getenv("EVAL_RATE_LIMIT", 2.0))  # Pipeline runs started per second
+EVAL_MAX_FAILURE_RATE = float(os.getenv("EVAL_MAX_FAILURE_RATE", 0.1))  # Share of questions allowed to fail before the run aborts
+EVAL_CACHE_PATH = Path(os.getenv("EVAL_CACHE_PATH", PROJECT_ROOT / ".eval_cache" / "pipeline_results.jsonl"))
+
+# Outbound HTTP configuration
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 3.05))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 20))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", 10))
+HTTP_CONNECT_RETRIES = int(os.getenv("HTTP_CONNECT_RETRIES", 2))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", 30))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+EMBEDDING_READ_TIMEOUT = float(os.getenv("EMBEDDING_READ_TIMEOUT", 15))
+LLM_ASYNC_MAX_CONNECTIONS = int(os.getenv("LLM_ASYNC_MAX_CONNECTIONS", 1000))  # Concurrent LLM calls of the ASGI app
+
+# LLM admission control configuration (chat completions per process, sync and async calls combined)
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", HTTP_MAX_CONNECTIONS))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", 200))  # Calls waiting for a slot before new ones get 503
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", 10))  # Seconds a call may wait for a slot before it gets 503
+LLM_RATE_LIMIT = float(os.getenv("LLM_RATE_LIMIT", 0))  # Calls started per second before new ones get 429, 0 = unlimited
+LLM_RATE_BURST = int(os.getenv("LLM_RATE_BURST", 10))
+
+# Exact-match fast path configuration
+EXACT_MATCH_FUZZY_CUTOFF = float(os.getenv("EXACT_MATCH_FUZZY_CUTOFF", 0))  # 0 disables fuzzy matching, e.g. 0.9 enables it
+
+# Metrics configuration
+# Upper bounds (seconds) of the latency histogram buckets
+METRICS_BUCKETS = tuple(sorted(float(bound) for bound in os.getenv(
+    "METRICS_BUCKETS", "0.0005,0.001,0.0025,0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,30,60"
+).split(",")))
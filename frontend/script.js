@@ -7,6 +7,10 @@ const chatMessages = document.getElementById('chat-messages');
 const endSessionBtn = document.getElementById('end-session-btn');
 const opStickyBtn = document.getElementById('operator-btn-sticky');
 
+// Hotel served by this page (?tenant_id=...); omitted means the default tenant
+const tenantId = new URLSearchParams(window.location.search).get('tenant_id');
+const tenantQuery = tenantId ? `?tenant_id=${encodeURIComponent(tenantId)}` : '';
+
 // 1. Toggle/Minimize
 chatButton.addEventListener('click', () => chatWindow.classList.toggle('hidden'));
 minimizeBtn.addEventListener('click', () => chatWindow.classList.add('hidden'));
@@ -45,7 +49,7 @@ async function showCategories() {
 
     faqContainer.innerHTML = 'Loading...';
     try {
-        const response = await fetch('/api/faq/categories');
+        const response = await fetch(`/api/faq/categories${tenantQuery}`);
         const categories = await response.json();
         faqContainer.innerHTML = '';
         categories.forEach(cat => {
@@ -64,7 +68,7 @@ async function showQuestions(catId) {
     const faqContainer = document.getElementById('faq-container');
     faqContainer.innerHTML = 'Loading...';
     try {
-        const response = await fetch(`/api/faq/questions/${catId}`);
+        const response = await fetch(`/api/faq/questions/${catId}${tenantQuery}`);
         const questions = await response.json();
         faqContainer.innerHTML = '';
 
@@ -116,24 +120,33 @@ async function handleSend() {
     chatMessages.appendChild(typingDiv);
     chatMessages.scrollTop = chatMessages.scrollHeight;
 
+    const removeTyping = () => {
+        const typingElem = document.getElementById(typingId);
+        if (typingElem) typingElem.remove();
+    };
+
     try {
-        // Send to backend
+        // Send to backend, asking for a token stream
         const response = await fetch('/api/process', {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ message: text })
+            headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+            body: JSON.stringify(tenantId ? { message: text, tenant_id: tenantId } : { message: text })
         });
 
-        const data = await response.json();
+        let data;
+        if ((response.headers.get('Content-Type') || '').startsWith('text/event-stream')) {
+            data = await readAnswerStream(response, removeTyping);
+        } else {
+            data = await response.json();
+        }
 
         // Remove typing indicator
-        const typingElem = document.getElementById(typingId);
-        if (typingElem) typingElem.remove();
+        removeTyping();
 
         // Handle Logic
         if (data.status === 'direct') {
-            // High confidence answer
-            addMessage(data.answer, 'bot');
+            // High confidence answer (already on screen if it was streamed)
+            if (!data.streamed) addMessage(data.answer, 'bot');
         } else if (data.status === 'pending') {
             // Low confidence -> Waiting for Telegram approval
             // 1. Show the "Wait" message
@@ -141,33 +154,112 @@ async function handleSend() {
 
             // 2. Start polling for the real answer
             pollForAnswer(data.request_id);
+        } else if (data.error) {
+            // Busy (429/503) or rejected request
+            addMessage(data.error, 'bot');
         }
 
     } catch (err) {
-        const typingElem = document.getElementById(typingId);
-        if (typingElem) typingElem.remove();
+        removeTyping();
         addMessage("Sorry, I'm having trouble connecting to the server.", 'bot');
         console.error("API Error:", err);
     }
 }
 
-// 7. Polling Logic
-function pollForAnswer(requestId) {
-    // Check every 2 seconds
-    const interval = setInterval(async () => {
-        try {
-            const res = await fetch(`/api/check_status/${requestId}`);
-            const data = await res.json();
+// 6a. Server-Sent Events reader: renders tokens as they arrive, resolves with the final result
+async function readAnswerStream(response, onFirstToken) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let msgDiv = null;
+    let result = null;
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let eventName = 'message';
+            let payload = '';
+            rawEvent.split('\n').forEach(line => {
+                if (line.startsWith('event: ')) eventName = line.slice(7);
+                else if (line.startsWith('data: ')) payload += line.slice(6);
+            });
+            const eventData = JSON.parse(payload);
 
-            if (data.status === "completed") {
-                clearInterval(interval); // Stop checking
-                addMessage(data.answer, 'bot'); // Show the Operator's answer
+            if (eventName === 'token') {
+                if (!msgDiv) {
+                    onFirstToken();
+                    addMessage('', 'bot');
+                    msgDiv = chatMessages.lastElementChild;
+                }
+                msgDiv.textContent += eventData.text;
+                chatMessages.scrollTop = chatMessages.scrollHeight;
+            } else if (eventName === 'result') {
+                result = eventData;
+            }
+        }
+    }
+
+    if (!result) throw new Error('Stream ended without a result');
+    result.streamed = msgDiv !== null;
+    return result;
+}
+
+// 7. Long-Polling Logic
+// Polls are at least POLL_MIN_INTERVAL_MS apart; failures back off exponentially (or as long as Retry-After asks)
+const POLL_MIN_INTERVAL_MS = 1000;
+const POLL_MAX_BACKOFF_MS = 30000;
+const POLL_MAX_ERRORS = 5;
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+function pollBackoff(errors, response) {
+    const backoff = Math.min(POLL_MIN_INTERVAL_MS * 2 ** errors, POLL_MAX_BACKOFF_MS);
+    const retryAfter = response ? parseFloat(response.headers.get('Retry-After')) * 1000 : NaN;
+    return Number.isFinite(retryAfter) ? Math.max(retryAfter, backoff) : backoff;
+}
+
+async function pollForAnswer(requestId) {
+    // Each request is held open by the server until the operator answers or the wait expires
+    let errors = 0;
+    while (errors < POLL_MAX_ERRORS) {
+        const startedAt = Date.now();
+        let delay = 0;
+        try {
+            const res = await fetch(`/api/check_status/${requestId}?wait=25`);
+            if (!res.ok) {
+                // Busy (429/503) or a server error: try again later
+                errors++;
+                delay = pollBackoff(errors, res);
+            } else {
+                const data = await res.json();
+                if (data.status === "completed") {
+                    addMessage(data.answer, 'bot'); // Show the Operator's answer
+                    return;
+                }
+                if (data.status === "failed") {
+                    addMessage("Sorry, our front desk can't be reached right now. Please ask again in a moment.", 'bot');
+                    return;
+                }
+                if (data.status !== "pending") return; // Unknown or expired request
+                errors = 0;
             }
         } catch (e) {
             console.error("Polling error", e);
-            clearInterval(interval); // Stop on error to prevent infinite loop
+            errors++;
+            delay = pollBackoff(errors);
         }
-    }, 2000);
+        // A wait the server cut short must not turn into a busy loop
+        await sleep(Math.max(delay, POLL_MIN_INTERVAL_MS - (Date.now() - startedAt)));
+    }
+    console.error(`Polling stopped after ${POLL_MAX_ERRORS} failed attempts`);
 }
 
 // Event Listeners
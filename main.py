@@ -1,8 +1,11 @@
-from flask import Flask, send_from_directory, jsonify, request
+import atexit
+from flask import Flask, Response, send_from_directory, jsonify, request
 from backend.api import routes as chat_routes
-from backend.managers.factory import create_app_manager
-from backend.utils.watcher import start_faq_watcher
-from config import FAQ_PATH
+from backend.api.telegram_webhook import handle_telegram_update
+from backend.managers.factory import create_tenant_registry
+from backend.managers.tenant_registry import UnknownTenantError
+from backend.services import http_clients, vector_db_service
+from backend.utils.metrics import metrics
 
 
 app = Flask(__name__, static_folder='frontend', template_folder='frontend')
@@ -13,33 +16,60 @@ def bootstrap_manager() -> None:
     """
     Initializes services, managers, and starts background file monitoring.
     """
-    # 1. Create managers and attach to the app object
-    chat_manager = create_app_manager()
-    app.chat_manager = chat_manager
-    app.knowledge_manager = chat_manager.knowledge_manager
+    # 1. Create the tenant registry and attach it to the app object; other tenants load on first request
+    tenants = create_tenant_registry()
+    app.tenants = tenants
 
-    # 2. Start FAQ watcher
-    start_faq_watcher(FAQ_PATH, chat_manager.knowledge_manager.load_faq_data)
+    # 2. Index the default tenant now (its knowledge files are reloaded in the background when edited)
+    tenants.get()
+
+    # 3. Release pooled connections and vector DB handles on exit
+    atexit.register(shutdown_manager)
 
     print("✅ Backend Manager initialized and knowledge base indexed.")
 
 
+def shutdown_manager() -> None:
+    """Folds the tenants' operator knowledge journals into their snapshots and closes shared HTTP and vector DB clients."""
+    tenants = getattr(app, 'tenants', None)
+    if tenants is not None:
+        tenants.close()
+    http_clients.close_all()
+    vector_db_service.close_all()
+
+
 @app.route('/')
 def index():
     """Serves the main frontend page."""
     return send_from_directory(app.static_folder, 'index.html')
 
 
+def tenant_knowledge_manager():
+    """The knowledge manager of the tenant named by ?tenant_id= (the default tenant if omitted)."""
+    return app.tenants.get(request.args.get('tenant_id')).knowledge_manager
+
+
+@app.errorhandler(UnknownTenantError)
+def unknown_tenant(error):
+    return jsonify({"error": "Unknown tenant"}), 404
+
+
 @app.route('/api/faq/categories')
 def get_categories():
     """Returns a list of FAQ categories."""
-    return jsonify(app.knowledge_manager.get_categories())
+    return jsonify(tenant_knowledge_manager().get_categories())
 
 
 @app.route('/api/faq/questions/<category_id>')
 def get_questions(category_id):
     """Returns questions for a specific category."""
-    return jsonify(app.knowledge_manager.get_questions_by_category(category_id))
+    return jsonify(tenant_knowledge_manager().get_questions_by_category(category_id))
+
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Exposes stage latencies and outcome counters in the Prometheus text format."""
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 
 @app.route('/<path:path>')
@@ -50,30 +80,7 @@ def static_proxy(path):
 
 @app.route('/webhook/telegram', methods=['POST'])
 def telegram_webhook():
-    chat_manager = app.chat_manager
-    data = request.json
-
-    # 1. Handle "Approve" Button Click
-    if "callback_query" in data:
-        callback = data["callback_query"]
-        req_id = callback["data"].replace("approve_", "")
-
-        # Get the original AI suggestion from our state
-        request_info = chat_manager.pending_requests.get(req_id)
-        if request_info:
-            chat_manager.fulfill_request(req_id, request_info["suggestion"])
-
-    # 2. Handle manual Reply
-    if "message" in data and "reply_to_message" in data["message"]:
-        reply_text = data["message"]["text"]
-        original_msg_id = data["message"]["reply_to_message"]["message_id"]
-        success = chat_manager.fulfill_by_msg_id(original_msg_id, reply_text)
-
-        if success:
-            print(f"✅ Reply mapped to user request via Msg ID {original_msg_id}")
-        else:
-            print(f"⚠️ Unknown message ID {original_msg_id}")
-
+    handle_telegram_update(app.tenants, request.json)
     return {"status": "ok"}
 
 
@@ -0,0 +1,27 @@
+import httpx
+import pytest
+from backend.api.asgi import ChatASGIApp
+from backend.managers.tenant_registry import TenantConfig, TenantRegistry
+from config import DEFAULT_TENANT
+
+
+@pytest.fixture
+def tenants(chat_manager, request_store):
+    """A registry serving only the default tenant, backed by the fake-upstream chat_manager."""
+    return TenantRegistry(
+        {DEFAULT_TENANT: TenantConfig.default()}, lambda config: chat_manager, request_store, watch_files=False
+    )
+
+
+@pytest.fixture
+def flask_app(monkeypatch, tenants):
+    import main
+    monkeypatch.setattr(main.app, "tenants", tenants, raising=False)
+    return main.app
+
+
+@pytest.fixture
+def asgi_client(flask_app):
+    """Builds in-process clients of the ASGI app (an httpx client can only be opened once)."""
+    asgi_app = ChatASGIApp(flask_app, startup=lambda: None, shutdown=lambda: None)
+    return lambda: httpx.AsyncClient(transport=httpx.ASGITransport(app=asgi_app), base_url="http://hotel.test")
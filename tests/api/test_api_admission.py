@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+from backend.services.llm import llm_service
+from backend.utils.admission import AdmissionController
+
+
+@pytest.fixture(params=[
+    ({"max_in_flight": 1, "max_queue": 0}, 503),
+    ({"max_in_flight": 1, "max_queue": 10, "rate": 0.001, "burst": 1}, 429),
+], ids=["queue_full", "rate_limited"])
+def overload(request, monkeypatch):
+    """
+    Replaces the LLM admission controller with one whose only slot is taken (and, when rate-limited,
+    whose start budget is spent), so every chat call is rejected. Yields the expected status.
+    """
+    settings, status = request.param
+    controller = AdmissionController("test", queue_timeout=1, **settings)
+    monkeypatch.setattr(llm_service, "llm_admission", controller)
+    held = controller.admit()
+    held.__enter__()  # Takes the only slot and spends the start budget
+    if status == 429:
+        held.__exit__(None, None, None)  # The slot is free again: only the start rate rejects
+    yield status
+    if status == 503:
+        held.__exit__(None, None, None)
+
+
+@pytest.mark.parametrize("headers", [{}, {"Accept": "text/event-stream"}], ids=["json", "sse"])
+def test_flask_rejects_overload_with_retry_after(flask_app, overload, headers):
+    response = flask_app.test_client().post("/api/process", json={"message": "When is the pool open?"}, headers=headers)
+
+    assert response.status_code == overload
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.json["error"]
+
+
+@pytest.mark.parametrize("headers", [{}, {"Accept": "text/event-stream"}], ids=["json", "sse"])
+def test_asgi_rejects_overload_with_retry_after(asgi_client, overload, headers):
+    async def send():
+        async with asgi_client() as client:
+            return await client.post("/api/process", json={"message": "When is the pool open?"}, headers=headers)
+
+    response = asyncio.run(send())
+
+    assert response.status_code == overload
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.json()["error"]
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import threading
+import pytest
+
+UNSURE_RESPONSE = '{"confidence": false, "answer": "I think the pool closes at 10 PM."}'
+
+
+def request(asgi_client, method, url, **kwargs):
+    async def send():
+        async with asgi_client() as client:
+            return await client.request(method, url, **kwargs)
+    return asyncio.run(send())
+
+
+def parse_events(body):
+    events = []
+    for raw_event in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in raw_event.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_direct_answer(asgi_client):
+    response = request(asgi_client, "POST", "/api/process", json={"message": "When is the pool open?"})
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "direct", "answer": "The pool is open from 7 AM to 10 PM."}
+
+
+def test_streamed_answer(asgi_client):
+    response = request(
+        asgi_client, "POST", "/api/process",
+        json={"message": "When is the pool open?"}, headers={"Accept": "text/event-stream"}
+    )
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    assert "".join(payload["text"] for event, payload in events if event == "token") == \
+        "The pool is open from 7 AM to 10 PM."
+    assert events[-1] == ("result", {"status": "direct", "answer": "The pool is open from 7 AM to 10 PM."})
+
+
+@pytest.mark.parametrize("body, status", [({}, 400), ({"message": "Hi", "tenant_id": "unknown"}, 404)])
+def test_rejected_requests(asgi_client, body, status):
+    assert request(asgi_client, "POST", "/api/process", json=body).status_code == status
+
+
+def test_requests_before_startup_get_503(asgi_client, flask_app, monkeypatch):
+    monkeypatch.setattr(flask_app, "tenants", None)
+
+    assert request(asgi_client, "POST", "/api/process", json={"message": "Hi"}).status_code == 503
+    assert request(asgi_client, "GET", "/api/check_status/req-1").status_code == 503
+    assert request(asgi_client, "POST", "/webhook/telegram", json={}).status_code == 503
+
+
+@pytest.mark.parametrize("llm_response", [UNSURE_RESPONSE])
+def test_long_poll_is_answered_by_operator_approval(asgi_client, chat_manager):
+    response = request(asgi_client, "POST", "/api/process", json={"message": "When does the pool close?"})
+    req_id = response.json()["request_id"]
+
+    async def poll_and_approve():
+        async with asgi_client() as client:
+            poll = asyncio.create_task(client.get(f"/api/check_status/{req_id}?wait=10"))
+            await asyncio.sleep(0.2)
+            assert not poll.done()
+            approval = {"callback_query": {"data": f"approve_{req_id}"}}
+            webhook = await client.post("/webhook/telegram", json=approval)
+            return webhook, await poll
+
+    webhook, poll = asyncio.run(poll_and_approve())
+
+    assert webhook.json() == {"status": "ok"}
+    assert poll.json()["status"] == "completed"
+    assert poll.json()["answer"] == "I think the pool closes at 10 PM."
+
+
+def test_unknown_request_status(asgi_client):
+    assert request(asgi_client, "GET", "/api/check_status/unknown").json() == {"status": "not_found"}
+
+
+def test_other_paths_are_served_by_flask(asgi_client):
+    response = request(asgi_client, "GET", "/metrics")
+
+    assert response.status_code == 200
+    assert "chat_" in response.text
+
+
+def test_waiting_clients_do_not_hold_threads(asgi_client, request_store):
+    request_store.create("req-1", user_query="Late checkout?", suggestion="Until noon.")
+    threads_before = threading.active_count()
+
+    async def poll_many():
+        async with asgi_client() as client:
+            polls = [asyncio.create_task(client.get("/api/check_status/req-1?wait=0.5")) for _ in range(50)]
+            await asyncio.sleep(0.2)
+            threads_during = threading.active_count()
+            return threads_during, await asyncio.gather(*polls)
+
+    threads_during, responses = asyncio.run(poll_many())
+
+    assert all(response.json()["status"] == "pending" for response in responses)
+    assert threads_during - threads_before < 10, "Each long-polling client held a thread!"
@@ -0,0 +1,101 @@
+import asyncio
+import time
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from backend.services.request_store import InMemoryRequestStore
+
+
+@pytest.fixture
+def request_store():
+    return InMemoryRequestStore()
+
+
+def completion_chunks(text, size=5):
+    """The chunks of a streamed chat completion whose content is `text`."""
+    return [
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text[i:i + size]))])
+        for i in range(0, len(text), size)
+    ]
+
+
+class FakeCompletions:
+    """An OpenAI-style `chat.completions` returning a fixed response, plain or streamed, after `latency` seconds."""
+
+    def __init__(self, content, latency=0.0):
+        self.content = content
+        self.latency = latency
+        self.calls = 0
+
+    def create(self, stream=False, **args):
+        self.calls += 1
+        time.sleep(self.latency)
+        return iter(completion_chunks(self.content)) if stream else self._message()
+
+    def _message(self):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.content))])
+
+
+class FakeAsyncCompletions(FakeCompletions):
+    async def create(self, stream=False, **args):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if not stream:
+            return self._message()
+
+        async def chunks():
+            for chunk in completion_chunks(self.content):
+                yield chunk
+        return chunks()
+
+
+class FakeChatKnowledgeManager:
+    """A knowledge base without exact matches whose retrieval always finds relevant context."""
+
+    def __init__(self):
+        self.db = None
+        self.saved_answers = []
+        self.operator_store = SimpleNamespace(close=lambda: None)
+
+    def add_change_listener(self, callback):
+        pass
+
+    def find_exact_answer(self, query):
+        return None
+
+    def embed_query(self, query):
+        return np.ones(8, dtype=np.float32) / np.sqrt(8)
+
+    def save_operator_answer(self, question, answer):
+        self.saved_answers.append((question, answer))
+
+
+class FakeTelegramService:
+    def __init__(self, accept=True):
+        self.accept = accept
+        self.alerts = []
+
+    def enqueue_alert(self, *args, **kwargs):
+        self.alerts.append((args, kwargs))
+        return self.accept
+
+
+@pytest.fixture
+def llm_response():
+    """The assistant's raw JSON response; tests override it."""
+    return '{"confidence": true, "answer": "The pool is open from 7 AM to 10 PM."}'
+
+
+@pytest.fixture
+def chat_manager(monkeypatch, request_store, llm_response):
+    """A real ChatManager over fake retrieval, LLM endpoint and Telegram delivery."""
+    from backend.managers.chat_manager import ChatManager
+    from backend.services.llm import llm_service
+    chat_manager = ChatManager(
+        FakeChatKnowledgeManager(), request_store=request_store, tg_service=FakeTelegramService()
+    )
+    chat_manager.llm.chat_client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(llm_response)))
+    async_client = SimpleNamespace(chat=SimpleNamespace(completions=FakeAsyncCompletions(llm_response)))
+    monkeypatch.setattr(llm_service, "get_async_chat_client", lambda: async_client)
+    monkeypatch.setattr(chat_manager, "_retrieve", lambda query, embedding: (["The pool is open 7 AM-10 PM."], True))
+    return chat_manager
@@ -0,0 +1,67 @@
+import json
+import pytest
+from types import SimpleNamespace
+from backend.constants import LLMRole
+from backend.managers.chat_manager import ChatManager
+from backend.services.llm.structured_output import StructuredAnswer
+
+FAILURE = StructuredAnswer.failure(LLMRole.ASSISTANT, "⚠️ Error processing request: upstream timeout")
+
+
+class FailingEvalChatManager:
+    """Runs the real evaluation contract of ChatManager on top of an LLM whose calls fail."""
+
+    def __init__(self):
+        self.llm = SimpleNamespace(
+            get_answer=lambda query, context: FAILURE,
+            get_prompt_version=lambda: "v1",
+            chat_model="chat-model",
+            embedding_model="embedding-model"
+        )
+        self.knowledge_manager = SimpleNamespace(get_kb_version=lambda: "kb1")
+
+    def retrieve_contexts_for_eval(self, user_queries):
+        return [["Check-in starts at 2 PM."] for _ in user_queries]
+
+    def process_message_for_eval(self, user_query, context=None):
+        return ChatManager.process_message_for_eval(self, user_query, context)
+
+
+def test_failed_llm_call_is_not_an_eval_answer():
+    with pytest.raises(RuntimeError, match="upstream timeout"):
+        FailingEvalChatManager().process_message_for_eval("When is check-in?", ["Check-in starts at 2 PM."])
+
+
+def make_evaluator(monkeypatch, cache_path, **kwargs):
+    pytest.importorskip("ragas")
+    from backend.evaluation.evaluator import RAGEvaluator
+    monkeypatch.setattr(RAGEvaluator, "_build_ragas_llm", lambda self: None)
+    monkeypatch.setattr(RAGEvaluator, "_build_ragas_embeddings", lambda self: None)
+    return RAGEvaluator(FailingEvalChatManager(), max_workers=1, rate_limit=0, cache_path=str(cache_path), **kwargs)
+
+
+def test_failed_llm_call_is_neither_cached_nor_scored(monkeypatch, tmp_path):
+    cache_path = tmp_path / "eval_cache.jsonl"
+    evaluator = make_evaluator(monkeypatch, cache_path, max_failure_rate=1.0)
+
+    dataset = evaluator.prepare_ragas_dataset([{"question": "When is check-in?", "ground_truth": "From 2 PM."}])
+
+    assert len(dataset) == 0, "The error text was passed to RAGAS as an answer!"
+    cached = cache_path.read_text(encoding="utf-8").splitlines() if cache_path.exists() else []
+    assert not [json.loads(line) for line in cached], "The error text was cached as an answer!"
+
+
+def test_too_many_failed_questions_abort_the_run(monkeypatch, tmp_path):
+    evaluator = make_evaluator(monkeypatch, tmp_path / "eval_cache.jsonl", max_failure_rate=0.1)
+
+    with pytest.raises(RuntimeError, match="1 of 1 questions failed"):
+        evaluator.prepare_ragas_dataset([{"question": "When is check-in?", "ground_truth": "From 2 PM."}])
+
+
+def test_cache_key_changes_with_the_chat_model(monkeypatch, tmp_path):
+    evaluator = make_evaluator(monkeypatch, tmp_path / "eval_cache.jsonl")
+    key = evaluator._cache_key("When is check-in?")
+
+    evaluator.chat_manager.llm.chat_model = "another-chat-model"
+
+    assert evaluator._cache_key("When is check-in?") != key, "Answers of another model were served from the cache!"
@@ -0,0 +1,57 @@
+import httpx
+import pytest
+from types import SimpleNamespace
+from openai import BadRequestError
+from backend.services.llm.llm_service import LLMService
+
+
+def bad_request(message):
+    response = httpx.Response(400, request=httpx.Request("POST", "http://llm.test/v1/chat/completions"))
+    return BadRequestError(message, response=response, body={"error": {"message": message}})
+
+
+class RejectingCompletions:
+    """Fails the first request with the given 400 error, answers the next ones."""
+
+    def __init__(self, message):
+        self.message = message
+        self.requests = []
+
+    def create(self, **args):
+        self.requests.append(dict(args))
+        if len(self.requests) == 1:
+            raise bad_request(self.message)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='{"answer": "Hi", "confidence": true}'))])
+
+
+@pytest.fixture
+def json_mode_llm(monkeypatch, llm_as_a_hotel_assistant):
+    monkeypatch.setattr(LLMService, "_json_mode", True)
+    return llm_as_a_hotel_assistant
+
+
+def use_completions(llm, completions):
+    llm.chat_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+def test_llm_falls_back_when_json_mode_is_rejected(json_mode_llm):
+    completions = RejectingCompletions("Invalid parameter: response_format json_object is not supported by this model")
+    use_completions(json_mode_llm, completions)
+
+    result = json_mode_llm.get_answer("Hello?", ["The hotel greets every guest."])
+
+    assert result.ok and result.answer == "Hi"
+    assert "response_format" in completions.requests[0], "JSON mode wasn't requested!"
+    assert "response_format" not in completions.requests[1], "The retry still asked for JSON mode!"
+    assert LLMService._json_mode is False, "JSON mode stayed on after the endpoint rejected it!"
+
+
+def test_llm_keeps_json_mode_on_unrelated_bad_request(json_mode_llm):
+    completions = RejectingCompletions("This model's maximum context length is 8192 tokens, your prompt has 9000")
+    use_completions(json_mode_llm, completions)
+
+    result = json_mode_llm.get_answer("Hello?", ["The hotel greets every guest."])
+
+    assert not result.ok, "An unrelated 400 was hidden by a retry!"
+    assert len(completions.requests) == 1, "An unrelated 400 was retried without JSON mode!"
+    assert LLMService._json_mode is True, "An unrelated 400 turned JSON mode off!"
@@ -0,0 +1,19 @@
+import pytest
+from backend.services.llm.stream_parser import AnswerStreamParser
+from tests.llm.conftest import get_all_test_cases_from_file
+
+
+def parse_in_chunks(raw_output, chunk_size):
+    parser = AnswerStreamParser()
+    streamed = "".join(parser.feed(raw_output[i:i + chunk_size]) for i in range(0, len(raw_output), chunk_size))
+    return parser, streamed
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1000])
+@pytest.mark.parametrize("test_case", get_all_test_cases_from_file("llm_stream_parser.json"), ids=lambda x: x["name"])
+def test_llm_stream_parser(test_case, chunk_size):
+    parser, streamed = parse_in_chunks(test_case["raw_output"], chunk_size)
+
+    assert parser.answer_complete, "The end of the answer string was not detected!"
+    assert streamed == parser.answer == test_case["expected_answer"], "Wrong answer text decoded!"
+    streamed.encode("utf-8")  # Sent as an SSE event: must not contain lone surrogates
@@ -0,0 +1,15 @@
+import pytest
+from backend.constants import LLMRole
+from backend.services.llm.structured_output import parse_structured
+from tests.llm.conftest import get_all_test_cases_from_file
+
+
+@pytest.mark.parametrize("test_case", get_all_test_cases_from_file("llm_structured_output.json"), ids=lambda x: x["name"])
+def test_llm_structured_output(test_case):
+    result = parse_structured(test_case["raw_output"], LLMRole(test_case["role"]))
+
+    if test_case["expected"] is None:
+        assert result is None, f"Unusable output was accepted: {result}"
+    else:
+        assert result is not None, "Valid output was rejected!"
+        assert result.to_dict() == test_case["expected"], "Wrong fields extracted!"
@@ -0,0 +1,21 @@
+from types import SimpleNamespace
+
+
+class FakeKnowledgeManager:
+    """Stands in for a tenant's KnowledgeManager: reload callbacks and an operator store, no vector DB."""
+
+    def __init__(self):
+        self.reloads = 0
+        self.operator_store = SimpleNamespace(close=lambda: None)
+
+    def load_faq_data(self):
+        self.reloads += 1
+
+    def load_operator_knowledge(self):
+        self.reloads += 1
+
+
+class FakeChatManager:
+    def __init__(self, config):
+        self.tenant_id = config.tenant_id
+        self.knowledge_manager = FakeKnowledgeManager()
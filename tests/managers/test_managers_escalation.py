@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+from backend.services.vector_db_service import EmbeddingError
+
+UNSURE_RESPONSE = '{"confidence": false, "answer": "I think the pool closes at 10 PM."}'
+
+
+@pytest.mark.parametrize("llm_response", [UNSURE_RESPONSE])
+def test_escalation_is_pending(chat_manager, request_store):
+    result = chat_manager.process_message("When does the pool close?")
+
+    assert result["status"] == "pending"
+    assert request_store.get(result["request_id"])["status"] == "pending"
+    assert len(chat_manager.tg_service.alerts) == 1
+
+
+@pytest.mark.parametrize("llm_response", [UNSURE_RESPONSE])
+def test_escalation_fails_when_alert_queue_is_full(chat_manager, request_store):
+    chat_manager.tg_service.accept = False
+
+    result = chat_manager.process_message("When does the pool close?")
+
+    assert result["status"] == "failed", "The guest was left waiting for an alert nobody will see!"
+    assert result["error"]
+    assert request_store.get(result["request_id"])["status"] == "failed"
+    assert chat_manager.wait_for_status(result["request_id"], timeout=5)["status"] == "failed"
+
+
+def fail_embedding(query):
+    raise EmbeddingError("Embedding failed for 1 texts")
+
+
+def test_embedding_failure_is_escalated(chat_manager, monkeypatch):
+    monkeypatch.setattr(chat_manager.knowledge_manager, "embed_query", fail_embedding)
+
+    result = chat_manager.process_message("When does the pool close?")
+
+    assert result["status"] == "pending"
+    assert len(chat_manager.tg_service.alerts) == 1
+
+
+def test_embedding_failure_is_escalated_when_streaming(chat_manager, monkeypatch):
+    monkeypatch.setattr(chat_manager.knowledge_manager, "embed_query", fail_embedding)
+
+    events = list(chat_manager.process_message_stream("When does the pool close?"))
+
+    assert events == [("result", {"status": "pending", "request_id": events[0][1]["request_id"]})]
+
+
+def test_embedding_failure_is_escalated_async(chat_manager, monkeypatch):
+    monkeypatch.setattr(chat_manager.knowledge_manager, "embed_query", fail_embedding)
+
+    result = asyncio.run(chat_manager.process_message_async("When does the pool close?"))
+
+    assert result["status"] == "pending"
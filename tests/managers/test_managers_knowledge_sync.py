@@ -0,0 +1,123 @@
+import hashlib
+import json
+import numpy as np
+import pytest
+from backend.managers.knowledge_manager import KnowledgeManager
+from backend.services.operator_knowledge_store import OperatorKnowledgeStore
+from backend.services.vector_db_service import VectorDBService
+
+FAQ = {
+    "categories": [{"id": "amenities", "label": "Amenities"}],
+    "faq": {
+        "amenities": [
+            {"q": "When is the pool open?", "a": "From 7 AM to 10 PM."},
+            {"q": "Is there a gym?", "a": "Yes, on the 2nd floor."},
+            {"q": "Do you have a spa?", "a": "Yes, book at the front desk."}
+        ]
+    }
+}
+
+
+class CountingEmbedder:
+    """Hashes texts into unit vectors and records every text it embeds."""
+
+    def __init__(self):
+        self.embedded = []
+
+    def __call__(self, texts, is_query):
+        if not is_query:
+            self.embedded.extend(texts)
+        vectors = [np.frombuffer(hashlib.sha256(text.encode("utf-8")).digest()[:32], dtype=np.uint8) for text in texts]
+        vectors = np.array(vectors, dtype=np.float32) + 1.0
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def embedder():
+    return CountingEmbedder()
+
+
+@pytest.fixture
+def faq_path(tmp_path):
+    path = tmp_path / "knowledge_base.json"
+    path.write_text(json.dumps(FAQ), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def make_manager(tmp_path, embedder, faq_path):
+    """Builds a KnowledgeManager over the same files and collection, as a restarted process would."""
+    def make(embedding_model="hash-v1"):
+        db = VectorDBService("sync_test", embedder=embedder, embedding_model=embedding_model, path=tmp_path / "chroma")
+        operator_store = OperatorKnowledgeStore(
+            snapshot_path=tmp_path / "operator_knowledge.json",
+            journal_path=tmp_path / "operator_knowledge.journal.jsonl",
+            compact_threshold=0
+        )
+        return KnowledgeManager(db, operator_store, faq_path=faq_path, manifest_path=tmp_path / "manifest.json")
+    return make
+
+
+def write_faq(faq_path, questions):
+    faq_path.write_text(json.dumps({**FAQ, "faq": {"amenities": questions}}), encoding="utf-8")
+
+
+def test_unchanged_knowledge_is_not_re_embedded(make_manager, embedder):
+    assert make_manager().load_faq_data() == {"added": 3, "updated": 0, "removed": 0, "unchanged": 0}
+    embedder.embedded.clear()
+
+    # A restart with the same files reuses the persisted manifest and index
+    assert make_manager().load_faq_data() == {"added": 0, "updated": 0, "removed": 0, "unchanged": 3}
+    assert embedder.embedded == []
+
+
+def test_only_edited_items_are_synced(make_manager, embedder, faq_path):
+    knowledge_manager = make_manager()
+    knowledge_manager.load_faq_data()
+    embedder.embedded.clear()
+
+    questions = FAQ["faq"]["amenities"]
+    write_faq(faq_path, [
+        questions[0],
+        {"q": "Is there a gym?", "a": "Yes, open 24/7."},  # Edited: FAQ ids hash the whole text
+        {"q": "Is breakfast included?", "a": "Yes, until 11 AM."}  # Added; the spa question is removed
+    ])
+
+    assert knowledge_manager.load_faq_data() == {"added": 2, "updated": 0, "removed": 2, "unchanged": 1}
+    assert embedder.embedded == [
+        "Question: Is there a gym? Answer: Yes, open 24/7.",
+        "Question: Is breakfast included? Answer: Yes, until 11 AM."
+    ]
+    assert sorted(knowledge_manager.db.get_ids_by_metadata({"source": "faq"})) == sorted(
+        KnowledgeManager._generate_id(f"Question: {item['q']} Answer: {item['a']}")
+        for item in json.loads(faq_path.read_text(encoding="utf-8"))["faq"]["amenities"]
+    )
+
+
+def test_changed_operator_answer_is_updated_in_place(make_manager, embedder):
+    knowledge_manager = make_manager()
+    knowledge_manager.operator_store.save("Late checkout?", "Until noon.")
+    knowledge_manager.operator_store.save("Pets allowed?", "Small dogs only.")
+    assert knowledge_manager.load_operator_knowledge() == {"added": 2, "updated": 0, "removed": 0, "unchanged": 0}
+
+    knowledge_manager.operator_store.save("Late checkout?", "Until 1 PM.")
+
+    assert knowledge_manager.load_operator_knowledge() == {"added": 0, "updated": 1, "removed": 0, "unchanged": 1}
+
+
+def test_documents_missing_from_the_index_are_restored(make_manager):
+    knowledge_manager = make_manager()
+    knowledge_manager.load_faq_data()
+    knowledge_manager.db.delete_by_ids(knowledge_manager.db.get_ids_by_metadata({"source": "faq"})[:1])
+
+    assert knowledge_manager.load_faq_data() == {"added": 1, "updated": 0, "removed": 0, "unchanged": 2}
+
+
+def test_new_embedding_model_re_embeds_everything(make_manager, embedder):
+    make_manager().load_faq_data()
+    embedder.embedded.clear()
+
+    assert make_manager(embedding_model="hash-v2").load_faq_data() == {
+        "added": 3, "updated": 0, "removed": 0, "unchanged": 0
+    }
+    assert len(embedder.embedded) == 3
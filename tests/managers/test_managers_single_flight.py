@@ -0,0 +1,41 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from backend.services.llm import llm_service
+
+
+def test_identical_questions_share_one_llm_call(chat_manager):
+    completions = chat_manager.llm.chat_client.chat.completions
+    completions.latency = 0.2
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(chat_manager.process_message, ["When is the pool open?", "when is the POOL open"] * 3))
+
+    assert completions.calls == 1, "Identical concurrent questions each called the LLM!"
+    assert all(result["answer"] == "The pool is open from 7 AM to 10 PM." for result in results)
+
+
+def test_identical_async_questions_share_one_llm_call(chat_manager):
+    completions = llm_service.get_async_chat_client().chat.completions
+    completions.latency = 0.2
+
+    async def ask_many():
+        return await asyncio.gather(*(chat_manager.process_message_async("When is the pool open?") for _ in range(6)))
+
+    results = asyncio.run(ask_many())
+
+    assert completions.calls == 1
+    assert all(result["status"] == "direct" for result in results)
+
+
+def test_identical_streamed_questions_share_one_llm_call(chat_manager):
+    completions = chat_manager.llm.chat_client.chat.completions
+    completions.latency = 0.2
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        streams = list(pool.map(lambda _: list(chat_manager.process_message_stream("When is the pool open?")), range(4)))
+
+    assert completions.calls == 1
+    for events in streams:
+        assert "".join(payload["text"] for event, payload in events if event == "token") == \
+            "The pool is open from 7 AM to 10 PM."
+        assert events[-1][1]["status"] == "direct"
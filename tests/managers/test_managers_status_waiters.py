@@ -0,0 +1,56 @@
+import asyncio
+import threading
+from backend.managers import chat_manager as chat_manager_module
+
+
+def fulfill_later(chat_manager, req_id, delay=0.1):
+    timer = threading.Timer(delay, chat_manager.fulfill_request, args=(req_id, "Until 1 PM."))
+    timer.start()
+    return timer
+
+
+def test_waiter_is_woken_by_fulfillment(chat_manager, request_store, monkeypatch):
+    monkeypatch.setattr(chat_manager_module, "STATUS_RECHECK_INTERVAL", 30)  # Only the wake-up can end the wait
+    request_store.create("req-1", user_query="Late checkout?", suggestion="Until noon.")
+    fulfill_later(chat_manager, "req-1")
+
+    status_info = chat_manager.wait_for_status("req-1", timeout=10)
+
+    assert status_info["status"] == "completed"
+    assert status_info["answer"] == "Until 1 PM."
+    assert chat_manager.knowledge_manager.saved_answers == [("Late checkout?", "Until 1 PM.")]
+    assert chat_manager._status_events == {}
+
+
+def test_timed_out_waiters_leave_nothing_behind(chat_manager, request_store):
+    request_store.create("req-1", user_query="Late checkout?", suggestion="Until noon.")
+    threads = [threading.Thread(target=chat_manager.wait_for_status, args=("req-1", 0.1)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert chat_manager.wait_for_status("unknown", timeout=0.1) == {"status": "not_found"}
+    assert chat_manager._status_events == {}, "Status events of abandoned requests were kept!"
+
+
+def test_async_waiter_is_woken_by_fulfillment(chat_manager, request_store, monkeypatch):
+    monkeypatch.setattr(chat_manager_module, "STATUS_RECHECK_INTERVAL", 30)
+    request_store.create("req-1", user_query="Late checkout?", suggestion="Until noon.")
+
+    async def wait():
+        fulfill_later(chat_manager, "req-1")
+        return await chat_manager.wait_for_status_async("req-1", timeout=10)
+
+    assert asyncio.run(wait())["status"] == "completed"
+    assert chat_manager._async_status_waiters == {}
+
+
+def test_timed_out_async_waiters_leave_nothing_behind(chat_manager, request_store):
+    request_store.create("req-1", user_query="Late checkout?", suggestion="Until noon.")
+
+    async def wait_many():
+        return await asyncio.gather(*(chat_manager.wait_for_status_async("req-1", timeout=0.1) for _ in range(5)))
+
+    assert [status_info["status"] for status_info in asyncio.run(wait_many())] == ["pending"] * 5
+    assert chat_manager._async_status_waiters == {}
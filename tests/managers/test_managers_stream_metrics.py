@@ -0,0 +1,29 @@
+import asyncio
+from backend.utils.metrics import metrics
+
+
+def stage_count(stage):
+    return metrics.histogram_stats("chat_stage_duration_seconds").get((("stage", stage),), {}).get("count", 0)
+
+
+def test_streamed_turn_is_timed(chat_manager):
+    turns, llm_calls = stage_count("chat_turn"), stage_count("llm_call")
+
+    events = list(chat_manager.process_message_stream("When is the pool open?"))
+
+    assert events[-1][1]["status"] == "direct"
+    assert stage_count("chat_turn") == turns + 1, "The streamed turn was not timed!"
+    assert stage_count("llm_call") == llm_calls + 1, "The streamed LLM call was not timed!"
+
+
+def test_async_streamed_turn_is_timed(chat_manager):
+    turns, llm_calls = stage_count("chat_turn"), stage_count("llm_call")
+
+    async def consume():
+        return [event async for event in chat_manager.process_message_stream_async("When is the pool open?")]
+
+    events = asyncio.run(consume())
+
+    assert events[-1][1]["status"] == "direct"
+    assert stage_count("chat_turn") == turns + 1, "The streamed turn was not timed!"
+    assert stage_count("llm_call") == llm_calls + 1, "The streamed LLM call was not timed!"
@@ -0,0 +1,37 @@
+import gc
+import threading
+import weakref
+from backend.managers.tenant_registry import TenantConfig, TenantRegistry
+from tests.managers.conftest import FakeChatManager
+
+
+def make_registry(tmp_path, request_store, tenant_count, max_active):
+    configs = {}
+    for i in range(tenant_count):
+        tenant_id = f"hotel{i}"
+        (tmp_path / tenant_id).mkdir()
+        configs[tenant_id] = TenantConfig.from_dict(tenant_id, {
+            "faq_path": str(tmp_path / tenant_id / "knowledge_base.json"),
+            "operator_knowledge_path": str(tmp_path / tenant_id / "operator_knowledge.json"),
+            "operator_journal_path": str(tmp_path / tenant_id / "operator_knowledge.journal.jsonl")
+        })
+    return TenantRegistry(configs, FakeChatManager, request_store, max_active=max_active, watch_files=True)
+
+
+def reload_threads():
+    return sum(thread.name == "kb-reload" and thread.is_alive() for thread in threading.enumerate())
+
+
+def test_evicted_tenant_is_garbage_collected(tmp_path, request_store):
+    registry = make_registry(tmp_path, request_store, tenant_count=6, max_active=2)
+    threads_before = reload_threads()
+
+    managers = [weakref.ref(registry.get(f"hotel{i}").knowledge_manager) for i in range(6)]
+    gc.collect()
+
+    assert registry.active_tenants() == ["hotel4", "hotel5"]
+    assert [ref() is not None for ref in managers] == [False] * 4 + [True] * 2, "Evicted tenants are still in memory!"
+    assert reload_threads() - threads_before == 2, "Evicted tenants' reload threads are still running!"
+
+    registry.close()
+    assert reload_threads() == threads_before
@@ -0,0 +1,17 @@
+import chromadb
+import pytest
+from backend.managers.tenant_registry import TenantConfig
+
+
+@pytest.mark.parametrize("tenant_id", ["a", "hotel-1", "Grand_Hotel_42", "x" * 40])
+def test_valid_tenant_id_makes_a_valid_collection(tenant_id):
+    config = TenantConfig.from_dict(tenant_id, {})
+    client = chromadb.EphemeralClient()
+    client.get_or_create_collection(config.collection)  # Raises if Chroma rejects the name
+    client.delete_collection(config.collection)
+
+
+@pytest.mark.parametrize("tenant_id", ["", "hotel-", "hotel_", "-hotel", "_hotel", "x" * 41, "a b", "../etc"])
+def test_invalid_tenant_id_is_rejected(tenant_id):
+    with pytest.raises(ValueError):
+        TenantConfig.from_dict(tenant_id, {})
@@ -0,0 +1,31 @@
+import sqlite3
+import numpy as np
+import pytest
+from backend.services.llm.llm_service import LLMService
+from backend.utils.embedding_cache import EmbeddingCache
+
+
+@pytest.fixture
+def llm(tmp_path, monkeypatch):
+    llm = LLMService()
+    llm.embedding_cache = EmbeddingCache(tmp_path / "embeddings.db")
+    monkeypatch.setattr(llm, "_embed_batch", lambda texts: np.ones((len(texts), 4), dtype=np.float32))
+    return llm
+
+
+def cached_rows(llm):
+    with sqlite3.connect(llm.embedding_cache.path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+
+def test_passages_are_cached_on_disk(llm):
+    llm.embed_content(["The pool is open 7 AM-10 PM.", "Breakfast is served until 11 AM."])
+
+    assert cached_rows(llm) == 2
+
+
+def test_queries_are_not_cached_on_disk(llm):
+    embeddings = llm.embed_content(["When is the pool open?", "Is breakfast included?"], is_query=True)
+
+    assert embeddings.shape == (2, 4)
+    assert cached_rows(llm) == 0, "Guest questions grow the on-disk embedding cache without bound!"
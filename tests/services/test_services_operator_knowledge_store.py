@@ -0,0 +1,80 @@
+import json
+import multiprocessing
+import pytest
+from backend.services.operator_knowledge_store import OperatorKnowledgeStore, fcntl
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return tmp_path / "operator_knowledge.json", tmp_path / "operator_knowledge.journal.jsonl"
+
+
+def make_store(paths, **kwargs):
+    snapshot_path, journal_path = paths
+    return OperatorKnowledgeStore(snapshot_path=snapshot_path, journal_path=journal_path, **kwargs)
+
+
+def save_answers(paths, worker, count):
+    """Saves answers from a separate worker process, compacting every few saves."""
+    store = make_store(paths, compact_threshold=3)
+    store.load()
+    for i in range(count):
+        store.save(f"Question {worker}-{i}?", f"Answer {worker}-{i}.")
+    store.close()
+
+
+def test_saves_are_journaled_and_replayed(paths):
+    store = make_store(paths, compact_threshold=0)
+    store.load()
+    store.save("Late checkout?", "Until noon.")
+    store.save("Late checkout?", "Until 1 PM.")
+    store.save("Pets allowed?", "Small dogs only.")
+
+    snapshot_path, journal_path = paths
+    assert not snapshot_path.exists()
+    assert len(journal_path.read_text(encoding="utf-8").splitlines()) == 3
+    reloaded = make_store(paths).load()
+    assert [(entry["q"], entry["a"]) for entry in reloaded] == [
+        ("Late checkout?", "Until 1 PM."), ("Pets allowed?", "Small dogs only.")
+    ]
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(paths):
+    store = make_store(paths, compact_threshold=2)
+    store.load()
+    store.save("Late checkout?", "Until noon.")
+    store.save("Pets allowed?", "Small dogs only.")  # Reaches the threshold
+
+    snapshot_path, journal_path = paths
+    assert journal_path.read_text(encoding="utf-8") == ""
+    assert [entry["q"] for entry in json.loads(snapshot_path.read_text(encoding="utf-8"))] == [
+        "Late checkout?", "Pets allowed?"
+    ]
+    assert not store.compact(), "An empty journal was compacted!"
+
+
+def test_torn_journal_line_is_dropped(paths):
+    store = make_store(paths, compact_threshold=0)
+    store.load()
+    store.save("Late checkout?", "Until noon.")
+    _, journal_path = paths
+    with open(journal_path, "a", encoding="utf-8") as f:
+        f.write('{"q": "Pets allowed?", "a": "Sm')  # A crash mid-append
+
+    reloaded = make_store(paths, compact_threshold=0)
+    assert [entry["q"] for entry in reloaded.load()] == ["Late checkout?"]
+    reloaded.save("Pool hours?", "7 AM-10 PM.")
+    assert [entry["q"] for entry in make_store(paths).load()] == ["Late checkout?", "Pool hours?"]
+
+
+@pytest.mark.skipif(fcntl is None, reason="No inter-process file lock on this platform")
+def test_workers_sharing_the_files_lose_no_answers(paths):
+    context = multiprocessing.get_context("fork")  # fcntl implies POSIX, where fork is available
+    workers = [context.Process(target=save_answers, args=(paths, worker, 40)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(timeout=60)
+
+    assert [process.exitcode for process in workers] == [0] * 4
+    assert len(make_store(paths).load()) == 160, "Concurrent saves or compactions dropped answers!"
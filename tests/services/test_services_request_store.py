@@ -0,0 +1,113 @@
+import threading
+import time
+import pytest
+from backend.services import request_store as request_store_module
+from backend.services.request_store import InMemoryRequestStore, SQLiteRequestStore, create_request_store
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    """Builds stores of both backends; SQLite ones built by the same test share one database file."""
+    def make(**kwargs):
+        if request.param == "memory":
+            return InMemoryRequestStore(**kwargs)
+        return SQLiteRequestStore(path=tmp_path / "requests.db", **kwargs)
+    return make
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A controllable time.time for the request store module."""
+    now = [1_000_000.0]
+    monkeypatch.setattr(request_store_module.time, "time", lambda: now[0])
+    return now
+
+
+def test_request_lifecycle(make_store):
+    store = make_store()
+    store.create("req-1", user_query="Late checkout?", suggestion="Until noon.", tenant_id="hotel-a")
+    store.link_message("chat:42", "req-1")
+
+    assert store.get("req-1") == {
+        "status": "pending", "user_query": "Late checkout?", "answer": None, "suggestion": "Until noon.",
+        "tenant_id": "hotel-a"
+    }
+    assert store.pop_message("chat:42") == "req-1"
+    assert store.pop_message("chat:42") is None, "A message link was matched twice!"
+    assert store.complete("req-1", "Until 1 PM.")
+    assert store.get("req-1")["status"] == "completed"
+    assert store.get("req-1")["answer"] == "Until 1 PM."
+    assert not store.complete("unknown", "answer")
+    assert store.get("unknown") is None
+
+
+def test_failed_request(make_store):
+    store = make_store()
+    store.create("req-1", user_query="Late checkout?", suggestion="Until noon.")
+
+    assert store.fail("req-1")
+    assert store.get("req-1")["status"] == "failed"
+    assert not store.fail("unknown")
+
+
+def test_requests_expire(make_store, clock):
+    store = make_store(pending_ttl=60, completed_ttl=600)
+    store.create("pending", user_query="q", suggestion="s")
+    store.create("completed", user_query="q", suggestion="s")
+    store.complete("completed", "a")
+    store.link_message("chat:1", "pending")
+
+    clock[0] += 61
+    assert store.get("pending") is None
+    assert store.get("completed")["status"] == "completed"
+
+    assert store.purge_expired() == 1
+    assert store.pop_message("chat:1") is None, "The message link of an expired request was kept!"
+
+    clock[0] += 600
+    assert store.purge_expired() == 1
+    assert store.get("completed") is None
+
+
+def test_sweeper_purges_expired_requests(make_store):
+    store = make_store(pending_ttl=0.05)
+    store.create("req-1", user_query="q", suggestion="s")
+    store.start_sweeper(interval=0.02)
+
+    time.sleep(0.5)
+
+    assert store.purge_expired() == 0, "The sweeper left the expired request in the store!"
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = tmp_path / "requests.db"
+    webhook_worker = SQLiteRequestStore(path=path)
+    chat_worker = SQLiteRequestStore(path=path)
+
+    chat_worker.create("req-1", user_query="Late checkout?", suggestion="Until noon.")
+    chat_worker.link_message("chat:42", "req-1")
+
+    assert webhook_worker.pop_message("chat:42") == "req-1"
+    webhook_worker.complete("req-1", "Until 1 PM.")
+    assert chat_worker.get("req-1")["answer"] == "Until 1 PM."
+
+
+def test_sqlite_store_is_safe_across_threads(tmp_path):
+    store = SQLiteRequestStore(path=tmp_path / "requests.db")
+
+    def create_many(worker):
+        for i in range(50):
+            store.create(f"req-{worker}-{i}", user_query="q", suggestion="s")
+
+    threads = [threading.Thread(target=create_many, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(store.get(f"req-{worker}-{i}") for worker in range(4) for i in range(50))
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_request_store("redis")
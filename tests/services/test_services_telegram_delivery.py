@@ -0,0 +1,81 @@
+import threading
+import time
+import pytest
+from types import SimpleNamespace
+from backend.services import telegram_service
+from backend.services.telegram_service import TelegramService
+
+FAILING_CHAT = "100"
+WORKING_CHAT = "200"
+
+
+class FakeTelegramSession:
+    """Answers sendMessage with a server error for FAILING_CHAT and succeeds for every other chat."""
+
+    def __init__(self):
+        self.attempts = []
+        self._next_message_id = 0
+        self._lock = threading.Lock()
+
+    def post(self, url, json, timeout):
+        with self._lock:
+            self.attempts.append(json["chat_id"])
+            if json["chat_id"] == FAILING_CHAT:
+                return SimpleNamespace(status_code=502, json=lambda: {"ok": False, "description": "Bad Gateway"})
+            self._next_message_id += 1
+            message_id = self._next_message_id
+        return SimpleNamespace(status_code=200, json=lambda: {"ok": True, "result": {"message_id": message_id}})
+
+
+@pytest.fixture
+def tg_service(monkeypatch):
+    monkeypatch.setattr(telegram_service, "TG_RETRY_BACKOFF", 30.0)
+    monkeypatch.setattr(telegram_service, "TG_MAX_RETRIES", 3)
+    monkeypatch.setattr(telegram_service, "TG_MIN_SEND_INTERVAL", 0.0)
+    service = TelegramService()
+    service.session = FakeTelegramSession()
+    return service
+
+
+def enqueue(service, chat_id, request_id):
+    delivered = threading.Event()
+    queued = service.enqueue_alert(
+        request_id=request_id,
+        user_query="When does the pool close?",
+        ai_suggestion="At 10 PM.",
+        on_delivered=lambda msg_id: delivered.set(),
+        chat_id=chat_id
+    )
+    assert queued
+    return delivered
+
+
+def test_failing_chat_does_not_block_other_alerts(tg_service):
+    failing = enqueue(tg_service, FAILING_CHAT, "req-1")
+    working = enqueue(tg_service, WORKING_CHAT, "req-2")
+
+    assert working.wait(timeout=5), "A retry backoff of one chat held up the alert of another!"
+    assert not failing.is_set()
+    assert tg_service.session.attempts == [FAILING_CHAT, WORKING_CHAT]
+
+
+def test_failed_alert_is_retried(tg_service, monkeypatch):
+    monkeypatch.setattr(telegram_service, "TG_RETRY_BACKOFF", 0.01)
+    enqueue(tg_service, FAILING_CHAT, "req-1")
+    working = enqueue(tg_service, WORKING_CHAT, "req-2")
+
+    assert working.wait(timeout=5)
+    for _ in range(500):
+        if tg_service.session.attempts.count(FAILING_CHAT) == telegram_service.TG_MAX_RETRIES + 1:
+            break
+        time.sleep(0.01)
+    assert tg_service.session.attempts.count(FAILING_CHAT) == telegram_service.TG_MAX_RETRIES + 1
+
+
+def test_full_queue_rejects_alert(monkeypatch):
+    service = TelegramService()
+    monkeypatch.setattr(service, "_ensure_worker", lambda: None)  # Nothing drains the queue
+    for i in range(service._queue.maxsize):
+        service._queue.put_nowait(("req", "q", "a", None, WORKING_CHAT, 0))
+
+    assert service.enqueue_alert("req-full", "When does the pool close?", "At 10 PM.", chat_id=WORKING_CHAT) is False
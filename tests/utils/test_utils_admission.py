@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import time
+import pytest
+from backend.utils.admission import AdmissionController, OverloadedError
+
+
+def hold_slot(controller, release, entered=None):
+    """Runs a call that holds a slot until `release` is set."""
+    def call():
+        with controller.admit():
+            if entered is not None:
+                entered.set()
+            release.wait(5)
+    thread = threading.Thread(target=call)
+    thread.start()
+    return thread
+
+
+def test_calls_beyond_the_limit_wait_for_a_slot():
+    controller = AdmissionController("test", max_in_flight=1, max_queue=1, queue_timeout=5)
+    release, entered = threading.Event(), threading.Event()
+    holder = hold_slot(controller, release, entered)
+    assert entered.wait(5)
+
+    admitted_at = []
+
+    def queued_call():
+        with controller.admit():
+            admitted_at.append(time.monotonic())
+    queued = threading.Thread(target=queued_call)
+    queued.start()
+    time.sleep(0.1)
+    assert controller.in_flight == 1 and controller.queue_depth == 1 and not admitted_at
+
+    released_at = time.monotonic()
+    release.set()
+    holder.join()
+    queued.join()
+
+    assert admitted_at and admitted_at[0] >= released_at
+    assert controller.in_flight == 0 and controller.queue_depth == 0
+
+
+def test_full_queue_is_rejected_with_503():
+    controller = AdmissionController("test", max_in_flight=1, max_queue=0, queue_timeout=5)
+    release, entered = threading.Event(), threading.Event()
+    holder = hold_slot(controller, release, entered)
+    assert entered.wait(5)
+
+    with pytest.raises(OverloadedError) as error:
+        with controller.admit():
+            pass
+    release.set()
+    holder.join()
+
+    assert error.value.status == 503
+    assert error.value.reason == "queue_full"
+    assert error.value.retry_after >= 1
+
+
+def test_queue_timeout_is_rejected_with_503():
+    controller = AdmissionController("test", max_in_flight=1, max_queue=1, queue_timeout=0.1)
+    release, entered = threading.Event(), threading.Event()
+    holder = hold_slot(controller, release, entered)
+    assert entered.wait(5)
+
+    with pytest.raises(OverloadedError) as error:
+        with controller.admit():
+            pass
+    release.set()
+    holder.join()
+
+    assert (error.value.status, error.value.reason) == (503, "queue_timeout")
+    assert controller.queue_depth == 0, "A timed-out call stayed in the queue!"
+
+
+def test_start_rate_is_limited_with_429():
+    controller = AdmissionController("test", max_in_flight=10, max_queue=10, queue_timeout=5, rate=0.5, burst=1)
+    with controller.admit():
+        pass
+
+    with pytest.raises(OverloadedError) as error:
+        with controller.admit():
+            pass
+
+    assert (error.value.status, error.value.reason) == (429, "rate_limited")
+    assert error.value.retry_after >= 1
+
+
+def test_async_and_thread_calls_share_the_slots():
+    controller = AdmissionController("test", max_in_flight=1, max_queue=1, queue_timeout=5)
+    release, entered = threading.Event(), threading.Event()
+    holder = hold_slot(controller, release, entered)
+    assert entered.wait(5)
+
+    async def queued_call():
+        threading.Timer(0.1, release.set).start()
+        async with controller.admit_async():
+            return controller.in_flight
+
+    assert asyncio.run(queued_call()) == 1
+    holder.join()
+    assert controller.in_flight == 0
+
+
+def test_cancelled_async_waiter_passes_its_slot_on():
+    controller = AdmissionController("test", max_in_flight=1, max_queue=2, queue_timeout=5)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def holder():
+            async with controller.admit_async():
+                await release.wait()
+
+        async def waiter():
+            async with controller.admit_async():
+                return "admitted"
+
+        holding = asyncio.create_task(holder())
+        await asyncio.sleep(0.01)
+        cancelled, next_in_line = asyncio.create_task(waiter()), asyncio.create_task(waiter())
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        release.set()
+        await holding
+        return await asyncio.wait_for(next_in_line, 5)
+
+    assert asyncio.run(scenario()) == "admitted"
+    assert controller.in_flight == 0 and controller.queue_depth == 0
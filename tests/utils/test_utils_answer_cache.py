@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from backend.utils import answer_cache
+from backend.utils.answer_cache import SemanticAnswerCache
+
+
+def unit_vector(index, dimension=16):
+    vector = np.zeros(dimension, dtype=np.float32)
+    vector[index] = 1.0
+    return vector
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A controllable time.monotonic for the cache module."""
+    now = [1000.0]
+    monkeypatch.setattr(answer_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_similar_query_hits():
+    cache = SemanticAnswerCache(max_size=4, ttl_seconds=60, similarity_threshold=0.95)
+    cache.put(unit_vector(0), "Pool: 7 AM-10 PM")
+    cache.put(unit_vector(1), "Breakfast: until 11 AM")
+
+    near = unit_vector(1) + 0.01 * unit_vector(2)
+    assert cache.get(near) == "Breakfast: until 11 AM"
+    assert cache.get(unit_vector(3)) is None
+
+
+def test_least_recently_used_entry_is_evicted_when_full():
+    cache = SemanticAnswerCache(max_size=2, ttl_seconds=60, similarity_threshold=0.95)
+    cache.put(unit_vector(0), "a")
+    cache.put(unit_vector(1), "b")
+    cache.get(unit_vector(0))
+
+    cache.put(unit_vector(2), "c")
+
+    assert len(cache) == 2
+    assert cache.get(unit_vector(1)) is None
+    assert cache.get(unit_vector(0)) == "a"
+    assert cache.get(unit_vector(2)) == "c"
+
+
+def test_inserts_reuse_matrix_rows():
+    cache = SemanticAnswerCache(max_size=3, ttl_seconds=60, similarity_threshold=0.95)
+    for i in range(3):
+        cache.put(unit_vector(i), str(i))
+    cache.get(unit_vector(0))
+    matrix = cache._matrix
+
+    for i in range(3, 10):
+        cache.put(unit_vector(i), str(i))
+
+    assert [cache.get(unit_vector(i)) for i in range(7, 10)] == ["7", "8", "9"]
+    assert cache._matrix is matrix, "An insert reallocated the vector matrix!"
+
+
+def test_expired_entries_are_dropped(clock):
+    cache = SemanticAnswerCache(max_size=4, ttl_seconds=60, similarity_threshold=0.95)
+    cache.put(unit_vector(0), "old")
+    cache.put(unit_vector(1), "older")
+    clock[0] += 61
+
+    assert cache.get(unit_vector(0)) is None  # Expired on lookup
+    cache.put(unit_vector(2), "new")  # Drops the expired entry at the LRU end
+    assert len(cache) == 1
+    assert cache.get(unit_vector(2)) == "new"
+
+
+def test_new_prompt_version_empties_the_cache():
+    cache = SemanticAnswerCache(max_size=4, ttl_seconds=60, similarity_threshold=0.95)
+    cache.put(unit_vector(0), "a", version="v1")
+
+    assert cache.get(unit_vector(0), version="v2") is None
+    cache.put(unit_vector(0), "b", version="v2")
+    assert cache.get(unit_vector(0), version="v2") == "b"
@@ -0,0 +1,125 @@
+import threading
+import time
+import pytest
+from backend.utils.watcher import ReloadScheduler, start_knowledge_watcher
+
+
+class CountingReload:
+    """A reload callback that counts its calls and can be held open to simulate a slow reload."""
+
+    def __init__(self, duration=0.0):
+        self.duration = duration
+        self.calls = 0
+        self.started = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        time.sleep(self.duration)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = ReloadScheduler(debounce=0.1, max_delay=5.0)
+    yield scheduler
+    scheduler.stop()
+
+
+def test_burst_of_changes_is_one_reload(scheduler, tmp_path):
+    reload = CountingReload()
+    scheduler.register(tmp_path / "knowledge_base.json", reload)
+    scheduler.start()
+
+    for _ in range(20):
+        scheduler.notify(tmp_path / "knowledge_base.json")
+        time.sleep(0.01)
+
+    assert wait_for(lambda: reload.calls == 1)
+    time.sleep(0.3)
+    assert reload.calls == 1, "A burst of writes triggered several reloads!"
+
+
+def test_continuous_changes_reload_after_max_delay(tmp_path):
+    scheduler = ReloadScheduler(debounce=0.2, max_delay=0.3)
+    reload = CountingReload()
+    scheduler.register(tmp_path / "knowledge_base.json", reload)
+    scheduler.start()
+    try:
+        started = time.monotonic()
+        while not reload.calls and time.monotonic() - started < 3:
+            scheduler.notify(tmp_path / "knowledge_base.json")  # Never quiet for the debounce
+            time.sleep(0.05)
+
+        assert reload.calls == 1, "A file that keeps changing was never reloaded!"
+        assert time.monotonic() - started < 1.0
+    finally:
+        scheduler.stop()
+
+
+def test_change_during_reload_schedules_another(scheduler, tmp_path):
+    reload = CountingReload(duration=0.3)
+    scheduler.register(tmp_path / "knowledge_base.json", reload)
+    scheduler.start()
+
+    scheduler.notify(tmp_path / "knowledge_base.json")
+    assert reload.started.wait(5)
+    scheduler.notify(tmp_path / "knowledge_base.json")
+
+    assert wait_for(lambda: reload.calls == 2), "A change made during a reload was lost!"
+
+
+def test_unwatched_files_are_ignored(scheduler, tmp_path):
+    reload = CountingReload()
+    scheduler.register(tmp_path / "knowledge_base.json", reload)
+    scheduler.start()
+
+    scheduler.notify(tmp_path / "other.json")
+    time.sleep(0.3)
+
+    assert reload.calls == 0
+
+
+def test_failed_reload_keeps_the_worker_running(scheduler, tmp_path):
+    reload = CountingReload()
+    scheduler.register(tmp_path / "broken.json", lambda: 1 / 0)
+    scheduler.register(tmp_path / "knowledge_base.json", reload)
+    scheduler.start()
+
+    scheduler.notify(tmp_path / "broken.json")
+    time.sleep(0.2)
+    scheduler.notify(tmp_path / "knowledge_base.json")
+
+    assert wait_for(lambda: reload.calls == 1)
+
+
+def test_stop_ends_the_worker(tmp_path):
+    scheduler = ReloadScheduler(debounce=0.1, max_delay=5.0)
+    scheduler.register(tmp_path / "knowledge_base.json", CountingReload())
+    scheduler.start()
+
+    scheduler.stop()
+
+    assert not scheduler._worker.is_alive()
+
+
+def test_watcher_reloads_a_changed_file(tmp_path):
+    knowledge_file = tmp_path / "knowledge_base.json"
+    knowledge_file.write_text("[]", encoding="utf-8")
+    reload = CountingReload()
+    watcher = start_knowledge_watcher({str(knowledge_file): reload})
+    try:
+        time.sleep(0.2)  # Let the observer start watching
+        tmp_file = tmp_path / "knowledge_base.json.tmp"
+        tmp_file.write_text('[{"question": "Pool hours?"}]', encoding="utf-8")
+        tmp_file.replace(knowledge_file)  # Editors and compaction save through a rename
+
+        assert wait_for(lambda: reload.calls >= 1, timeout=10), "A change to a watched file was not reloaded!"
+    finally:
+        watcher.stop()
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from backend.utils.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_computation():
+    in_flight = SingleFlight()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"answer": "7 AM-10 PM"}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        outcomes = list(pool.map(lambda _: in_flight.do("pool hours", compute), range(8)))
+
+    assert len(calls) == 1
+    assert all(result == {"answer": "7 AM-10 PM"} for result, _ in outcomes)
+    assert sorted(joined for _, joined in outcomes) == [False] + [True] * 7
+    assert len(in_flight) == 0
+
+
+def test_different_keys_do_not_wait_for_each_other():
+    in_flight = SingleFlight()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        outcomes = list(pool.map(lambda key: in_flight.do(key, lambda: key), ["pool", "breakfast"]))
+
+    assert outcomes == [("pool", False), ("breakfast", False)]
+
+
+def test_leader_error_is_raised_to_waiters():
+    in_flight = SingleFlight()
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        time.sleep(0.2)
+        raise RuntimeError("upstream timeout")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(in_flight.do, "pool hours", fail)
+        assert started.wait(5)
+        waiter = pool.submit(in_flight.do, "pool hours", lambda: "never computed")
+
+        for future in (leader, waiter):
+            with pytest.raises(RuntimeError, match="upstream timeout"):
+                future.result()
+    assert len(in_flight) == 0
+
+
+def test_abandoned_flight_is_taken_over_by_a_waiter():
+    in_flight = SingleFlight()
+    flight, _ = in_flight.lead_or_wait("pool hours")
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        waiter = pool.submit(in_flight.do, "pool hours", lambda: "computed by the waiter")
+        time.sleep(0.1)
+        in_flight.end("pool hours", flight)  # The leader's client went away before the result
+
+        assert waiter.result(timeout=5) == ("computed by the waiter", False)
+
+
+def test_async_callers_share_one_computation():
+    in_flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "7 AM-10 PM"
+
+    async def ask_many():
+        return await asyncio.gather(*(in_flight.do_async("pool hours", compute) for _ in range(20)))
+
+    outcomes = asyncio.run(ask_many())
+
+    assert len(calls) == 1
+    assert [result for result, _ in outcomes] == ["7 AM-10 PM"] * 20
+    assert len(in_flight) == 0
+
+
+def test_cancelled_waiter_does_not_cancel_the_flight():
+    in_flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.1)
+        return "7 AM-10 PM"
+
+    async def scenario():
+        leader = asyncio.create_task(in_flight.do_async("pool hours", compute))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(in_flight.do_async("pool hours", compute))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        return await leader
+
+    assert asyncio.run(scenario()) == ("7 AM-10 PM", False)
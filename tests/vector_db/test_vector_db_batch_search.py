@@ -0,0 +1,12 @@
+import pytest
+from tests.vector_db.conftest import get_all_test_cases_from_file
+
+
+@pytest.mark.parametrize("test_case", get_all_test_cases_from_file("test_batch.json"), indirect=True, ids=lambda x: x[1]["name"])
+def test_vector_db_batch_search(vector_db_service, test_case):
+    results = vector_db_service.search_batch(query_texts=test_case["queries"])
+
+    assert len(results['ids']) == len(test_case["queries"]), "One result per query expected!"
+    for query, ids, expected_id in zip(test_case["queries"], results['ids'], test_case["expected_ids"]):
+        assert ids[0] == expected_id, f"Wrong document for '{query}'!"
+        assert ids == vector_db_service.search(query_text=query)['ids'][0], "Batch and single search disagree!"
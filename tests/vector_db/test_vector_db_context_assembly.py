@@ -0,0 +1,23 @@
+import pytest
+from backend.services.context_assembler import ContextAssembler
+from tests.vector_db.conftest import get_all_test_cases_from_file
+
+
+@pytest.mark.parametrize("test_case", get_all_test_cases_from_file("test_context_assembly.json"), indirect=True, ids=lambda x: x[1]["name"])
+def test_vector_db_context_assembly(vector_db_service, test_case):
+    query_embedding = vector_db_service.embed_query(test_case["query"])
+    results = vector_db_service.search(
+        query_text=test_case["query"],
+        n_results=test_case["n_results"],
+        where_filter=test_case["filter"],
+        query_embedding=query_embedding,
+        include_embeddings=True
+    )
+    context = ContextAssembler(duplicate_threshold=test_case["duplicate_threshold"]).assemble(results, query_embedding)
+
+    doc_ids = dict(zip(results['documents'][0], results['ids'][0]))
+    selected_ids = [doc_ids[document] for document in context]
+
+    assert len(set(selected_ids) & set(test_case["duplicate_ids"])) == 1, "Near-duplicates were not collapsed!"
+    for expected_id in test_case["expected_ids"]:
+        assert expected_id in selected_ids, "Distinct chunk was dropped!"
@@ -0,0 +1,13 @@
+import pytest
+from tests.vector_db.conftest import get_all_test_cases_from_file
+
+
+@pytest.mark.parametrize("test_case", get_all_test_cases_from_file("test_hybrid.json"), indirect=True, ids=lambda x: x[1]["name"])
+def test_vector_db_hybrid_search(vector_db_service, test_case):
+    results = vector_db_service.search(query_text=test_case["query"], mode="hybrid")
+
+    doc_id = results['ids'][0][0]
+    keyword_score = results['keyword_scores'][0][0]
+
+    assert doc_id == test_case['expected_id'], "Wrong document!"
+    assert keyword_score >= test_case["min_keyword_score"], "Keyword match too weak!"